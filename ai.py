@@ -1,29 +1,336 @@
 # gotermix54/ai.py
+import asyncio
+import json
+import threading
 import litellm
-from .config import load_config
+from concurrent.futures import Future
+from .config import get_config
+from .core.cache import CACHE_PATH, ResponseCache, cache_settings
+from .core.resilience import CircuitOpenError, get_resilience, is_retryable, resilience_settings
+from .core.scheduler import get_scheduler, scheduler_settings
+from .core.tokens import estimate_tokens
+
+class AIResult(str):
+    """A completion that still behaves like the plain string callers expect.
+
+    Failures carry the original exception in `error`, so callers can tell a
+    real answer from an error message. `model` and `attempts` record which
+    provider finally answered and how many requests it took.
+    """
+
+    def __new__(cls, text, error=None, model=None, attempts=0, cached=False):
+        obj = super().__new__(cls, text)
+        obj.error = error
+        obj.model = model
+        obj.attempts = attempts
+        obj.cached = cached
+        return obj
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    @classmethod
+    def failure(cls, error, **kwargs):
+        if isinstance(error, asyncio.TimeoutError):
+            return cls("⚠️ AI Error: request timed out", error=error, **kwargs)
+        return cls(f"⚠️ AI Error: {str(error)}", error=error, **kwargs)
+
+    @staticmethod
+    def is_failure(text):
+        return isinstance(text, AIResult) and not text.ok
 
 class AIRouter:
-    def __init__(self):
-        self.config = load_config()
+    def __init__(self, use_cache=True, config=None):
+        self.use_cache = use_cache
+        self.cache = None
+        self.scheduler = None
+        self.apply_config(config if config is not None else get_config())
+        self.scheduler = get_scheduler(self.config)
+        self.resilience = get_resilience(
+            self.config,
+            admit=lambda model, tokens: self.scheduler.try_take(provider_of(model), tokens),
+            acquire=lambda model, tokens: self.scheduler.acquire(provider_of(model), tokens),
+            refund=lambda model, tokens: self.scheduler.refund(provider_of(model), tokens)
+        )
+
+    def apply_config(self, config):
+        """(Re)configure from a config snapshot; used for hot reload."""
+        self.config = config
         self.model = self.config["ai"]["model"]
         # Set API keys
         litellm.api_key = self.config["ai"]["mistral_api_key"]
         # Codestral can be routed via litellm too if supported, else direct
+        self.timeout = self.config["ai"].get("timeout", 60)
+
+        if self.use_cache and self.config.get("cache", {}).get("enabled", True):
+            settings = cache_settings(self.config)
+            if self.cache is None or self.cache.path != settings.get("path", CACHE_PATH):
+                self.cache = ResponseCache(**settings)
+            else:
+                self.cache.max_bytes, self.cache.ttls = settings["max_bytes"], settings["ttls"]
+        else:
+            self.cache = None
 
-    def route(self, prompt, mode="reasoning"):
+        # The scheduler and breakers are shared process-wide; the first
+        # call (from __init__) creates them from this same config
+        if self.scheduler is not None:
+            self.scheduler.apply_config(**scheduler_settings(config))
+            self.resilience.apply_config(**resilience_settings(config))
+
+    def pick_model(self, mode):
         # Choose model based on mode
         if mode == "coding" and self.model != "mistral":
-            model = "codestral/latest"  # adjust as per litellm support
-        else:
-            model = "mistral/mistral-large-latest"
+            return "codestral/latest"  # adjust as per litellm support
+        return "mistral/mistral-large-latest"
+
+    def candidates(self, mode):
+        # Preferred model first, the other one as fallback when it's degraded
+        primary = self.pick_model(mode)
+        fallback = "mistral/mistral-large-latest" if primary == "codestral/latest" else "codestral/latest"
+        return [primary, fallback]
+
+    def complete(self, model, prompt, temperature, max_tokens, history=None):
+        response = litellm.completion(
+            model=model,
+            messages=build_messages(prompt, history),
+            temperature=temperature,
+            max_tokens=max_tokens,
+            timeout=self.timeout
+        )
+        return response.choices[0].message.content.strip()
+
+    def cache_key(self, model, mode, prompt, temperature, max_tokens, use_cache=True, history=None):
+        if self.cache is None or not use_cache:
+            return None
+        return ResponseCache.make_key(model, mode, history_prompt(prompt, history), temperature, max_tokens)
+
+    def submit(self, prompt, mode="reasoning", temperature=0.2, max_tokens=2000,
+               use_cache=True, priority="normal", history=None):
+        """Queue a completion with the scheduler and return its Future.
+
+        Cache hits resolve immediately. Identical prompts already in flight
+        share a single provider request. `history` is a list of earlier
+        {"role", "content"} messages sent ahead of the prompt.
+        """
+        model = self.pick_model(mode)
+        key = self.cache_key(model, mode, prompt, temperature, max_tokens, use_cache, history)
+        if key is not None:
+            cached = self.cache.get(key, mode)
+            if cached is not None:
+                future = Future()
+                future.set_result(AIResult(cached, model=model, cached=True))
+                return future
+
+        full_prompt = history_prompt(prompt, history)
+        tokens = estimate_tokens(full_prompt) + max_tokens
+
+        def run():
+            # The scheduler pays for the first attempt on `model`; retries,
+            # failover and hedges are charged by the caller as they happen
+            outcome = self.resilience.call(
+                self.candidates(mode),
+                lambda m: self.complete(m, prompt, temperature, max_tokens, history),
+                tokens=tokens,
+                admitted=model
+            )
+            if outcome.error is not None:
+                return AIResult.failure(outcome.error, model=outcome.model, attempts=outcome.attempts)
+            # Errors are never cached, only real answers
+            if key is not None:
+                self.cache.put(key, mode, outcome.model, outcome.value)
+            return AIResult(outcome.value, model=outcome.model, attempts=outcome.attempts)
+
+        return self.scheduler.submit(
+            run,
+            key=ResponseCache.make_key(model, mode, full_prompt, temperature, max_tokens),
+            provider=provider_of(model),
+            tokens=tokens,
+            priority=priority
+        )
+
+    def route(self, prompt, mode="reasoning", temperature=0.2, max_tokens=2000, use_cache=True,
+              priority="normal", history=None):
+        future = self.submit(prompt, mode, temperature, max_tokens, use_cache, priority, history)
+        try:
+            return future.result()
+        except BaseException:
+            self.scheduler.release(future)
+            raise
 
+    def stream(self, prompt, mode="reasoning", temperature=0.2, max_tokens=2000, use_cache=True,
+               priority="interactive", history=None, handle=None):
+        """Yield the completion token by token as the provider sends it.
+
+        A cache hit is yielded as a single chunk. The full answer is cached
+        once the stream finishes, so a later `route()` call can reuse it.
+        If `handle` (a dict) is given, handle["cancel"] is set to a callable
+        that stops the stream from another thread: it gives up a pending
+        scheduler admission or closes the HTTP response, and the generator
+        then ends without yielding an error.
+        """
+        cancelled = threading.Event()
+        if handle is not None:
+            handle["cancel"] = cancelled.set
+        model = self.pick_model(mode)
+
+        key = self.cache_key(model, mode, prompt, temperature, max_tokens, use_cache, history)
+        if key is not None:
+            cached = self.cache.get(key, mode)
+            if cached is not None:
+                yield cached
+                return
+
+        # Tokens can't be retried once shown, but a provider whose breaker
+        # is open is skipped up front
+        model = self.resilience.choose(self.candidates(mode))
+        if model is None:
+            yield AIResult.failure(CircuitOpenError("all providers are failing; try again shortly"))
+            return
+        breaker = self.resilience.breaker(model)
+
+        # Streams are consumed by the caller: they hold a scheduler slot
+        # (priority, rate limits, concurrency) until the stream ends
+        admission = self.scheduler.hold(
+            provider=provider_of(model),
+            tokens=estimate_tokens(history_prompt(prompt, history)) + max_tokens,
+            priority=priority
+        )
+        if handle is not None:
+            def cancel():
+                cancelled.set()
+                self.scheduler.release(admission)
+            handle["cancel"] = cancel
+        try:
+            give_back = admission.result()
+        except BaseException:
+            self.scheduler.release(admission)
+            breaker.release()
+            if cancelled.is_set():
+                return
+            raise
+        if cancelled.is_set():
+            # Cancelled just as the slot was granted
+            give_back()
+            breaker.release()
+            return
+
+        parts = []
+        response = None
         try:
             response = litellm.completion(
                 model=model,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.2,
-                max_tokens=2000
+                messages=build_messages(prompt, history),
+                temperature=temperature,
+                max_tokens=max_tokens,
+                timeout=self.timeout,
+                stream=True
             )
-            return response.choices[0].message.content.strip()
+            if handle is not None:
+                def cancel():
+                    cancelled.set()
+                    close_stream(response)
+                handle["cancel"] = cancel
+            for chunk in response:
+                if cancelled.is_set():
+                    break
+                token = chunk.choices[0].delta.content
+                if not token:
+                    continue
+                if not parts:
+                    token = token.lstrip()
+                    if not token:
+                        continue
+                parts.append(token)
+                yield token
+        except GeneratorExit:
+            # The consumer stopped reading: hang up rather than drain the reply
+            cancelled.set()
+            breaker.release()
+            raise
         except Exception as e:
-            return f"⚠️ AI Error: {str(e)}"
+            if cancelled.is_set():
+                # Closing the connection under the reader lands here
+                breaker.release()
+                return
+            if is_retryable(e):
+                breaker.record_failure()
+            else:
+                breaker.release()
+            yield AIResult.failure(e, model=model)
+            return
+        finally:
+            if response is not None and cancelled.is_set():
+                close_stream(response)
+            give_back()
+        if cancelled.is_set():
+            breaker.release()
+            return
+        breaker.record_success()
+
+        if key is not None and parts:
+            self.cache.put(key, mode, model, "".join(parts).strip())
+
+    async def route_async(self, prompt, mode="reasoning", temperature=0.2, max_tokens=2000,
+                          use_cache=True, timeout=None, priority="normal"):
+        if timeout is None:
+            timeout = self.timeout
+        future = self.submit(prompt, mode, temperature, max_tokens, use_cache, priority)
+        # shield() keeps one caller's cancellation from killing a request
+        # other callers are sharing; release() cancels it once nobody waits
+        try:
+            return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout)
+        except asyncio.TimeoutError as e:
+            self.scheduler.release(future)
+            return AIResult.failure(e)
+        except asyncio.CancelledError:
+            self.scheduler.release(future)
+            raise
+
+    async def route_many_async(self, prompts, mode="reasoning", concurrency=None,
+                               priority="background", **kwargs):
+        if concurrency is None:
+            concurrency = self.config["ai"].get("concurrency", 4)
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def run_one(prompt):
+            async with semaphore:
+                return await self.route_async(prompt, mode=mode, priority=priority, **kwargs)
+
+        # gather keeps input order; route_async turns failures into AIResult
+        return await asyncio.gather(*(run_one(p) for p in prompts))
+
+    def route_many(self, prompts, mode="reasoning", concurrency=None, **kwargs):
+        """Run several completions concurrently from synchronous code.
+
+        Returns one AIResult per prompt, in input order. A KeyboardInterrupt
+        cancels every pending request before it propagates.
+        """
+        return asyncio.run(self.route_many_async(prompts, mode=mode, concurrency=concurrency, **kwargs))
+
+
+def close_stream(response):
+    """Drop the connection behind a streaming completion (best effort)."""
+    for target in (response, getattr(response, "completion_stream", None), getattr(response, "response", None)):
+        close = getattr(target, "close", None)
+        if callable(close):
+            try:
+                close()
+            except Exception:
+                pass  # e.g. a generator still running on the other thread
+
+
+def provider_of(model):
+    return model.split("/", 1)[0]
+
+
+def build_messages(prompt, history=None):
+    return list(history or ()) + [{"role": "user", "content": prompt}]
+
+
+def history_prompt(prompt, history=None):
+    # What cache keys and token estimates see: the prompt alone when there's
+    # no history, so single-turn entries keep their existing keys
+    if not history:
+        return prompt
+    return json.dumps(build_messages(prompt, history), ensure_ascii=False)
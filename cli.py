@@ -1,42 +1,83 @@
 # gotermix54/cli.py
+import importlib
 import click
-from .config import load_config, save_global_config
-from .context import ContextManager
-from .ai import AIRouter
 
-# Import command groups
-from .commands import sys_cmd, dev_cmd, ops_cmd, pkg_cmd, learn_cmd
-from .ui import GoTermixUI
+class LazyGroup(click.Group):
+    """Click group that imports a subcommand's module only when it's used.
+
+    `lazy_commands` maps a command name to "module:attribute", relative to
+    this package. Keeps `sys run ls` from paying for rich, litellm and
+    prompt_toolkit.
+    """
+
+    def __init__(self, *args, lazy_commands=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy_commands = lazy_commands or {}
+
+    def list_commands(self, ctx):
+        return sorted(set(super().list_commands(ctx)) | set(self.lazy_commands))
+
+    def get_command(self, ctx, name):
+        if name not in self.commands and name in self.lazy_commands:
+            module_name, attr = self.lazy_commands[name].split(":")
+            module = importlib.import_module(module_name, __package__)
+            self.add_command(getattr(module, attr), name)
+        return super().get_command(ctx, name)
+
+class LazyObj(dict):
+    """ctx.obj whose heavy entries are built on first access."""
+
+    def __init__(self, initial=None, **factories):
+        super().__init__(initial or {})
+        self.factories = factories
+
+    def __missing__(self, key):
+        if key not in self.factories:
+            raise KeyError(key)
+        value = self[key] = self.factories[key]()
+        return value
+
+@click.group(cls=LazyGroup, lazy_commands={
+    "sys": ".commands.sys:sys",
+    "dev": ".commands.dev:dev",
+    "cache": ".commands.cache:cache",
+    "doctor": ".commands.doctor:doctor",
+    "daemon": ".commands.daemon:daemon",
+})
+@click.option('--verbose', '-v', is_flag=True, help='Enable verbose output')
+@click.option('--ai-model', type=click.Choice(['mistral', 'codestral', 'auto']), default=None)
+@click.option('--no-cache', is_flag=True, help='Bypass the AI response cache')
+@click.pass_context
+def cli(ctx, verbose, ai_model, no_cache):
+    """🚀 GoTermix54 — AI-Powered Dev CLI for Termux & Linux"""
+
+    def make_config():
+        from .config import load_config
+        config = load_config()
+        if verbose:
+            config['system']['verbose'] = True
+        if ai_model:
+            config['ai']['model'] = ai_model
+        return config
+
+    def make_context():
+        from .context import ContextManager
+        return ContextManager()
+
+    def make_ai():
+        from .ai import AIRouter
+        return AIRouter(use_cache=not no_cache, config=ctx.obj['config'])
+
+    ctx.obj = LazyObj(ctx.obj, config=make_config, context=make_context, ai=make_ai)
 
 @cli.command()
 def ui():
     """🎨 Launch Interactive UI Dashboard"""
+    from .ui import GoTermixUI
     app = GoTermixUI()
     app.run()
-@click.group()
-@click.option('--verbose', '-v', is_flag=True, help='Enable verbose output')
-@click.option('--ai-model', type=click.Choice(['mistral', 'codestral', 'auto']), default=None)
-@click.pass_context
-def cli(ctx, verbose, ai_model):
-    """🚀 GoTermix54 — AI-Powered Dev CLI for Termux & Linux"""
-    ctx.ensure_object(dict)
-    config = load_config()
-    if verbose:
-        config['system']['verbose'] = True
-    if ai_model:
-        config['ai']['model'] = ai_model
-    ctx.obj['config'] = config
-    ctx.obj['context'] = ContextManager()
-    ctx.obj['ai'] = AIRouter()
-
-# Register command groups
-cli.add_command(sys_cmd.sys)
-cli.add_command(dev_cmd.dev)
-cli.add_command(ops_cmd.ops)
-cli.add_command(pkg_cmd.pkg)
-cli.add_command(learn_cmd.learn)
-
-# Root explain command (alias to learn explain)
+
+# Root explain command
 @cli.command()
 @click.argument('query', nargs=-1)
 @click.pass_context
@@ -44,8 +85,18 @@ def explain(ctx, query):
     """🧠 AI explanation for commands or concepts"""
     ai = ctx.obj['ai']
     query_str = " ".join(query)
-    response = ai.route(f"Explain this in simple terms for a developer: {query_str}", mode="reasoning")
-    click.echo(response)
+    for token in ai.stream(f"Explain this in simple terms for a developer: {query_str}", mode="reasoning"):
+        click.echo(token, nl=False)
+    click.echo()
 
-if __name__ == '__main__':
+def main():
+    """Console entry point: hand the command to a running daemon if possible."""
+    import sys
+    from .core.daemon import forward
+    code = forward(sys.argv[1:], sys.stdout, sys.stderr)
+    if code is not None:
+        sys.exit(code)
     cli(obj={})
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,30 @@
+# gotermix54/commands/cache.py
+import click
+from ..core.cache import ResponseCache, cache_settings
+
+@click.group()
+def cache():
+    """🗄️  Inspect the AI response cache"""
+    pass
+
+@cache.command()
+@click.pass_context
+def stats(ctx):
+    """📈 Show cache hit/miss statistics"""
+    # The store the AI router would use, even under --no-cache
+    store = ResponseCache(**cache_settings(ctx.obj['config']))
+    s = store.stats()
+    click.echo(f"Entries:   {s['entries']}")
+    click.echo(f"Size:      {s['size_bytes'] / 1024**2:.2f} / {s['max_bytes'] / 1024**2:.0f} MB")
+    click.echo(f"Hits:      {s['hits']}")
+    click.echo(f"Misses:    {s['misses']}")
+    click.echo(f"Evictions: {s['evictions']}")
+    click.echo(f"Hit rate:  {s['hit_rate']:.1%}")
+
+@cache.command()
+@click.pass_context
+def clear(ctx):
+    """🧹 Drop all cached responses"""
+    store = ResponseCache(**cache_settings(ctx.obj['config']))
+    store.clear()
+    click.echo("✅ Cache cleared")
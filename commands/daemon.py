@@ -0,0 +1,61 @@
+# gotermix54/commands/daemon.py
+import subprocess
+import sys as _sys
+import time
+import click
+from ..core import daemon as daemon_core
+
+@click.group()
+def daemon():
+    """⚡ Resident daemon that keeps the AI router warm"""
+    pass
+
+@daemon.command()
+@click.option('--foreground', is_flag=True, help='Run in this terminal instead of detaching')
+def start(foreground):
+    """▶️ Start the daemon"""
+    if daemon_core.request({"cmd": "ping"}) is not None:
+        click.echo("✅ Daemon already running")
+        return
+    if foreground:
+        click.echo(f"→ Listening on {daemon_core.SOCKET_PATH}")
+        daemon_core.Daemon().serve_forever()
+        return
+
+    log_path = daemon_core.SOCKET_PATH.with_name("daemon.log")
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(log_path, "ab") as log:
+        subprocess.Popen(
+            [_sys.executable, "-m", "gotermix54.cli", "daemon", "start", "--foreground"],
+            stdin=subprocess.DEVNULL, stdout=log, stderr=log, start_new_session=True
+        )
+    # Warm-up imports litellm, so give it a moment before reporting
+    for _ in range(100):
+        status = daemon_core.request({"cmd": "ping"})
+        if status is not None:
+            click.echo(f"✅ Daemon started (pid {status['status']['pid']})")
+            return
+        time.sleep(0.1)
+    click.echo(f"❌ Daemon did not come up; see {log_path}")
+
+@daemon.command()
+def stop():
+    """⏹️ Stop the daemon"""
+    if daemon_core.request({"cmd": "shutdown"}) is None:
+        click.echo("Daemon is not running")
+    else:
+        click.echo("✅ Daemon stopped")
+
+@daemon.command()
+def status():
+    """📡 Show daemon status"""
+    reply = daemon_core.request({"cmd": "ping"})
+    if reply is None:
+        click.echo("Daemon is not running")
+        return
+    s = reply["status"]
+    click.echo(f"PID:      {s['pid']}")
+    click.echo(f"Uptime:   {s['uptime']:.0f}s")
+    click.echo(f"Served:   {s['served']} commands")
+    click.echo(f"Projects: {s['contexts']}")
+    click.echo(f"AI queue: {s['scheduler']['queued']} queued, {s['scheduler']['running']} running")
@@ -1,9 +1,9 @@
 # gotermix54/commands/dev.py
 import click
+import difflib
 import os
+import time
 from pathlib import Path
-from ..ai import AIRouter
-from ..context import ContextManager
 
 @click.group()
 def dev():
@@ -16,6 +16,8 @@ def dev():
 @click.pass_context
 def create_project_interactive(context, ai):
     from questionary import text, select, confirm
+    from rich.console import Console
+    from rich.panel import Panel
 
     console = Console()
     console.print(Panel("🚀 Project Creator Wizard", style="bold green"))
@@ -33,22 +35,59 @@ def create_project_interactive(context, ai):
     console.input("[dim]Press Enter to return...[/dim]")
 
 def edit_file_interactive(file_path):
-    from questionary import text
-    from ..ai import AIRouter
+    from questionary import text, confirm
+    from rich.console import Console
+    from rich.live import Live
+    from rich.panel import Panel
+    from rich.syntax import Syntax
+    from ..ai import AIRouter, AIResult
+    from ..context import ContextManager
     console = Console()
 
     ai = AIRouter()
+    context = ContextManager()
+    problem = check_edit_size(file_path, ai.config)
+    if problem:
+        console.print(f"[red]❌ {problem}[/red]")
+        console.input("[dim]Press Enter to return...[/dim]")
+        return
     content = file_path.read_text()
 
     console.print(Panel(f"✍️  Editing: {file_path}", style="bold yellow"))
     instruction = text("What should I change?").ask()
 
-    with console.status("[bold blue]AI is refactoring...", spinner="dots"):
-        prompt = f"Edit this file: {instruction}\n\n{content}\n\nOutput ONLY the new content."
-        new_content = ai.route(prompt, mode="coding")
+    # Render the rewrite as it streams in instead of spinning until it's done
+    try:
+        rel_path = file_path.resolve().relative_to(context.root.resolve())
+    except ValueError:
+        rel_path = file_path
+    prompt = build_edit_prompt(context, ai.config, rel_path, instruction, content)
+    lexer = Syntax.guess_lexer(str(file_path), code=content)
+    streamed = ""
+    last = None
+    # Highlighting the whole text so far is the costly part: do it at the
+    # Live's refresh rate, not once per token
+    interval = 1 / 8
+    shown_at = 0.0
+
+    def render():
+        return Panel(Syntax(streamed, lexer, theme="monokai"), title="🤖 AI is refactoring...")
+
+    with Live(Panel("", title="🤖 AI is refactoring..."), console=console, refresh_per_second=8,
+              transient=True, vertical_overflow="visible") as live:
+        for last in ai.stream(prompt, mode="coding"):
+            streamed += last
+            now = time.monotonic()
+            if now - shown_at >= interval:
+                shown_at = now
+                live.update(render())
+        live.update(render())
+    if last is not None and AIResult.is_failure(last):
+        console.print(f"[red]{last}[/red]")
+        return
+    new_content = streamed.strip()
 
     console.print("\n[bold]Preview Changes:[/bold]")
-    from rich.syntax import Syntax
     diff = "\n".join([
         f"  {line}" if line.startswith(" ") else
         f"[green]+{line}[/green]" if line.startswith("+") else
@@ -80,54 +119,150 @@ def create(ctx, name, stack):
     """
 
     response = ai.route(prompt, mode="coding")
+    if not response.ok:
+        click.echo(response)
+        return
     try:
         import json
         data = json.loads(response)
         
-        # Create files
-        for file in data.get("files", []):
-            path = Path(file["path"])
-            path.parent.mkdir(parents=True, exist_ok=True)
-            path.write_text(file["content"])
-            click.echo(f"✅ Created {file['path']}")
-            context.add_file(file["path"])
+        # Create files; context updates land in one transaction
+        with context.batch():
+            for file in data.get("files", []):
+                path = Path(file["path"])
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_text(file["content"])
+                click.echo(f"✅ Created {file['path']}")
+                context.add_file(file["path"])
+
+            context.set_goal(f"Project {name} with stack {stack}")
 
         # Show instructions
         click.echo("\n📘 Instructions:")
         for step in data.get("instructions", []):
             click.echo(f"  → {step}")
 
-        context.set_goal(f"Project {name} with stack {stack}")
-        context.save()
-
     except Exception as e:
         click.echo(f"❌ Failed to parse AI response: {e}")
         click.echo(response)
 
-@dev.command()
-@click.argument('file')
-@click.option('--instruction', '-i', required=True, help='What to change')
-@click.pass_context
-def edit(ctx, file, instruction):
-    """✍️ Edit file with AI"""
-    ai = ctx.obj['ai']
-    path = Path(file)
-    if not path.exists():
-        click.echo(f"❌ File {file} not found")
-        return
-
-    content = path.read_text()
-    prompt = f"""
+EDIT_PROMPT = """
     Edit this file according to instruction: "{instruction}"
 
     FILE: {file}
     CONTENT:
     {content}
-
+    {related}
     Output ONLY the new file content. No explanations.
     """
 
-    new_content = ai.route(prompt, mode="coding")
-    if click.confirm(f"Replace content of {file}?"):
-        path.write_text(new_content)
-        click.echo(f"✅ Updated {file}")
+def check_edit_size(path, config):
+    """Why `path` is too big to rewrite with AI, or None if it isn't.
+
+    Editing sends the whole file and reads the whole answer back, so
+    anything past editor.max_file_kb is refused before it's read.
+    """
+    limit = config.get("editor", {}).get("max_file_kb", 256) * 1024
+    size = path.stat().st_size
+    if size > limit:
+        return (f"{path} is {size // 1024} KB, over the {limit // 1024} KB edit limit "
+                f"(editor.max_file_kb); open it in the file explorer to view it")
+    return None
+
+def build_edit_prompt(context, config, path, instruction, content):
+    """EDIT_PROMPT plus relevant snippets of tracked files and summaries of the file's neighbours."""
+    from ..core.index import format_snippets
+    conf = config.get("context", {})
+    snippets = context.relevant_snippets(
+        f"{instruction}\n{content[:4000]}",
+        token_budget=conf.get("token_budget", 1500),
+        top_k=conf.get("top_k", 8),
+        exclude={str(path), path.as_posix()}
+    )
+    related = ""
+    if snippets:
+        related = f"\nRELATED PROJECT CODE (for reference, do not output):\n{format_snippets(snippets)}\n"
+    # One line per file beside this one, from the project watcher's summaries
+    limit = conf.get("neighbour_files", 20)
+    directory = path.parent.as_posix()
+    neighbours = [
+        f"- {name}: {summary}"
+        for name, summary in context.project_summaries("" if directory == "." else directory, limit + 1)
+        if name != path.as_posix()
+    ][:limit]
+    if neighbours:
+        related += "\nOTHER FILES IN THIS DIRECTORY:\n" + "\n".join(neighbours) + "\n"
+    return EDIT_PROMPT.format(instruction=instruction, file=path, content=content, related=related)
+
+@dev.command()
+@click.argument('files', nargs=-1, required=True)
+@click.option('--instruction', '-i', required=True, help='What to change')
+@click.pass_context
+def edit(ctx, files, instruction):
+    """✍️ Edit file(s) with AI"""
+    from ..ai import AIResult
+    ai = ctx.obj['ai']
+    context = ctx.obj['context']
+    paths = []
+    for file in files:
+        path = Path(file)
+        if not path.exists():
+            click.echo(f"❌ File {file} not found")
+            return
+        problem = check_edit_size(path, ctx.obj['config'])
+        if problem:
+            click.echo(f"❌ {problem}")
+            return
+        paths.append(path)
+
+    if len(paths) == 1:
+        path = paths[0]
+        prompt = build_edit_prompt(context, ctx.obj['config'], path, instruction, path.read_text())
+        parts = []
+        for token in ai.stream(prompt, mode="coding"):
+            parts.append(token)
+            click.echo(token, nl=False)
+        click.echo()
+        if parts and AIResult.is_failure(parts[-1]):
+            return
+        new_content = "".join(parts).strip()
+        if click.confirm(f"Replace content of {path}?"):
+            path.write_text(new_content)
+            click.echo(f"✅ Updated {path}")
+        return
+
+    # Several files: request all rewrites at once, then review them one by one
+    click.echo(f"→ Editing {len(paths)} files...")
+    prompts = [
+        build_edit_prompt(context, ctx.obj['config'], path, instruction, path.read_text())
+        for path in paths
+    ]
+    results = ai.route_many(prompts, mode="coding")
+    for path, new_content in zip(paths, results):
+        click.echo(f"\n📄 {path}")
+        if not new_content.ok:
+            click.echo(new_content)
+            continue
+        click.echo(new_content)
+        if click.confirm(f"Replace content of {path}?"):
+            path.write_text(new_content)
+            click.echo(f"✅ Updated {path}")
+
+@dev.command()
+@click.argument('query', nargs=-1, required=True)
+@click.option('--limit', '-n', default=20, show_default=True, help='Max results')
+@click.option('--refresh/--no-refresh', default=True,
+              help='Update the index first (only changed directories are re-read)')
+@click.pass_context
+def find(ctx, query, limit, refresh):
+    """🔎 Fuzzy-find project files"""
+    from ..core.file_index import FileIndex
+    index = FileIndex(ctx.obj['context'].root).load()
+    if refresh or not index.paths:
+        index.refresh()
+    results = index.search(" ".join(query), limit)
+    if not results:
+        click.echo("No matches", err=True)
+        ctx.exit(1)
+    for path in results:
+        click.echo(path)
@@ -0,0 +1,57 @@
+# gotermix54/commands/doctor.py
+import re
+import subprocess
+import sys as _sys
+import time
+import click
+
+IMPORT_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+def measure_startup(argv):
+    """Run the CLI under `python -X importtime` and parse the import report.
+
+    Returns (wall_ms, import_ms, [(cumulative_us, module), ...]) where the
+    module list holds the top-level imports, heaviest first.
+    """
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [_sys.executable, "-X", "importtime", "-m", "gotermix54.cli"] + list(argv),
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+
+    total_us = 0
+    top_level = []
+    for line in proc.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, module = match.groups()
+        total_us += int(self_us)
+        if len(indent) == 1:
+            top_level.append((int(cumulative_us), module))
+    top_level.sort(reverse=True)
+    return wall_ms, total_us / 1000, top_level
+
+@click.group()
+def doctor():
+    """🩺 Diagnose the GoTermix54 installation"""
+    pass
+
+@doctor.command()
+@click.option('--budget-ms', default=100, show_default=True, help='Max import time allowed')
+@click.option('--top', default=10, show_default=True, help='Heaviest imports to list')
+@click.argument('argv', nargs=-1)
+def startup(budget_ms, top, argv):
+    """⏱️  Check CLI import time against a budget (default: sys run true)"""
+    argv = argv or ("sys", "run", "true")
+    wall_ms, import_ms, modules = measure_startup(argv)
+    click.echo(f"→ gotermix54 {' '.join(argv)}")
+    click.echo(f"Wall clock:  {wall_ms:.0f} ms")
+    click.echo(f"Import time: {import_ms:.0f} ms (budget {budget_ms} ms)")
+    for cumulative_us, module in modules[:top]:
+        click.echo(f"  {cumulative_us / 1000:8.1f} ms  {module}")
+    if import_ms > budget_ms:
+        click.echo("❌ Startup budget exceeded")
+        raise SystemExit(1)
+    click.echo("✅ Within budget")
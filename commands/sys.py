@@ -1,7 +1,7 @@
 # gotermix54/commands/sys.py
 import click
+import time
 from ..core.executor import run_shell_command
-from ..ai import AIRouter
 
 @click.group()
 def sys():
@@ -10,37 +10,193 @@ def sys():
 
 @sys.command()
 @click.argument('command', nargs=-1)
+@click.option('--parallel', '-p', type=int, default=None,
+              help='Run each argument (or line of --file) as a separate job, N at a time (0 = one per CPU)')
+@click.option('--file', '-f', 'jobs_file', type=click.File('r'), help="Read jobs from a file, one per line ('-' for stdin)")
+@click.option('--group', is_flag=True, help="Print each job's output when it finishes instead of prefixed lines")
+@click.option('--fail-fast/--keep-going', default=False, help='Stop everything at the first failure')
+@click.option('--timeout', type=float, default=None, help='Per-job wall-clock timeout in seconds (default: none)')
+@click.option('--idle-timeout', type=float, default=None,
+              help='Kill a job after this many seconds without output (default: none)')
+@click.option('--explain-failures', is_flag=True, help="Ask the AI about the failed jobs' output")
 @click.pass_context
-def run(ctx, command):
-    """▶️ Run native shell command"""
-    cmd_str = " ".join(command)
-    click.echo(f"→ Running: {cmd_str}")
-    _, _, code = run_shell_command(cmd_str)
-    if code != 0:
-        click.echo(f"⚠️  Command exited with code {code}")
+def run(ctx, command, parallel, jobs_file, group, fail_fast, timeout, idle_timeout, explain_failures):
+    """▶️ Run native shell command(s)"""
+    batch = parallel is not None or jobs_file is not None
+    if not batch:
+        cmd_str = " ".join(command)
+        click.echo(f"→ Running: {cmd_str}")
+        _, _, code = run_shell_command(cmd_str)
+        if code != 0:
+            click.echo(f"⚠️  Command exited with code {code}")
+        return
+
+    from ..core.jobs import read_jobs
+    jobs = list(command)
+    if jobs_file is not None:
+        jobs += read_jobs(jobs_file.read().splitlines())
+    elif not jobs and not click.get_text_stream('stdin').isatty():
+        jobs = read_jobs(click.get_text_stream('stdin').read().splitlines())
+    if not jobs:
+        raise click.UsageError("No jobs given (arguments, --file or stdin)")
+    results = run_batch(ctx.obj['config'], jobs, parallel, group, fail_fast, timeout, idle_timeout)
+    failed = [r for r in results if r.status in ("failed", "timeout")]
+    if failed and explain_failures:
+        explain_jobs(ctx.obj['ai'], failed)
+    if failed:
+        ctx.exit(1)
+
+def run_batch(config, jobs, workers, group, fail_fast, timeout=None, idle_timeout=None):
+    from ..core.jobs import JobRunner
+    conf = config.get("executor", {})
+    width = len(str(len(jobs)))
+    labels = [click.style(f"[{i + 1:>{width}}]", fg=("cyan", "magenta", "blue", "yellow")[i % 4])
+              for i in range(len(jobs))]
+
+    def on_line(index, channel, line):
+        click.echo(f"{labels[index]} {line}", err=channel == "stderr")
+
+    def on_done(job):
+        mark = {"ok": "✅", "failed": "❌", "timeout": "⏱ ", "cancelled": "⏹ ", "skipped": "⏭ "}[job.status]
+        if group and job.status != "skipped":
+            click.echo(f"{labels[job.index]} $ {job.cmd}")
+            for line in filter(None, (job.stdout, job.stderr)):
+                click.echo(line)
+        click.echo(f"{labels[job.index]} {mark} {job.status} in {job.duration:.2f}s")
+
+    runner = JobRunner(
+        jobs,
+        workers=workers or conf.get("workers") or None,
+        fail_fast=fail_fast,
+        # executor.timeout/idle_timeout are for interactive commands; builds
+        # and test suites can run long and stay quiet, so no limit by default
+        timeout=timeout,
+        idle_timeout=idle_timeout,
+        tail_lines=conf.get("tail_lines", 200),
+        on_line=None if group else on_line,
+        on_done=on_done
+    )
+    click.echo(f"→ Running {len(jobs)} jobs, {runner.workers} at a time")
+    start = time.monotonic()
+    results = runner.run()
+    wall = time.monotonic() - start
+
+    click.echo("\n📋 Summary")
+    for job in sorted(results, key=lambda r: -r.duration):
+        code = "" if job.returncode is None else f" (exit {job.returncode})"
+        click.echo(f"{labels[job.index]} {job.status:<9} {job.duration:7.2f}s  {job.cmd}{code}")
+    busy = sum(r.duration for r in results)
+    click.echo(f"⏱  {wall:.2f}s wall, {busy:.2f}s of job time")
+    return results
+
+def explain_jobs(ai, failed):
+    prompts = [
+        f"This shell command failed as part of a batch:\n$ {job.cmd}\n"
+        f"Status: {job.status}, exit code {job.returncode}\n"
+        f"stdout (last lines):\n{job.stdout}\nstderr (last lines):\n{job.stderr}\n"
+        "Explain briefly why it failed and how to fix it."
+        for job in failed
+    ]
+    for job, answer in zip(failed, ai.route_many(prompts, mode="reasoning")):
+        click.echo(f"\n💡 {job.cmd}")
+        click.echo(answer)
+
+@sys.command()
+@click.option('--record', type=click.Path(dir_okay=False), help='Record samples headlessly to this file (rotated by size)')
+@click.option('--serve', type=int, help='Expose the latest sample as Prometheus metrics on 127.0.0.1:PORT')
+@click.option('--replay', type=click.Path(exists=True, dir_okay=False), help='Play a recording back in the dashboard')
+@click.option('--interval', type=float, help='Seconds between samples (default: monitor.sample_interval)')
+@click.option('--duration', type=float, help='Stop recording after this many seconds')
+@click.option('--speed', type=float, default=60.0, show_default=True, help='Replay speed-up')
+@click.pass_context
+def monitor(ctx, record, serve, replay, interval, duration, speed):
+    """📊 System monitor: live, headless recording/export, or replay"""
+    from ..core.monitor import SystemMonitor
+    config = ctx.obj['config']
+    if replay:
+        from ..core.recorder import Replay
+        try:
+            source = Replay(replay, speed=speed)
+        except ValueError as e:
+            raise click.ClickException(str(e))
+        SystemMonitor(config, replay=source).display_live()
+        return
+    if not record and serve is None:
+        SystemMonitor(config).display_live()
+        return
+
+    from ..core.recorder import Recorder, headless_sampler, serve_metrics
+    conf = config.get("monitor", {})
+    sampler = headless_sampler(interval or conf.get("sample_interval", 1.0))
+    recorder = None
+    if record:
+        try:
+            recorder = Recorder(
+                record,
+                interval=sampler.interval,
+                max_bytes=int(conf.get("record_max_mb", 16) * 1024 * 1024),
+                backups=conf.get("record_backups", 3)
+            )
+        except ValueError as e:
+            raise click.ClickException(f"{e}; pick another --record path")
+        sampler.subscribe(recorder.write)
+        click.echo(f"⏺  Recording every {sampler.interval:g}s to {record}")
+    server = None
+    if serve is not None:
+        server = serve_metrics(sampler, serve)
+        click.echo(f"📡 Metrics at http://127.0.0.1:{serve}/metrics")
+    sampler.start()
+    try:
+        if duration:
+            time.sleep(duration)
+        else:
+            while True:
+                time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sampler.stop()
+        if server is not None:
+            server.shutdown()
+        if recorder is not None:
+            recorder.close()
+            click.echo(f"⏹  Recording saved to {record}")
 
 @sys.command()
 @click.argument('query', nargs=-1)
+@click.option('--each', is_flag=True, help='Explain every argument separately, in parallel')
 @click.pass_context
-def explain(ctx, query):
+def explain(ctx, query, each):
     """🧠 Explain system command or output"""
-    ai = AIRouter()
-    query_str = " ".join(query)
-    prompt = f"You are a Linux system expert. Explain this command or concept to a developer: {query_str}"
-    response = ai.route(prompt, mode="reasoning")
-    click.echo(response)
+    ai = ctx.obj['ai']
+    template = "You are a Linux system expert. Explain this command or concept to a developer: {}"
+    if each and len(query) > 1:
+        results = ai.route_many([template.format(q) for q in query], mode="reasoning")
+        for q, result in zip(query, results):
+            click.echo(f"\n💡 {q}")
+            click.echo(result)
+        return
+
+    prompt = template.format(" ".join(query))
+    for token in ai.stream(prompt, mode="reasoning"):
+        click.echo(token, nl=False)
+    click.echo()
 
 @sys.command()
 @click.argument('issue')
 @click.pass_context
 def fix(ctx, issue):
     """🔧 AI-assisted system fix"""
-    ai = AIRouter()
+    ai = ctx.obj['ai']
     prompt = f"""
     You are an AI system administrator. Suggest a SAFE Linux/Termux command to fix this issue: "{issue}".
     Output ONLY the command, no explanation. If unsure, output "echo 'No safe fix found'".
     """
     cmd = ai.route(prompt, mode="reasoning")
+    if not cmd.ok:
+        # Never offer to execute an error message
+        click.echo(cmd)
+        return
     click.echo(f"💡 Suggested: {cmd}")
     if click.confirm("Execute?"):
         run_shell_command(cmd)
@@ -1,51 +1,230 @@
 # gotermix54/config.py
-import os
+import copy
 import json
+import logging
+import threading
+import time
+from collections.abc import Mapping
 from pathlib import Path
+from types import MappingProxyType
+
+log = logging.getLogger(__name__)
 
 DEFAULT_CONFIG = {
     "ai": {
         "model": "auto",
         "mistral_api_key": "",
         "codestral_api_key": "",
-        "endpoint": "https://api.mistral.ai/v1/chat/completions"
+        "endpoint": "https://api.mistral.ai/v1/chat/completions",
+        "timeout": 60,      # seconds per completion
+        "concurrency": 4,   # parallel requests across the whole process
+        "rate_limits": {
+            "mistral": {"requests_per_minute": 60, "tokens_per_minute": 500000},
+            "codestral": {"requests_per_minute": 30, "tokens_per_minute": 500000}
+        }
+    },
+    "resilience": {
+        "retries": 3,            # retries per model on 429/5xx/timeouts
+        "backoff_base": 0.5,     # seconds, doubled per attempt with full jitter
+        "backoff_max": 8.0,
+        "hedge": True,           # duplicate slow requests past the p95 latency
+        "hedge_min_samples": 20,
+        "breaker_failures": 5,   # consecutive failures before failing over
+        "breaker_reset": 30.0    # seconds before probing a tripped model again
     },
     "system": {
         "confirm_dangerous": True,
         "verbose": False
+    },
+    "context": {
+        "token_budget": 1500,   # max tokens of project snippets added to prompts
+        "top_k": 8,
+        "neighbour_files": 20   # summaries of files beside the edited one sent with `dev edit`
+    },
+    "editor": {
+        "max_file_kb": 256     # `dev edit` refuses bigger files (they'd overflow the model's context)
+    },
+    "chat": {
+        "token_budget": 3000,   # tokens of summary + recent turns sent with each message
+        "summary_words": 250,   # length of the rolling summary of older turns
+        "persist": True         # keep sessions in .gotermix54/chat.db and resume the last one
+    },
+    "executor": {
+        "timeout": 600,        # wall-clock seconds for chat-mode commands
+        "idle_timeout": 120,   # seconds without output before killing
+        "tail_lines": 200,     # lines kept per channel for AI analysis
+        "persistent_shell": True,  # chat `!cmd` runs in one long-lived PTY shell
+        "workers": 0           # `sys run --parallel` default; 0 = one per CPU
+    },
+    "watcher": {
+        "enabled": True,
+        "debounce": 0.5,        # seconds of quiet before applying changes
+        "bulk_threshold": 200,  # bigger bursts become one stat-only rescan
+        "max_files": 20000      # give up on trees larger than this
+    },
+    "monitor": {
+        "refresh_per_second": 4,   # max redraws per second
+        "sample_interval": 1.0,    # seconds between background samples
+        "history_window": 3600,    # samples kept at full resolution
+        "history_levels": [[60, 1440]],  # coarser levels: [samples per point, points]
+        "record_max_mb": 16,       # `sys monitor --record` rotates files at this size
+        "record_backups": 3        # rotated files kept (file.1, file.2, ...)
+    },
+    "cache": {
+        "enabled": True,
+        "max_mb": 64,
+        # Seconds a cached response stays valid per routing mode (0 disables)
+        "ttl": {
+            "reasoning": 7 * 24 * 3600,
+            "coding": 24 * 3600
+        }
     }
 }
 
 GLOBAL_CONFIG_PATH = Path.home() / ".gotermix54" / "config.json"
-PROJECT_CONFIG_PATH = Path.cwd() / ".gotermix54" / "config.json"
 
-def load_config():
-    config = DEFAULT_CONFIG.copy()
-    
+def project_config_path():
+    # Resolved per call so long-running processes follow the current project
+    return Path.cwd() / ".gotermix54" / "config.json"
+
+def read_config():
+    config = copy.deepcopy(DEFAULT_CONFIG)
+
     # Load global config
     if GLOBAL_CONFIG_PATH.exists():
         with open(GLOBAL_CONFIG_PATH, 'r') as f:
             global_conf = json.load(f)
             config = deep_merge(config, global_conf)
-    
+
     # Load project config (overrides global)
-    if PROJECT_CONFIG_PATH.exists():
-        with open(PROJECT_CONFIG_PATH, 'r') as f:
+    project_path = project_config_path()
+    if project_path.exists():
+        with open(project_path, 'r') as f:
             project_conf = json.load(f)
             config = deep_merge(config, project_conf)
-    
+
     return config
 
+def load_config():
+    """Mutable copy of the current config; served from memory when unchanged."""
+    return thaw(config_service.snapshot())
+
+def get_config():
+    """Immutable snapshot of the current config, shared across callers."""
+    return config_service.snapshot()
+
 def save_global_config(config):
     GLOBAL_CONFIG_PATH.parent.mkdir(parents=True, exist_ok=True)
     with open(GLOBAL_CONFIG_PATH, 'w') as f:
-        json.dump(config, f, indent=2)
+        json.dump(thaw(config), f, indent=2)
+    config_service.invalidate()
 
 def deep_merge(a, b):
-    result = a.copy()
+    result = dict(a)
     for key, value in b.items():
-        if key in result and isinstance(result[key], dict) and isinstance(value, dict):
+        if key in result and isinstance(result[key], Mapping) and isinstance(value, Mapping):
             result[key] = deep_merge(result[key], value)
         else:
             result[key] = value
     return result
+
+def freeze(value):
+    if isinstance(value, Mapping):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(v) for v in value)
+    return value
+
+def thaw(value):
+    if isinstance(value, Mapping):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(v) for v in value]
+    return value
+
+def file_stamp(path):
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+class ConfigService:
+    """Process-wide config cache.
+
+    `snapshot()` re-reads the JSON files only when their mtime or size
+    changed (or the project directory did). Subscribers get the new
+    snapshot pushed from a light polling thread, so long-running sessions
+    pick up key or model changes without a restart.
+    """
+
+    def __init__(self, poll_interval=2.0):
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._stamps = None
+        self._listeners = []
+        self._watcher = None
+
+    def _current_stamps(self):
+        project_path = project_config_path()
+        return (project_path, file_stamp(GLOBAL_CONFIG_PATH), file_stamp(project_path))
+
+    def snapshot(self):
+        stamps = self._current_stamps()
+        with self._lock:
+            if stamps == self._stamps:
+                return self._snapshot
+            previous = self._snapshot
+            try:
+                snapshot = freeze(read_config())
+            except (OSError, ValueError):
+                # Half-written file (editor save in progress): keep the last
+                # good snapshot and retry on the next call
+                if previous is not None:
+                    return previous
+                raise
+            self._snapshot, self._stamps = snapshot, stamps
+            listeners = list(self._listeners) if previous is not None else []
+        for callback in listeners:
+            try:
+                callback(snapshot)
+            except Exception:
+                # A subscriber choking on the new config must neither fail the
+                # get_config() caller that noticed the change nor stop the poller
+                log.exception("config listener %r failed", callback)
+        return snapshot
+
+    def invalidate(self):
+        with self._lock:
+            self._stamps = None
+
+    def subscribe(self, callback):
+        """Call `callback(snapshot)` whenever the config changes on disk.
+
+        Returns a function that removes the subscription.
+        """
+        with self._lock:
+            self._listeners.append(callback)
+            if self._watcher is None:
+                self._watcher = threading.Thread(
+                    target=self._watch, name="gotermix-config", daemon=True
+                )
+                self._watcher.start()
+
+        def unsubscribe():
+            with self._lock:
+                if callback in self._listeners:
+                    self._listeners.remove(callback)
+
+        return unsubscribe
+
+    def _watch(self):
+        while True:
+            time.sleep(self.poll_interval)
+            try:
+                self.snapshot()
+            except (OSError, ValueError):
+                pass
+
+config_service = ConfigService()
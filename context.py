@@ -1,34 +1,211 @@
 # gotermix54/context.py
+import contextlib
 import json
+import sqlite3
+import threading
+import time
 from pathlib import Path
 
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    added_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS memory (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    msg TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS project_files (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    hash TEXT,
+    summary TEXT NOT NULL
+);
+"""
+
+MEMORY_LIMIT = 100
+MEMORY_KEEP = 50
+
 class ContextManager:
-    def __init__(self):
-        self.context_path = Path.cwd() / ".gotermix54" / "context.json"
+    """Project context (tracked files, goal, memory) in a journaled store.
+
+    Backed by SQLite in WAL mode: every change is a small atomic write
+    instead of a rewrite of the whole context, and `batch()` groups many
+    changes into a single transaction. A legacy context.json is imported
+    the first time the store is created.
+    """
+
+    def __init__(self, root=None):
+        self.root = Path(root) if root else Path.cwd()
+        base = self.root / ".gotermix54"
+        self.db_path = base / "context.db"
+        self.context_path = base / "context.json"
+        self._conn = None
+        self._lock = threading.RLock()
+        self._batch_depth = 0
+        self._index = None
         self.context = self.load()
+        self._files = set(self.context["files"])
 
-    def load(self):
+    def connect(self, create=True):
+        with self._lock:
+            if self._conn is None:
+                if not create and not self.db_path.exists():
+                    return None
+                self.db_path.parent.mkdir(parents=True, exist_ok=True)
+                fresh = not self.db_path.exists()
+                conn = sqlite3.connect(str(self.db_path), timeout=5, check_same_thread=False,
+                                       isolation_level=None)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.executescript(SCHEMA)
+                self._conn = conn
+                if fresh:
+                    self._import_legacy()
+            return self._conn
+
+    def _import_legacy(self):
         if not self.context_path.exists():
-            return {"files": [], "project_goal": "", "memory": []}
+            return
         with open(self.context_path, 'r') as f:
-            return json.load(f)
+            legacy = json.load(f)
+        now = time.time()
+        with self.batch():
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO files (path, added_at) VALUES (?, ?)",
+                [(p, now) for p in legacy.get("files", [])]
+            )
+            self._conn.executemany(
+                "INSERT INTO memory (msg) VALUES (?)",
+                [(json.dumps(m),) for m in legacy.get("memory", [])]
+            )
+            self._set_meta("project_goal", legacy.get("project_goal", ""))
+
+    def load(self):
+        conn = self.connect(create=self.context_path.exists())
+        if conn is None:
+            return {"files": [], "project_goal": "", "memory": []}
+        with self._lock:
+            files = [r[0] for r in conn.execute("SELECT path FROM files ORDER BY added_at, rowid")]
+            memory = [json.loads(r[0]) for r in conn.execute("SELECT msg FROM memory ORDER BY id")]
+            row = conn.execute("SELECT value FROM meta WHERE key = 'project_goal'").fetchone()
+        return {"files": files, "project_goal": json.loads(row[0]) if row else "", "memory": memory}
+
+    @contextlib.contextmanager
+    def batch(self):
+        """Group writes into one transaction: `with ctx.batch(): ...`"""
+        with self._lock:
+            conn = self.connect()
+            if self._batch_depth == 0:
+                conn.execute("BEGIN IMMEDIATE")
+            self._batch_depth += 1
+            try:
+                yield self
+            except BaseException:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    conn.execute("ROLLBACK")
+                    self.context = self.load()
+                    self._files = set(self.context["files"])
+                raise
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                conn.execute("COMMIT")
 
     def save(self):
-        self.context_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(self.context_path, 'w') as f:
-            json.dump(self.context, f, indent=2)
+        # Writes are committed as they happen (or at the end of a batch);
+        # kept so existing callers that flush explicitly still work.
+        pass
+
+    def _set_meta(self, key, value):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, json.dumps(value))
+        )
 
     def add_file(self, filepath):
-        if filepath not in self.context["files"]:
-            self.context["files"].append(filepath)
-            self.save()
+        if filepath in self._files:
+            return
+        with self.batch():
+            self._conn.execute(
+                "INSERT OR IGNORE INTO files (path, added_at) VALUES (?, ?)", (filepath, time.time())
+            )
+        self._files.add(filepath)
+        self.context["files"].append(filepath)
+
+    def has_file(self, filepath):
+        return filepath in self._files
 
     def set_goal(self, goal):
+        with self.batch():
+            self._set_meta("project_goal", goal)
         self.context["project_goal"] = goal
-        self.save()
 
     def add_memory(self, msg):
-        self.context["memory"].append(msg)
-        if len(self.context["memory"]) > 100:  # limit
-            self.context["memory"] = self.context["memory"][-50:]
-        self.save()
+        with self.batch():
+            self._conn.execute("INSERT INTO memory (msg) VALUES (?)", (json.dumps(msg),))
+            self.context["memory"].append(msg)
+            if len(self.context["memory"]) > MEMORY_LIMIT:  # limit
+                self._conn.execute(
+                    "DELETE FROM memory WHERE id NOT IN "
+                    "(SELECT id FROM memory ORDER BY id DESC LIMIT ?)", (MEMORY_KEEP,)
+                )
+                self.context["memory"] = self.context["memory"][-MEMORY_KEEP:]
+
+    def project_manifest(self):
+        """{path: (mtime_ns, size, hash)} for every file the watcher has seen."""
+        with self._lock:
+            conn = self.connect()
+            return {r[0]: r[1:] for r in conn.execute("SELECT path, mtime_ns, size, hash FROM project_files")}
+
+    def project_summaries(self, directory, limit=20):
+        """[(path, summary)] of the watcher's files directly in `directory` ("" = root)."""
+        prefix = f"{directory}/" if directory else ""
+        with self._lock:
+            conn = self.connect(create=False)
+            if conn is None:
+                return []
+            # A range on the primary key instead of LIKE, which can't use it
+            rows = conn.execute(
+                "SELECT path, summary FROM project_files WHERE path >= ? AND path < ? ORDER BY path",
+                (prefix, prefix + "\uffff")
+            )
+            out = []
+            for path, summary in rows:
+                if "/" in path[len(prefix):]:
+                    continue
+                out.append((path, summary))
+                if len(out) >= limit:
+                    break
+        return out
+
+    def update_project_files(self, records, removed=()):
+        """Apply watcher results: records are (path, mtime_ns, size, hash, summary)."""
+        with self.batch():
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO project_files (path, mtime_ns, size, hash, summary) "
+                "VALUES (?, ?, ?, ?, ?)", records
+            )
+            self._conn.executemany("DELETE FROM project_files WHERE path = ?", [(p,) for p in removed])
+
+    @property
+    def index(self):
+        if self._index is None:
+            from .core.index import ChunkIndex
+            self._index = ChunkIndex(self.root)
+        return self._index
+
+    def relevant_snippets(self, query, token_budget=1500, top_k=8, exclude=()):
+        """Top-k chunks of tracked files relevant to `query`, within a token budget.
+
+        The index is refreshed first, which only re-reads files whose stat
+        changed and re-indexes those whose content hash differs.
+        """
+        if not self._files:
+            return []
+        self.index.update(self._files)
+        return self.index.select(query, token_budget=token_budget, top_k=top_k, exclude=exclude)
@@ -0,0 +1,172 @@
+# gotermix54/core/cache.py
+import hashlib
+import sqlite3
+import textwrap
+import threading
+import time
+from pathlib import Path
+
+CACHE_PATH = Path.home() / ".gotermix54" / "cache.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    mode TEXT NOT NULL,
+    model TEXT NOT NULL,
+    content TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed ON responses(accessed_at);
+CREATE TABLE IF NOT EXISTS stats (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+def normalize_prompt(prompt):
+    # Prompts are often built from indented triple-quoted strings; dedent and
+    # drop trailing whitespace so cosmetic differences share one entry.
+    # Inner whitespace is kept because it matters for code.
+    lines = [line.rstrip() for line in textwrap.dedent(prompt).splitlines()]
+    return "\n".join(lines).strip()
+
+
+class ResponseCache:
+    """Content-addressed AI response cache shared by all CLI processes.
+
+    Backed by SQLite in WAL mode so concurrent readers and writers in
+    separate processes don't corrupt each other. Entries expire per mode and
+    the least recently used ones are evicted once `max_bytes` is exceeded.
+    """
+
+    def __init__(self, path=CACHE_PATH, max_bytes=64 * 1024 * 1024, ttls=None):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.ttls = ttls or {}
+        self._conn = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(model, mode, prompt, temperature, max_tokens):
+        raw = "\x00".join([
+            model, mode, normalize_prompt(prompt), repr(float(temperature)), str(max_tokens)
+        ])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def connect(self):
+        # Opened lazily so commands that never talk to the AI never touch disk
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=5, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def get(self, key, mode):
+        ttl = self.ttls.get(mode)
+        if ttl == 0:
+            return None
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self.connect()
+                row = conn.execute(
+                    "SELECT content, created_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                with conn:
+                    if row is not None and ttl is not None and now - row[1] > ttl:
+                        conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                        row = None
+                    if row is None:
+                        self._bump(conn, "misses")
+                        return None
+                    conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+                    self._bump(conn, "hits")
+                return row[0]
+        except sqlite3.Error:
+            return None
+
+    def put(self, key, mode, model, content):
+        if self.ttls.get(mode) == 0:
+            return
+        now = time.time()
+        size = len(content.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        try:
+            with self._lock:
+                conn = self.connect()
+                with conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO responses "
+                        "(key, mode, model, content, size, created_at, accessed_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (key, mode, model, content, size, now, now)
+                    )
+                    self._evict(conn)
+        except sqlite3.Error:
+            pass
+
+    def _evict(self, conn):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        victims = []
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY accessed_at"):
+            victims.append((key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+        conn.executemany("DELETE FROM responses WHERE key = ?", victims)
+        self._bump(conn, "evictions", len(victims))
+
+    def _bump(self, conn, name, amount=1):
+        conn.execute(
+            "INSERT INTO stats (name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            (name, amount)
+        )
+
+    def stats(self):
+        with self._lock:
+            conn = self.connect()
+            counters = dict(conn.execute("SELECT name, value FROM stats"))
+            entries, size = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        hits = counters.get("hits", 0)
+        misses = counters.get("misses", 0)
+        lookups = hits + misses
+        return {
+            "entries": entries,
+            "size_bytes": size,
+            "max_bytes": self.max_bytes,
+            "hits": hits,
+            "misses": misses,
+            "evictions": counters.get("evictions", 0),
+            "hit_rate": hits / lookups if lookups else 0.0,
+        }
+
+    def clear(self):
+        with self._lock:
+            conn = self.connect()
+            with conn:
+                conn.execute("DELETE FROM responses")
+                conn.execute("DELETE FROM stats")
+
+
+def cache_settings(config):
+    """ResponseCache keyword arguments from a config (see DEFAULT_CONFIG["cache"])."""
+    conf = config.get("cache", {})
+    settings = {
+        "max_bytes": int(conf.get("max_mb", 64) * 1024 * 1024),
+        "ttls": conf.get("ttl", {}),
+    }
+    if conf.get("path"):
+        settings["path"] = Path(conf["path"]).expanduser()
+    return settings
@@ -0,0 +1,269 @@
+# gotermix54/core/conversation.py
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from .tokens import estimate_tokens
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS turns (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    content BLOB NOT NULL,
+    tokens INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS turns_session ON turns(session_id, id);
+"""
+
+SUMMARY_PROMPT = """Update the running summary of a conversation between a developer and you, their terminal assistant.
+Keep facts, decisions, file paths, commands, errors and open questions; drop small talk.
+Reply with the summary only, at most {words} words.
+
+Summary so far:
+{summary}
+
+Newer turns:
+{turns}"""
+
+# Hard cap on turns held in memory if summaries keep failing
+MAX_TURNS = 200
+
+
+class ChatStore:
+    """Chat sessions in .gotermix54/chat.db (SQLite, WAL).
+
+    Only what the next request can use is kept: a session's rolling
+    summary and the turns not folded into it yet, zlib-compressed.
+    """
+
+    def __init__(self, root=None):
+        self.path = (Path(root) if root else Path.cwd()) / ".gotermix54" / "chat.db"
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def connect(self):
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=5, check_same_thread=False,
+                                   isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def create(self, title=""):
+        now = time.time()
+        with self._lock:
+            cur = self.connect().execute(
+                "INSERT INTO sessions (title, summary, created_at, updated_at) VALUES (?, '', ?, ?)",
+                (title, now, now)
+            )
+            return cur.lastrowid
+
+    def latest(self):
+        with self._lock:
+            row = self.connect().execute(
+                "SELECT id FROM sessions ORDER BY updated_at DESC LIMIT 1"
+            ).fetchone()
+        return row[0] if row else None
+
+    def sessions(self, limit=20):
+        """[(id, title, updated_at)], most recent first."""
+        with self._lock:
+            return self.connect().execute(
+                "SELECT id, title, updated_at FROM sessions ORDER BY updated_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+
+    def load(self, session_id):
+        """(summary, [(turn_id, role, content, tokens)]) of a session."""
+        with self._lock:
+            conn = self.connect()
+            row = conn.execute("SELECT summary FROM sessions WHERE id = ?", (session_id,)).fetchone()
+            if row is None:
+                raise KeyError(session_id)
+            turns = [
+                (turn_id, role, zlib.decompress(content).decode("utf-8"), tokens)
+                for turn_id, role, content, tokens in conn.execute(
+                    "SELECT id, role, content, tokens FROM turns WHERE session_id = ? ORDER BY id",
+                    (session_id,)
+                )
+            ]
+        return row[0], turns
+
+    def append(self, session_id, role, content, tokens):
+        now = time.time()
+        with self._lock:
+            conn = self.connect()
+            with conn:
+                conn.execute("BEGIN")
+                cur = conn.execute(
+                    "INSERT INTO turns (session_id, role, content, tokens) VALUES (?, ?, ?, ?)",
+                    (session_id, role, zlib.compress(content.encode("utf-8")), tokens)
+                )
+                conn.execute(
+                    "UPDATE sessions SET updated_at = ?, "
+                    "title = CASE WHEN title = '' AND ? = 'user' THEN ? ELSE title END WHERE id = ?",
+                    (now, role, content[:60], session_id)
+                )
+            return cur.lastrowid
+
+    def fold(self, session_id, summary, upto):
+        """Replace turns up to id `upto` by `summary`."""
+        with self._lock:
+            conn = self.connect()
+            with conn:
+                conn.execute("BEGIN")
+                conn.execute("UPDATE sessions SET summary = ? WHERE id = ?", (summary, session_id))
+                conn.execute("DELETE FROM turns WHERE session_id = ? AND id <= ?", (session_id, upto))
+
+    def delete(self, session_id):
+        with self._lock:
+            conn = self.connect()
+            with conn:
+                conn.execute("BEGIN")
+                conn.execute("DELETE FROM turns WHERE session_id = ?", (session_id,))
+                conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+
+
+class Conversation:
+    """Multi-turn chat memory with a bounded prompt size.
+
+    `window()` returns the history to send with the next message: the
+    rolling summary of older turns plus as many recent turns as fit in
+    `token_budget`. When the unsummarized turns outgrow the budget, the
+    oldest ones are folded into the summary by a background completion,
+    so each request costs about the same however long the session runs.
+
+        history = conversation.window(prompt)
+        answer = ai.route(prompt, history=history)
+        conversation.add_exchange(prompt, answer)
+    """
+
+    def __init__(self, ai, store=None, session_id=None, token_budget=3000, summary_words=250):
+        self.ai = ai
+        self.store = store
+        self.token_budget = token_budget
+        self.summary_words = summary_words
+        self.summary = ""
+        self.turns = []  # [turn_id, role, content, tokens]; turn_id is None when not persisted
+        self.summarizing = None  # Future of the fold in flight
+        self.generation = 0  # bumped by clear(); stale folds are ignored
+        self._lock = threading.Lock()
+        self.session_id = session_id
+        if store is not None:
+            if session_id is None:
+                self.session_id = store.create()
+            self.summary, turns = store.load(self.session_id)
+            self.turns = [list(turn) for turn in turns]
+
+    @property
+    def summary_message(self):
+        if not self.summary:
+            return None
+        return {"role": "system", "content": f"Summary of the earlier conversation:\n{self.summary}"}
+
+    def window(self, prompt=""):
+        """Messages to send before `prompt`: the summary, then the newest turns that fit."""
+        with self._lock:
+            budget = self.token_budget - estimate_tokens(prompt)
+            messages = []
+            summary = self.summary_message
+            if summary is not None:
+                budget -= estimate_tokens(summary["content"])
+            for _, role, content, tokens in reversed(self.turns):
+                if tokens > budget:
+                    break
+                budget -= tokens
+                messages.append({"role": role, "content": content})
+            if summary is not None:
+                messages.append(summary)
+        messages.reverse()
+        return messages
+
+    def add(self, role, content):
+        tokens = estimate_tokens(content)
+        turn_id = self.store.append(self.session_id, role, content, tokens) if self.store else None
+        with self._lock:
+            self.turns.append([turn_id, role, content, tokens])
+            if len(self.turns) > MAX_TURNS:
+                del self.turns[:len(self.turns) - MAX_TURNS]
+        self.maybe_summarize()
+
+    def add_exchange(self, prompt, answer):
+        self.add("user", prompt)
+        self.add("assistant", str(answer))
+
+    def maybe_summarize(self):
+        """Fold the oldest turns into the summary once the turns outgrow the budget.
+
+        Folding goes down to half the budget, so it runs every few turns
+        rather than on each one.
+        """
+        with self._lock:
+            if self.summarizing is not None:
+                return
+            total = sum(turn[3] for turn in self.turns)
+            if total <= self.token_budget:
+                return
+            fold = []
+            while self.turns[len(fold):] and total > self.token_budget // 2:
+                turn = self.turns[len(fold)]
+                fold.append(turn)
+                total -= turn[3]
+            # Fold whole exchanges: never leave an answer without its question
+            while fold and len(fold) < len(self.turns) and self.turns[len(fold)][1] == "assistant":
+                fold.append(self.turns[len(fold)])
+            if not fold:
+                return
+            text = "\n\n".join(f"{role.capitalize()}: {content}" for _, role, content, _ in fold)
+            prompt = SUMMARY_PROMPT.format(words=self.summary_words, summary=self.summary or "(none)",
+                                           turns=text)
+            future = self.ai.submit(prompt, mode="reasoning", max_tokens=self.summary_words * 2,
+                                    use_cache=False, priority="background")
+            self.summarizing = future
+            generation = self.generation
+        future.add_done_callback(lambda f: self._folded(f, fold, generation))
+
+    def _folded(self, future, fold, generation):
+        try:
+            summary = future.result()
+        except Exception:
+            summary = None
+        with self._lock:
+            if generation != self.generation:
+                return
+            self.summarizing = None
+            if summary is None or not getattr(summary, "ok", True) or not summary.strip():
+                return  # keep the turns; the next add() tries again
+            # Folded turns are still the oldest ones, unless the cap dropped
+            # some of them meanwhile
+            folded = {id(turn) for turn in fold}
+            count = 0
+            while count < len(self.turns) and id(self.turns[count]) in folded:
+                count += 1
+            self.summary = summary.strip()
+            del self.turns[:count]
+            session_id = self.session_id
+            upto = max((turn[0] for turn in fold if turn[0] is not None), default=None)
+        if self.store is not None and upto is not None:
+            self.store.fold(session_id, self.summary, upto)
+
+    def clear(self):
+        """Start over in a fresh session (the old one stays on disk)."""
+        with self._lock:
+            self.summary = ""
+            self.turns = []
+            self.summarizing = None
+            self.generation += 1
+        if self.store is not None:
+            self.session_id = self.store.create()
@@ -0,0 +1,239 @@
+# gotermix54/core/daemon.py
+import contextlib
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+import traceback
+from pathlib import Path
+
+SOCKET_PATH = Path.home() / ".gotermix54" / "daemon.sock"
+PROTOCOL = 1
+
+# Commands the thin client hands to the daemon. Anything that reads stdin,
+# needs the caller's TTY or runs shell commands stays in-process.
+FORWARDABLE = {
+    ("explain",),
+    ("sys", "explain"),
+    ("cache", "stats"),
+    ("cache", "clear"),
+}
+
+
+def is_forwardable(argv):
+    if argv and argv[0].startswith("-"):
+        # Global options change how the router is built; run in-process
+        return False
+    words = [a for a in argv if not a.startswith("-")]
+    return any(tuple(words[:len(cmd)]) == cmd for cmd in FORWARDABLE)
+
+
+class SocketWriter:
+    """File-like object that streams writes to the client as JSON lines."""
+
+    def __init__(self, sock, channel):
+        self.sock = sock
+        self.channel = channel
+        self.encoding = "utf-8"
+
+    def write(self, text):
+        if isinstance(text, bytes):
+            # Lets click's binary-writer probe see this as a text stream
+            raise TypeError("text stream")
+        if text:
+            send(self.sock, {self.channel: text})
+        return len(text)
+
+    def flush(self):
+        pass
+
+    def isatty(self):
+        return False
+
+
+def send(sock, message):
+    sock.sendall((json.dumps(message) + "\n").encode("utf-8"))
+
+
+def read_messages(sock):
+    buffer = b""
+    while True:
+        chunk = sock.recv(65536)
+        if not chunk:
+            return
+        buffer += chunk
+        while b"\n" in buffer:
+            line, buffer = buffer.split(b"\n", 1)
+            yield json.loads(line)
+
+
+class Daemon:
+    """Keeps a warm AIRouter, config and per-project ContextManagers.
+
+    Commands run one at a time: they rely on the process-wide cwd and
+    stdout, which are switched to the client's for the duration of the
+    command. Provider calls still share the scheduler, cache and HTTP pool.
+    """
+
+    def __init__(self, path=SOCKET_PATH, ai=None):
+        self.path = Path(path)
+        self.started = time.time()
+        self.served = 0
+        self.lock = threading.Lock()
+        self.contexts = {}
+        self.watchers = {}
+        self.server = None
+
+        if ai is None:
+            from ..ai import AIRouter
+            ai = AIRouter()
+        self.ai = ai
+
+    def context_for(self, cwd):
+        if cwd not in self.contexts:
+            from ..context import ContextManager
+            self.contexts[cwd] = ContextManager(cwd)
+        # Only project roots get a watcher: clients also run commands from
+        # $HOME and other trees nobody wants watched
+        from .watcher import is_project_root, start_watcher
+        if self.watchers.get(cwd) is None and is_project_root(cwd):
+            self.watchers[cwd] = start_watcher(self.contexts[cwd], self.ai.config)
+        return self.contexts[cwd]
+
+    def run_command(self, sock, request):
+        from ..cli import cli
+        out, err = SocketWriter(sock, "out"), SocketWriter(sock, "err")
+        with self.lock:
+            self.served += 1
+            previous = os.getcwd()
+            try:
+                os.chdir(request["cwd"])
+                # Per-project config; only re-read when the files changed
+                from ..config import get_config
+                self.ai.apply_config(get_config())
+                obj = {"ai": self.ai, "config": self.ai.config,
+                       "context": self.context_for(request["cwd"])}
+                with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+                    code = invoke(cli, request["argv"], obj)
+            finally:
+                os.chdir(previous)
+        send(sock, {"exit": code})
+
+    def status(self):
+        return {
+            "pid": os.getpid(),
+            "uptime": time.time() - self.started,
+            "served": self.served,
+            "contexts": len(self.contexts),
+            "scheduler": self.ai.scheduler.stats(),
+        }
+
+    def serve_forever(self):
+        daemon = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                for request in read_messages(self.request):
+                    if request.get("version") != PROTOCOL:
+                        send(self.request, {"err": "protocol mismatch\n", "exit": 2})
+                    elif request.get("cmd") == "ping":
+                        send(self.request, {"status": daemon.status()})
+                    elif request.get("cmd") == "shutdown":
+                        send(self.request, {"ok": True})
+                        threading.Thread(target=daemon.server.shutdown).start()
+                    else:
+                        daemon.run_command(self.request, request)
+                    return
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.path.exists():
+            self.path.unlink()
+        old_umask = os.umask(0o177)
+        try:
+            self.server = socketserver.ThreadingUnixStreamServer(str(self.path), Handler)
+        finally:
+            os.umask(old_umask)
+        self.server.daemon_threads = True
+        try:
+            self.server.serve_forever()
+        finally:
+            self.server.server_close()
+            if self.path.exists():
+                self.path.unlink()
+
+
+def invoke(cli, argv, obj):
+    import click
+    try:
+        result = cli.main(args=list(argv), prog_name="gotermix54", obj=obj, standalone_mode=False)
+        return result if isinstance(result, int) else 0
+    except click.exceptions.Exit as e:
+        return e.exit_code
+    except click.ClickException as e:
+        e.show()
+        return e.exit_code
+    except click.Abort:
+        click.echo("Aborted!", err=True)
+        return 1
+    except SystemExit as e:
+        return e.code if isinstance(e.code, int) else 1
+    except Exception:
+        traceback.print_exc()
+        return 1
+
+
+def connect(path=SOCKET_PATH, timeout=0.2):
+    if not os.path.exists(path):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(str(path))
+    except OSError:
+        sock.close()
+        return None
+    sock.settimeout(None)
+    return sock
+
+
+def request(message, path=SOCKET_PATH):
+    """Send a control message (ping/shutdown); returns the reply or None."""
+    sock = connect(path)
+    if sock is None:
+        return None
+    with sock:
+        send(sock, dict(message, version=PROTOCOL))
+        for reply in read_messages(sock):
+            return reply
+    return None
+
+
+def forward(argv, stdout, stderr, path=SOCKET_PATH):
+    """Run argv in the daemon, streaming its output.
+
+    Returns the exit code, or None when no daemon answered and the caller
+    should run the command in-process.
+    """
+    if not is_forwardable(argv):
+        return None
+    sock = connect(path)
+    if sock is None:
+        return None
+    with sock:
+        try:
+            send(sock, {"version": PROTOCOL, "argv": list(argv), "cwd": os.getcwd()})
+        except OSError:
+            return None
+        for message in read_messages(sock):
+            if "out" in message:
+                stdout.write(message["out"])
+                stdout.flush()
+            if "err" in message:
+                stderr.write(message["err"])
+                stderr.flush()
+            if "exit" in message:
+                return message["exit"]
+    # Daemon went away mid-command
+    return 1
@@ -0,0 +1,201 @@
+# gotermix54/core/disk_usage.py
+import os
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+UsageRow = namedtuple("UsageRow", ["name", "is_dir", "size"])
+
+# Listing of one directory: what's needed to rescan it without scandir.
+# `own` leaves out files with several hard links; `links` holds their
+# ((st_dev, st_ino), size) so the scan can count each inode once.
+Listing = namedtuple("Listing", ["stamp", "own", "files", "subdirs", "links"])
+
+
+def human_size(value):
+    for unit in ("B", "K", "M", "G", "T"):
+        if value < 1024 or unit == "T":
+            return f"{value:.0f}{unit}" if unit == "B" else f"{value:.1f}{unit}"
+        value /= 1024
+
+
+def disk_bytes(st):
+    # Space actually used, like du; st_blocks is in 512-byte units
+    blocks = getattr(st, "st_blocks", None)
+    return blocks * 512 if blocks is not None else st.st_size
+
+
+class DiskUsage:
+    """Concurrent `du -x` with totals that fill in while the walk runs.
+
+    Every directory is one task for a pool of os.scandir workers. As each
+    finishes, its files' sizes are added to its own total and to every
+    ancestor's, so the sizes on screen grow towards their final values
+    instead of appearing only at the end. Directories are remembered by
+    (device, inode, mtime): a rescan stats each directory and reuses the
+    listing of the unchanged ones. Files rewritten in place don't bump
+    their directory's mtime, so `scan(root, full=True)` reads everything again.
+    Like du, a file with several hard links is counted once, where it's
+    first found.
+    """
+
+    def __init__(self, workers=None, progress_interval=0.2):
+        self.workers = workers or min(32, (os.cpu_count() or 1) * 4)
+        self.progress_interval = progress_interval
+        self.cache = {}     # dir path -> Listing, from earlier scans
+        self.listings = {}  # dir path -> Listing, from the current scan
+        self.totals = {}    # dir path -> bytes found so far below it
+        self.linked = set()  # (st_dev, st_ino) of hard-linked files already counted
+        self.root = None
+        self.scanning = False
+        self.dirs_done = 0
+        self.errors = 0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def covers(self, path):
+        """True if `path` lies inside the last scanned tree."""
+        path = os.path.abspath(os.fspath(path))
+        return self.root is not None and (path == self.root or path.startswith(self.root.rstrip(os.sep) + os.sep))
+
+    def _list(self, path, device):
+        """Listing of a directory, or None if it's unreadable or on another filesystem."""
+        try:
+            st = os.stat(path, follow_symlinks=False)
+        except OSError:
+            return None
+        if st.st_dev != device:
+            return None
+        stamp = (st.st_dev, st.st_ino, st.st_mtime_ns)
+        cached = self.cache.get(path)
+        if cached is not None and cached.stamp == stamp:
+            return cached
+        files, subdirs, links = [], [], []
+        own = disk_bytes(st)
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.name)
+                        else:
+                            info = entry.stat(follow_symlinks=False)
+                            size = disk_bytes(info)
+                            files.append((entry.name, size))
+                            if info.st_nlink > 1:
+                                links.append(((info.st_dev, info.st_ino), size))
+                            else:
+                                own += size
+                    except OSError:
+                        continue
+        except OSError:
+            return Listing(stamp, own, (), (), ())
+        return Listing(stamp, own, tuple(files), tuple(subdirs), tuple(links))
+
+    def scan(self, root, on_progress=None, full=False):
+        """Walk `root` (blocking); on_progress() is called at most every progress_interval."""
+        root = os.path.abspath(os.fspath(root))
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+            if full:
+                self.cache = {}
+            self.root = root
+            self.listings = {}
+            self.totals = {root: 0}
+            self.linked = set()
+            self.scanning = True
+            self.dirs_done = 0
+            self.errors = 0
+        try:
+            device = os.stat(root).st_dev
+        except OSError:
+            self.scanning = False
+            self.errors = 1
+            return self
+        last_report = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="gotermix-du") as pool:
+            pending = {pool.submit(self._list, root, device): root}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                with self._lock:
+                    if generation != self._generation:
+                        # Cancelled, or superseded by a newer scan
+                        for future in pending:
+                            future.cancel()
+                        return self
+                    for future in done:
+                        path = pending.pop(future)
+                        listing = future.result()
+                        if listing is None:
+                            self.errors += 1
+                            continue
+                        self.listings[path] = listing
+                        self.dirs_done += 1
+                        own = listing.own
+                        for key, size in listing.links:
+                            if key not in self.linked:
+                                self.linked.add(key)
+                                own += size
+                        self._add(path, own)
+                        for name in listing.subdirs:
+                            child = os.path.join(path, name)
+                            pending[pool.submit(self._list, child, device)] = child
+                now = time.monotonic()
+                if on_progress is not None and now - last_report >= self.progress_interval:
+                    last_report = now
+                    on_progress()
+        with self._lock:
+            if generation != self._generation:
+                return self
+            # Keep listings outside this tree (an earlier, wider scan) too
+            self.cache = {p: l for p, l in self.cache.items() if not self.covers(p)}
+            self.cache.update(self.listings)
+            self.scanning = False
+        if on_progress is not None:
+            on_progress()
+        return self
+
+    def _add(self, path, size):
+        # Credit a directory and every ancestor up to the scan root
+        root = self.root
+        while True:
+            self.totals[path] = self.totals.get(path, 0) + size
+            if path == root:
+                return
+            parent = os.path.dirname(path)
+            if parent == path:
+                return
+            path = parent
+
+    def scan_async(self, root, on_progress=None, full=False):
+        thread = threading.Thread(target=self.scan, args=(root, on_progress, full),
+                                  name="gotermix-du-scan", daemon=True)
+        thread.start()
+        return thread
+
+    def cancel(self):
+        with self._lock:
+            self._generation += 1
+            self.scanning = False
+
+    def children(self, path):
+        """[UsageRow] of a scanned directory, biggest first (sizes so far while scanning)."""
+        path = os.path.abspath(os.fspath(path))
+        with self._lock:
+            listing = self.listings.get(path)
+            if listing is None and not self.scanning:
+                listing = self.cache.get(path)
+            if listing is None:
+                return []
+            rows = [UsageRow(name, False, size) for name, size in listing.files]
+            rows.extend(
+                UsageRow(name, True, self.totals.get(os.path.join(path, name), 0))
+                for name in listing.subdirs
+            )
+        rows.sort(key=lambda row: (-row.size, row.name))
+        return rows
+
+    def total(self, path):
+        return self.totals.get(os.path.abspath(os.fspath(path)), 0)
@@ -1,9 +1,15 @@
 # gotermix54/core/executor.py
+import os
+import selectors
+import signal
 import subprocess
 import sys
-from rich.console import Console
+import time
+from collections import deque, namedtuple
 
-console = Console()
+ExecResult = namedtuple("ExecResult", ["returncode", "stdout", "stderr", "timed_out", "duration"])
+
+MAX_LINE_BYTES = 64 * 1024
 
 def run_shell_command(cmd, shell=True, capture_output=False):
     try:
@@ -14,5 +20,199 @@ def run_shell_command(cmd, shell=True, capture_output=False):
             result = subprocess.run(cmd, shell=shell)
             return None, None, result.returncode
     except Exception as e:
-        console.print(f"[red]Execution failed: {e}[/red]")
+        # rich is only needed on this path; keep passthrough startup lean
+        from rich.console import Console
+        Console().print(f"[red]Execution failed: {e}[/red]")
         return None, str(e), -1
+
+class TailBuffer:
+    """Keeps only the last `max_lines` lines / `max_bytes` bytes of output."""
+
+    def __init__(self, max_lines=200, max_bytes=64 * 1024):
+        self.lines = deque()
+        self.max_lines = max_lines
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.dropped = 0
+
+    def append(self, line):
+        self.lines.append(line)
+        self.size += len(line)
+        while self.lines and (len(self.lines) > self.max_lines or self.size > self.max_bytes):
+            self.size -= len(self.lines.popleft())
+            self.dropped += 1
+
+    def text(self):
+        return "\n".join(self.lines)
+
+class StreamingCommand:
+    """Run a shell command and stream its output line by line.
+
+    Iterating yields ("stdout" | "stderr", line) as output arrives; only a
+    bounded tail of each channel is kept. The command runs in its own process
+    group, which is killed on wall-clock or idle timeout, or when iteration
+    is abandoned (e.g. Ctrl-C in the caller). `result` is set once the
+    iteration finishes.
+
+        cmd = StreamingCommand("make test", timeout=600)
+        for channel, line in cmd:
+            ...
+        cmd.result.returncode
+    """
+
+    def __init__(self, cmd, shell=True, timeout=None, idle_timeout=None,
+                 tail_lines=200, tail_bytes=64 * 1024, cwd=None, env=None):
+        self.cmd = cmd
+        self.shell = shell
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.cwd = cwd
+        self.env = env
+        self.tails = {
+            "stdout": TailBuffer(tail_lines, tail_bytes),
+            "stderr": TailBuffer(tail_lines, tail_bytes),
+        }
+        self.timed_out = None  # "wall" or "idle" once a timeout fires
+        self.cancelled = False
+        self.result = None
+        self.proc = None
+
+    def cancel(self):
+        """Kill the running command from another thread; iteration then ends."""
+        self.cancelled = True
+        if self.proc is not None:
+            self._kill()
+
+    def run(self, on_line=None):
+        """Drain the command, calling on_line(channel, line); returns ExecResult."""
+        for channel, line in self:
+            if on_line is not None:
+                on_line(channel, line)
+        return self.result
+
+    def __iter__(self):
+        start = time.monotonic()
+        if self.cancelled:
+            self.result = ExecResult(-1, "", "", None, 0.0)
+            return
+        try:
+            self.proc = subprocess.Popen(
+                self.cmd, shell=self.shell, cwd=self.cwd, env=self.env,
+                stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                start_new_session=True
+            )
+        except OSError as e:
+            self.tails["stderr"].append(str(e))
+            self.result = ExecResult(-1, "", str(e), None, 0.0)
+            return
+        if self.cancelled:
+            # cancel() raced with the spawn
+            self._kill()
+
+        selector = selectors.DefaultSelector()
+        pending = {}
+        for channel, pipe in (("stdout", self.proc.stdout), ("stderr", self.proc.stderr)):
+            os.set_blocking(pipe.fileno(), False)
+            selector.register(pipe, selectors.EVENT_READ, channel)
+            pending[channel] = b""
+
+        last_output = start
+        drained = False
+        try:
+            while selector.get_map():
+                wait = self._next_deadline(start, last_output)
+                if wait is not None and wait <= 0:
+                    self._kill()
+                    # The last, unterminated line is often the error message
+                    for channel in pending:
+                        if pending[channel]:
+                            yield self._emit(channel, pending[channel])
+                            pending[channel] = b""
+                    break
+                events = selector.select(wait)
+                for key, _ in events:
+                    channel = key.data
+                    try:
+                        chunk = os.read(key.fileobj.fileno(), 65536)
+                    except BlockingIOError:
+                        continue
+                    if not chunk:
+                        selector.unregister(key.fileobj)
+                        if pending[channel]:
+                            yield self._emit(channel, pending[channel])
+                            pending[channel] = b""
+                        continue
+                    last_output = time.monotonic()
+                    data = pending[channel] + chunk
+                    *lines, pending[channel] = data.split(b"\n")
+                    for raw in lines:
+                        yield self._emit(channel, raw)
+                    # A newline-free firehose must not grow memory either
+                    while len(pending[channel]) > MAX_LINE_BYTES:
+                        yield self._emit(channel, pending[channel][:MAX_LINE_BYTES])
+                        pending[channel] = pending[channel][MAX_LINE_BYTES:]
+            else:
+                drained = True
+        finally:
+            selector.close()
+            # Whatever partial lines weren't yielded still belong in the tails
+            for channel, data in pending.items():
+                if data:
+                    self._emit(channel, data)
+            if not drained and self.timed_out is None:
+                # Abandoned mid-stream (consumer stopped or Ctrl-C)
+                self._kill()
+            try:
+                # Pipes closed, but the process may linger; the wall clock
+                # still applies
+                remaining = None
+                if self.timeout is not None:
+                    remaining = max(0.0, start + self.timeout - time.monotonic())
+                returncode = self.proc.wait(remaining)
+            except subprocess.TimeoutExpired:
+                self.timed_out = "wall"
+                self._kill()
+                returncode = self.proc.wait()
+            self.proc.stdout.close()
+            self.proc.stderr.close()
+            self.result = ExecResult(
+                returncode,
+                self.tails["stdout"].text(),
+                self.tails["stderr"].text(),
+                self.timed_out,
+                time.monotonic() - start
+            )
+
+    def _next_deadline(self, start, last_output):
+        now = time.monotonic()
+        waits = []
+        if self.timeout is not None:
+            waits.append(start + self.timeout - now)
+            if waits[-1] <= 0:
+                self.timed_out = "wall"
+        if self.idle_timeout is not None:
+            waits.append(last_output + self.idle_timeout - now)
+            if waits[-1] <= 0 and self.timed_out is None:
+                self.timed_out = "idle"
+        return min(waits) if waits else None
+
+    def _emit(self, channel, raw):
+        line = raw.decode("utf-8", errors="replace").rstrip("\r")
+        self.tails[channel].append(line)
+        return channel, line
+
+    def _kill(self, grace=2.0):
+        try:
+            pgid = os.getpgid(self.proc.pid)
+        except OSError:
+            return
+        for sig in (signal.SIGTERM, signal.SIGKILL):
+            try:
+                os.killpg(pgid, sig)
+            except OSError:
+                return
+            try:
+                self.proc.wait(grace)
+                return
+            except subprocess.TimeoutExpired:
+                continue
@@ -0,0 +1,373 @@
+# gotermix54/core/file_index.py
+import os
+import re
+import sqlite3
+import threading
+import zlib
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from .watcher import IGNORED_DIRS
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS dirs (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    entries BLOB NOT NULL
+);
+"""
+
+
+def translate_glob(pattern):
+    """Regex source for one gitignore glob (no anchoring)."""
+    out = []
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+            continue
+        if pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+            continue
+        if c == "*":
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            end = pattern.find("]", i + 2)
+            if end == -1:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1:end]
+                if body[0] in "!^":
+                    body = "^" + body[1:]
+                out.append(f"[{body.replace(chr(92), chr(92) * 2)}]")
+                i = end
+        elif c == "\\" and i + 1 < len(pattern):
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+
+class IgnoreRules:
+    """The patterns of one .gitignore, matched against paths relative to its directory.
+
+    Rules are kept in order (the last match wins, `!` re-includes). Files
+    without negations, the common case, are checked with two combined
+    regexes instead of one regex per rule.
+    """
+
+    def __init__(self, lines):
+        self.rules = []  # (regex, negate, dir_only)
+        for line in lines:
+            line = line.rstrip("\r\n")
+            if not line.strip() or line.startswith("#"):
+                continue
+            if not line.endswith("\\ "):
+                line = line.rstrip()
+            negate = line.startswith("!")
+            if negate:
+                line = line[1:]
+            elif line.startswith("\\"):
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            if not line:
+                continue
+            # A slash anywhere but the end anchors the pattern to this directory
+            source = translate_glob(line.lstrip("/"))
+            if "/" not in line:
+                source = "(?:.*/)?" + source
+            self.rules.append((source, negate, dir_only))
+        self.negated = any(negate for _, negate, _ in self.rules)
+        if self.negated:
+            self.compiled = [(re.compile(source), negate, dir_only) for source, negate, dir_only in self.rules]
+        else:
+            self.any = self._combine(source for source, _, dir_only in self.rules if not dir_only)
+            self.dirs = self._combine(source for source, _, dir_only in self.rules if dir_only)
+
+    @staticmethod
+    def _combine(sources):
+        sources = list(sources)
+        return re.compile("|".join(f"(?:{s})" for s in sources)) if sources else None
+
+    def match(self, rel_path, is_dir):
+        """True/False if a rule decides, None if none applies."""
+        if not self.negated:
+            if self.any is not None and self.any.fullmatch(rel_path):
+                return True
+            if is_dir and self.dirs is not None and self.dirs.fullmatch(rel_path):
+                return True
+            return None
+        decision = None
+        for regex, negate, dir_only in self.compiled:
+            if (is_dir or not dir_only) and regex.fullmatch(rel_path):
+                decision = not negate
+        return decision
+
+    @classmethod
+    def read(cls, path):
+        try:
+            with open(path, encoding="utf-8", errors="replace") as f:
+                rules = cls(f)
+        except OSError:
+            return None
+        return rules if rules.rules else None
+
+
+def ignored(chain, rel_path, is_dir):
+    """Apply the .gitignore chain [(base_dir, IgnoreRules)], deepest last."""
+    decision = False
+    for base, rules in chain:
+        decided = rules.match(rel_path[len(base) + 1:] if base else rel_path, is_dir)
+        if decided is not None:
+            decision = decided
+    return decision
+
+
+def fuzzy_patterns(query):
+    """Regexes for the ranking tiers of `query`, best first.
+
+    Substring of the file name, substring of the path, subsequence of the
+    file name, subsequence of the path. None is anchored at line starts:
+    each begins with the query's first character, which `re` scans for
+    quickly (but not under IGNORECASE, so callers search lower-cased text
+    for lower-case queries), and subsequences use `[^\nX]*X` steps that
+    never backtrack far.
+    """
+    query = "".join(query.split())
+    text = re.escape(query)
+
+    def subsequence(extra=""):
+        first, rest = re.escape(query[0]), query[1:]
+        return first + "".join(f"[^\\n{extra}{re.escape(c)}]*{re.escape(c)}" for c in rest)
+
+    if "/" in query:
+        # Can't be inside a file name: only the path tiers apply
+        sources = (text, subsequence())
+    else:
+        sources = (f"{text}[^\\n/]*$", text, f"{subsequence('/')}[^\\n/]*$", subsequence())
+    return [re.compile(source, re.MULTILINE) for source in sources]
+
+
+class FileIndex:
+    """Project-wide list of files for fuzzy finding.
+
+    The tree is walked with a thread pool, one directory per task,
+    honouring .gitignore files and the watcher's IGNORED_DIRS. Each
+    directory's listing is kept with its mtime in .gotermix54/files.db, so
+    a refresh only re-reads directories that changed (adding, removing or
+    renaming an entry bumps the directory's mtime); unchanged ones cost a
+    single stat.
+    """
+
+    def __init__(self, root=None, workers=None):
+        self.root = Path(root) if root else Path.cwd()
+        self.db_path = self.root / ".gotermix54" / "files.db"
+        self.workers = workers or min(32, (os.cpu_count() or 1) * 4)
+        self.listings = {}  # rel dir ("" = root) -> (mtime_ns, ((name, is_dir), ...))
+        self.rules = {}  # rel dir -> ((mtime_ns, size) of its .gitignore, IgnoreRules or None)
+        self.paths = ()
+        self.blob = ""  # paths by length, joined by newlines: what search() scans
+        self.folded = ""  # blob.lower(), for case-insensitive queries
+        self.building = False
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def connect(self):
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), timeout=5, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def load(self):
+        """Use the stored index (possibly stale) until refresh() has run."""
+        if not self.db_path.exists():
+            return self
+        try:
+            with self._lock:
+                rows = self.connect().execute("SELECT path, mtime_ns, entries FROM dirs").fetchall()
+        except sqlite3.Error:
+            return self
+        listings = {}
+        for path, mtime, data in rows:
+            names = zlib.decompress(data).decode("utf-8").split("\n") if data else ()
+            listings[path] = (mtime, tuple((n.rstrip("/"), n.endswith("/")) for n in names if n))
+        self._publish(listings, self._walk_cached(listings))
+        return self
+
+    def refresh(self):
+        """Re-walk the tree, re-reading only directories whose mtime changed."""
+        self.building = True
+        try:
+            old = self.listings
+            listings, paths = self._walk(old)
+            changed = [(rel, entry) for rel, entry in listings.items() if old.get(rel) != entry]
+            removed = [rel for rel in old if rel not in listings]
+            self._publish(listings, paths)
+            self._store(changed, removed)
+        finally:
+            self.building = False
+        return self
+
+    def refresh_async(self, on_done=None):
+        def run():
+            try:
+                self.refresh()
+            finally:
+                if on_done is not None:
+                    on_done()
+
+        thread = threading.Thread(target=run, name="gotermix-file-index", daemon=True)
+        thread.start()
+        return thread
+
+    def _publish(self, listings, paths):
+        paths.sort()
+        # Shortest first, so each tier's first matches are its best ones
+        blob = "\n".join(sorted(paths, key=len))
+        folded = blob.lower()
+        if len(folded) != len(blob):
+            folded = None  # lower() changed some lengths; fall back to IGNORECASE
+        with self._lock:
+            self.listings, self.paths, self.blob, self.folded = listings, tuple(paths), blob, folded
+
+    def _store(self, changed, removed):
+        if not changed and not removed:
+            return
+        rows = [
+            (rel, mtime, zlib.compress("\n".join(n + "/" if d else n for n, d in entries).encode("utf-8")))
+            for rel, (mtime, entries) in changed
+        ]
+        try:
+            with self._lock:
+                conn = self.connect()
+                with conn:
+                    conn.executemany("INSERT OR REPLACE INTO dirs (path, mtime_ns, entries) VALUES (?, ?, ?)", rows)
+                    conn.executemany("DELETE FROM dirs WHERE path = ?", [(rel,) for rel in removed])
+        except sqlite3.Error:
+            pass  # the index still works from memory; it's rebuilt next time
+
+    def _list(self, rel, cached):
+        """(mtime_ns, entries) of a directory, reusing `cached` when its mtime matches."""
+        full = os.path.join(self.root, rel) if rel else str(self.root)
+        try:
+            mtime = os.stat(full).st_mtime_ns
+            if cached is not None and cached[0] == mtime:
+                return cached
+            entries = []
+            with os.scandir(full) as it:
+                for entry in it:
+                    try:
+                        entries.append((entry.name, entry.is_dir(follow_symlinks=False)))
+                    except OSError:
+                        continue
+        except OSError:
+            return None
+        entries.sort()
+        return mtime, tuple(entries)
+
+    def _ignore_rules(self, rel):
+        """A directory's parsed .gitignore, re-read only when the file itself changed.
+
+        Editing a .gitignore doesn't touch its directory's mtime, so the
+        listing cache can't tell; the file's own stat can.
+        """
+        path = os.path.join(self.root, rel, ".gitignore")
+        try:
+            st = os.stat(path)
+        except OSError:
+            self.rules.pop(rel, None)
+            return None
+        stamp = (st.st_mtime_ns, st.st_size)
+        cached = self.rules.get(rel)
+        if cached is None or cached[0] != stamp:
+            cached = self.rules[rel] = (stamp, IgnoreRules.read(path))
+        return cached[1]
+
+    def _expand(self, rel, listing, chain, paths):
+        """Record a directory's files; returns [(subdir, chain)] to descend into."""
+        if any(name == ".gitignore" and not is_dir for name, is_dir in listing[1]):
+            rules = self._ignore_rules(rel)
+            if rules is not None:
+                chain = chain + [(rel, rules)]
+        prefix = rel + "/" if rel else ""
+        children = []
+        for name, is_dir in listing[1]:
+            path = prefix + name
+            if is_dir:
+                if name not in IGNORED_DIRS and not ignored(chain, path, True):
+                    children.append((path, chain))
+            elif not ignored(chain, path, False):
+                paths.append(path)
+        return children
+
+    def _walk(self, old):
+        listings = {}
+        paths = []
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="gotermix-index") as pool:
+            pending = {pool.submit(self._list, "", old.get("")): ("", [])}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    rel, chain = pending.pop(future)
+                    listing = future.result()
+                    if listing is None:
+                        continue
+                    listings[rel] = listing
+                    for child, child_chain in self._expand(rel, listing, chain, paths):
+                        pending[pool.submit(self._list, child, old.get(child))] = (child, child_chain)
+        return listings, paths
+
+    def _walk_cached(self, listings):
+        """Paths from stored listings alone, without touching the tree."""
+        paths = []
+        stack = [("", [])]
+        while stack:
+            rel, chain = stack.pop()
+            listing = listings.get(rel)
+            if listing is not None:
+                stack.extend(self._expand(rel, listing, chain, paths))
+        return paths
+
+    def search(self, query, limit=50):
+        """Paths matching `query` (fuzzy, smart-case), best first.
+
+        Matches are ranked by tier (see fuzzy_patterns), then shorter paths
+        first. The regexes scan one joined string that is already ordered
+        by length, so a tier stops after `limit` hits. A query with upper
+        case letters is case-sensitive.
+        """
+        with self._lock:
+            blob, folded = self.blob, self.folded
+        if not "".join(query.split()):
+            return []
+        patterns = fuzzy_patterns(query)
+        haystack = blob
+        if query == query.lower():
+            if folded is not None:
+                haystack = folded  # same offsets as blob
+            else:
+                patterns = [re.compile(p.pattern, re.MULTILINE | re.IGNORECASE) for p in patterns]
+        results = []
+        seen = set()  # line starts already taken by a better tier
+        for pattern in patterns:
+            for match in pattern.finditer(haystack):
+                start = blob.rfind("\n", 0, match.start()) + 1
+                if start in seen:
+                    continue
+                seen.add(start)
+                end = blob.find("\n", match.end())
+                results.append(blob[start:end] if end != -1 else blob[start:])
+                if len(results) >= limit:
+                    return results
+        return results
@@ -0,0 +1,122 @@
+# gotermix54/core/history.py
+import math
+from array import array
+
+SPARKS = "▁▂▃▄▅▆▇█"
+
+# snapshot key -> (label, unit); per-core CPU is added per core
+METRICS = {
+    "cpu": ("CPU", "%"),
+    "memory_percent": ("Memory", "%"),
+    "swap_percent": ("Swap", "%"),
+    "disk_read_rate": ("Disk read", "B/s"),
+    "disk_write_rate": ("Disk write", "B/s"),
+    "net_recv_rate": ("Net in", "B/s"),
+    "net_sent_rate": ("Net out", "B/s"),
+}
+
+
+class Ring:
+    """Fixed-size ring of floats on array('d'): constant memory, O(1) append."""
+
+    def __init__(self, size):
+        self.data = array('d', bytes(8 * size))
+        self.size = size
+        self.pos = 0
+        self.count = 0
+
+    def append(self, value):
+        self.data[self.pos] = value
+        self.pos = (self.pos + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+
+    def values(self, n=None):
+        """The last n values (all if None), oldest first."""
+        n = self.count if n is None else min(n, self.count)
+        start = (self.pos - n) % self.size
+        if start + n <= self.size:
+            return self.data[start:start + n]
+        return self.data[start:] + self.data[:self.pos]
+
+    def __len__(self):
+        return self.count
+
+
+class Series:
+    """One metric at several resolutions.
+
+    Level 0 keeps every sample; each coarser level keeps the mean and the
+    max of `step` consecutive samples, so a day-long window costs a few
+    thousand floats and spikes survive downsampling.
+    """
+
+    def __init__(self, window=3600, levels=((60, 1440),)):
+        self.raw = Ring(window)
+        self.levels = [(step, Ring(size), Ring(size)) for step, size in levels]
+        self.pending = [[0.0, -math.inf, 0] for _ in self.levels]  # sum, max, n
+
+    def append(self, value):
+        self.raw.append(value)
+        for (step, means, peaks), acc in zip(self.levels, self.pending):
+            acc[0] += value
+            acc[1] = max(acc[1], value)
+            acc[2] += 1
+            if acc[2] == step:
+                means.append(acc[0] / step)
+                peaks.append(acc[1])
+                acc[:] = [0.0, -math.inf, 0]
+
+    def values(self, n=None, level=0, peaks=False):
+        if level == 0:
+            return self.raw.values(n)
+        _, means, maxes = self.levels[level - 1]
+        return (maxes if peaks else means).values(n)
+
+    def stats(self, n=None, level=0):
+        """(min, max, p95) over the last n values, or None when empty."""
+        values = sorted(self.values(n, level))
+        if not values:
+            return None
+        return values[0], values[-1], values[min(len(values) - 1, int(0.95 * len(values)))]
+
+
+class MetricHistory:
+    """Ring-buffer history of the sampler's metrics; subscribe `record` to a Sampler."""
+
+    def __init__(self, window=3600, levels=((60, 1440),)):
+        self.window = window
+        self.levels = tuple(tuple(level) for level in levels)
+        self.series = {}
+
+    def get(self, name):
+        series = self.series.get(name)
+        if series is None:
+            series = self.series[name] = Series(self.window, self.levels)
+        return series
+
+    def record(self, snapshot):
+        for name in METRICS:
+            if name in snapshot:
+                self.get(name).append(float(snapshot[name]))
+        for i, value in enumerate(snapshot.get("cpu_per_core", ())):
+            self.get(f"cpu{i}").append(float(value))
+
+
+def sparkline(values, width=40, lo=None, hi=None):
+    """Unicode sparkline of the last `width` values, scaled to lo..hi."""
+    values = list(values)[-width:]
+    if not values:
+        return ""
+    lo = min(values) if lo is None else lo
+    hi = max(values) if hi is None else hi
+    span = (hi - lo) or 1.0
+    top = len(SPARKS) - 1
+    return "".join(SPARKS[max(0, min(top, int((v - lo) / span * top + 0.5)))] for v in values)
+
+
+def human_rate(value):
+    for unit in ("B", "K", "M", "G"):
+        if value < 1024:
+            return f"{value:.0f}{unit}/s" if unit == "B" else f"{value:.1f}{unit}/s"
+        value /= 1024
+    return f"{value:.1f}T/s"
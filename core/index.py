@@ -0,0 +1,210 @@
+# gotermix54/core/index.py
+import hashlib
+import math
+import re
+import sqlite3
+import threading
+from collections import Counter
+from pathlib import Path
+from .tokens import estimate_tokens
+
+CHUNK_LINES = 40
+MAX_FILE_BYTES = 1024 * 1024
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+WORD = re.compile(r"[A-Za-z][A-Za-z0-9]*|\d+")
+CAMEL = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    path TEXT PRIMARY KEY,
+    hash TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS chunks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    path TEXT NOT NULL,
+    start_line INTEGER NOT NULL,
+    end_line INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS chunks_path ON chunks(path);
+CREATE TABLE IF NOT EXISTS postings (
+    term TEXT NOT NULL,
+    chunk_id INTEGER NOT NULL,
+    tf INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS postings_term ON postings(term);
+CREATE INDEX IF NOT EXISTS postings_chunk ON postings(chunk_id);
+"""
+
+
+def tokenize(text):
+    """Lower-cased words, with camelCase and snake_case split into parts too."""
+    terms = []
+    for word in WORD.findall(text):
+        lower = word.lower()
+        terms.append(lower)
+        parts = CAMEL.findall(word)
+        if len(parts) > 1:
+            terms.extend(p.lower() for p in parts)
+    return terms
+
+
+def split_chunks(text, lines_per_chunk=CHUNK_LINES):
+    lines = text.splitlines()
+    for start in range(0, len(lines), lines_per_chunk):
+        body = "\n".join(lines[start:start + lines_per_chunk])
+        if body.strip():
+            yield start + 1, min(start + lines_per_chunk, len(lines)), body
+
+
+class ChunkIndex:
+    """Incremental BM25 index over the project's tracked files.
+
+    Files are split into fixed line windows and stored with their postings
+    in .gotermix54/index.db, next to the context store. `update()` only
+    re-reads files whose mtime/size changed and only re-indexes them when
+    the content hash differs.
+    """
+
+    def __init__(self, root=None):
+        self.root = Path(root) if root else Path.cwd()
+        self.db_path = self.root / ".gotermix54" / "index.db"
+        self._conn = None
+        self._lock = threading.RLock()
+
+    def connect(self):
+        with self._lock:
+            if self._conn is None:
+                self.db_path.parent.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(str(self.db_path), timeout=5, check_same_thread=False)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.executescript(SCHEMA)
+                self._conn = conn
+            return self._conn
+
+    def update(self, paths):
+        """Bring the index in line with `paths`; returns how many were re-indexed."""
+        wanted = set(paths)
+        changed = 0
+        with self._lock:
+            conn = self.connect()
+            known = {row[0]: row[1:] for row in conn.execute("SELECT path, hash, mtime_ns, size FROM docs")}
+            with conn:
+                for path in set(known) - wanted:
+                    self._drop(conn, path)
+                for path in sorted(wanted):
+                    if self._refresh(conn, path, known.get(path)):
+                        changed += 1
+        return changed
+
+    def update_file(self, path):
+        with self._lock:
+            conn = self.connect()
+            row = conn.execute("SELECT hash, mtime_ns, size FROM docs WHERE path = ?", (path,)).fetchone()
+            with conn:
+                return self._refresh(conn, path, row)
+
+    def _refresh(self, conn, path, known):
+        full = self.root / path
+        try:
+            st = full.stat()
+        except OSError:
+            if known:
+                self._drop(conn, path)
+            return False
+        if known and known[1] == st.st_mtime_ns and known[2] == st.st_size:
+            return False
+        if st.st_size > MAX_FILE_BYTES:
+            return False
+        try:
+            data = full.read_bytes()
+        except OSError:
+            return False
+        digest = hashlib.sha1(data).hexdigest()
+        if known and known[0] == digest:
+            # Touched but unchanged: just remember the new stat
+            conn.execute("UPDATE docs SET mtime_ns = ?, size = ? WHERE path = ?",
+                         (st.st_mtime_ns, st.st_size, path))
+            return False
+
+        self._drop(conn, path)
+        text = data.decode("utf-8", errors="replace")
+        for start, end, body in split_chunks(text):
+            terms = Counter(tokenize(body))
+            cur = conn.execute(
+                "INSERT INTO chunks (path, start_line, end_line, length, text) VALUES (?, ?, ?, ?, ?)",
+                (path, start, end, sum(terms.values()), body)
+            )
+            conn.executemany(
+                "INSERT INTO postings (term, chunk_id, tf) VALUES (?, ?, ?)",
+                [(term, cur.lastrowid, tf) for term, tf in terms.items()]
+            )
+        conn.execute("INSERT OR REPLACE INTO docs (path, hash, mtime_ns, size) VALUES (?, ?, ?, ?)",
+                     (path, digest, st.st_mtime_ns, st.st_size))
+        return True
+
+    def _drop(self, conn, path):
+        conn.execute("DELETE FROM postings WHERE chunk_id IN (SELECT id FROM chunks WHERE path = ?)", (path,))
+        conn.execute("DELETE FROM chunks WHERE path = ?", (path,))
+        conn.execute("DELETE FROM docs WHERE path = ?", (path,))
+
+    def search(self, query, top_k=8, exclude=()):
+        """Return up to top_k (score, path, start_line, end_line, text), best first."""
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+        with self._lock:
+            conn = self.connect()
+            total, avg_len = conn.execute("SELECT COUNT(*), AVG(length) FROM chunks").fetchone()
+            if not total:
+                return []
+            avg_len = avg_len or 1.0
+            scores = Counter()
+            for term in terms:
+                rows = conn.execute(
+                    "SELECT p.chunk_id, p.tf, c.length, c.path FROM postings p "
+                    "JOIN chunks c ON c.id = p.chunk_id WHERE p.term = ?", (term,)
+                ).fetchall()
+                if not rows:
+                    continue
+                idf = math.log(1 + (total - len(rows) + 0.5) / (len(rows) + 0.5))
+                for chunk_id, tf, length, path in rows:
+                    if path in exclude:
+                        continue
+                    norm = K1 * (1 - B + B * length / avg_len)
+                    scores[chunk_id] += idf * tf * (K1 + 1) / (tf + norm)
+
+            best = scores.most_common(top_k)
+            if not best:
+                return []
+            marks = ",".join("?" * len(best))
+            rows = {
+                row[0]: row[1:] for row in conn.execute(
+                    f"SELECT id, path, start_line, end_line, text FROM chunks WHERE id IN ({marks})",
+                    [chunk_id for chunk_id, _ in best]
+                )
+            }
+        return [(score,) + rows[chunk_id] for chunk_id, score in best]
+
+    def select(self, query, token_budget=1500, top_k=8, exclude=()):
+        """Best-scoring snippets that fit in `token_budget` tokens."""
+        picked, used = [], 0
+        for score, path, start, end, text in self.search(query, top_k=top_k, exclude=exclude):
+            cost = estimate_tokens(text) + 10
+            if used + cost > token_budget:
+                continue
+            picked.append((path, start, end, text))
+            used += cost
+        return picked
+
+
+def format_snippets(snippets):
+    return "\n\n".join(f"# {path}:{start}-{end}\n{text}" for path, start, end, text in snippets)
@@ -0,0 +1,102 @@
+# gotermix54/core/jobs.py
+import os
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from .executor import StreamingCommand
+
+JobResult = namedtuple("JobResult", ["index", "cmd", "status", "returncode", "stdout", "stderr", "duration"])
+
+# status values
+OK, FAILED, TIMEOUT, CANCELLED, SKIPPED = "ok", "failed", "timeout", "cancelled", "skipped"
+
+
+def read_jobs(lines):
+    """One command per line; blank lines and # comments are skipped."""
+    jobs = []
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            jobs.append(line)
+    return jobs
+
+
+class JobRunner:
+    """Run independent shell commands concurrently on StreamingCommand.
+
+    Up to `workers` commands run at once. on_line(index, channel, line) is
+    called from worker threads as output arrives and on_done(JobResult) as
+    each job finishes; both are serialized by one lock so callers can print
+    without interleaving partial lines. With fail_fast, the first failure
+    kills the running jobs and skips the queued ones.
+    """
+
+    def __init__(self, commands, workers=None, fail_fast=False, timeout=None,
+                 idle_timeout=None, tail_lines=200, on_line=None, on_done=None):
+        self.commands = list(commands)
+        self.workers = max(1, min(workers or os.cpu_count() or 1, len(self.commands) or 1))
+        self.fail_fast = fail_fast
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.tail_lines = tail_lines
+        self.on_line = on_line
+        self.on_done = on_done
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.running = {}
+
+    def run(self):
+        """Run every job; returns JobResults in input order."""
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="gotermix-job") as pool:
+            futures = [pool.submit(self._run_one, i, cmd) for i, cmd in enumerate(self.commands)]
+            try:
+                return [f.result() for f in futures]
+            except KeyboardInterrupt:
+                self.stop()
+                raise
+
+    def stop(self):
+        """Kill running jobs and skip the rest (fail-fast, or Ctrl-C in the caller)."""
+        self.stopped.set()
+        with self.lock:
+            running = list(self.running.values())
+        for command in running:
+            command.cancel()
+
+    def _run_one(self, index, cmd):
+        if self.stopped.is_set():
+            return self._finish(JobResult(index, cmd, SKIPPED, None, "", "", 0.0))
+        command = StreamingCommand(cmd, timeout=self.timeout, idle_timeout=self.idle_timeout,
+                                   tail_lines=self.tail_lines)
+        with self.lock:
+            self.running[index] = command
+        if self.stopped.is_set():
+            command.cancel()
+        try:
+            for channel, line in command:
+                if self.on_line is not None:
+                    with self.lock:
+                        self.on_line(index, channel, line)
+        finally:
+            with self.lock:
+                self.running.pop(index, None)
+
+        result = command.result
+        if command.cancelled:
+            status = CANCELLED
+        elif result.timed_out:
+            status = TIMEOUT
+        elif result.returncode != 0:
+            status = FAILED
+        else:
+            status = OK
+        job = JobResult(index, cmd, status, result.returncode, result.stdout, result.stderr, result.duration)
+        if status in (FAILED, TIMEOUT) and self.fail_fast:
+            self.stop()
+        return self._finish(job)
+
+    def _finish(self, job):
+        if self.on_done is not None:
+            with self.lock:
+                self.on_done(job)
+        return job
@@ -0,0 +1,184 @@
+# gotermix54/core/mapped_file.py
+import errno
+import mmap
+import os
+import stat
+import threading
+from array import array
+from bisect import bisect_right
+from itertools import accumulate
+
+STRIDE = 1024         # lines between two remembered line offsets
+CHUNK = 4 << 20       # bytes scanned per indexing step
+MAX_LINE = 4096       # bytes of a line that are ever decoded for display
+SEARCH_CHUNK = 8 << 20  # bytes searched between cancellation checks
+
+
+class MappedFile:
+    """Random access to the lines of a file of any size, through mmap.
+
+    Nothing is read up front. Line offsets are found on demand by scanning
+    forward from the last indexed position, and only every STRIDE-th one
+    is kept (8 bytes per 1024 lines), so memory stays flat even on
+    multi-GB logs; the lines in between are found again with memchr-speed
+    `find`. The page cache holds the file, not this process.
+
+        text = MappedFile(path)
+        text.lines(1000, 40)           # 40 lines from line 1000 (0-based)
+        offset = text.search("ERROR")  # byte offset of the next match
+        text.line_of(offset)
+    """
+
+    def __init__(self, path):
+        self.path = os.fspath(path)
+        # O_NONBLOCK: opening a FIFO for reading would otherwise wait for a writer
+        fd = os.open(self.path, os.O_RDONLY | os.O_NONBLOCK)
+        try:
+            info = os.fstat(fd)
+            # A FIFO, socket or device has no size to map and may never end
+            if not stat.S_ISREG(info.st_mode):
+                raise OSError(errno.EINVAL, "Not a regular file", self.path)
+            self.size = info.st_size
+            # mmap can't map an empty file
+            self.data = mmap.mmap(fd, 0, access=mmap.ACCESS_READ) if self.size else b""
+        finally:
+            os.close(fd)
+        self.checkpoints = array("q", [0])  # offset of line k * STRIDE
+        self.scanned = 0        # bytes indexed so far
+        self.scanned_lines = 0  # newlines in data[:scanned]
+        self._lock = threading.Lock()
+
+    @property
+    def complete(self):
+        return self.scanned >= self.size
+
+    @property
+    def line_count(self):
+        """Number of lines, or None until the whole file has been indexed."""
+        if not self.complete:
+            return None
+        if self.size and self.data[self.size - 1:self.size] != b"\n":
+            return self.scanned_lines + 1
+        return self.scanned_lines
+
+    def shrunk(self):
+        """True if the file got shorter since it was mapped (truncated or rewritten).
+
+        Touching mapped pages past the new end raises SIGBUS, which Python
+        can't catch: callers check this before reading and map the file again.
+        """
+        try:
+            return os.stat(self.path).st_size < self.size
+        except OSError:
+            return False
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+
+    def _extend(self):
+        """Index one more CHUNK; returns False once the file is done (or shrank)."""
+        with self._lock:
+            start = self.scanned
+            if start >= self.size or self.shrunk():
+                return False
+            parts = self.data[start:start + CHUNK].split(b"\n")
+            # parts[j] is the text before newline j; line (scanned_lines + j)
+            # starts right after newline j - 1
+            lengths = list(accumulate(map(len, parts)))
+            first = STRIDE - self.scanned_lines % STRIDE
+            for j in range(first, len(parts), STRIDE):
+                self.checkpoints.append(start + lengths[j - 1] + j)
+            self.scanned_lines += len(parts) - 1
+            if start + CHUNK >= self.size:
+                self.scanned = self.size
+            else:
+                # Stop after the chunk's last newline; the partial line is rescanned
+                self.scanned = start + lengths[-2] + len(parts) - 1 if len(parts) > 1 else start + CHUNK
+            return True
+
+    def index_all(self, cancelled=None):
+        """Index the whole file (for the line count, or jumping to the end).
+
+        False if cancelled, or if the file shrank and must be mapped again.
+        """
+        while self._extend():
+            if cancelled is not None and cancelled():
+                return False
+        return self.complete
+
+    def offset_of(self, line):
+        """Byte offset where `line` starts, or None past the end."""
+        k = line // STRIDE
+        while len(self.checkpoints) <= k and self._extend():
+            pass
+        if len(self.checkpoints) <= k:
+            return None
+        pos = self.checkpoints[k]
+        data = self.data
+        for _ in range(line % STRIDE):
+            pos = data.find(b"\n", pos) + 1
+            if pos == 0:
+                return None
+        return pos if pos < self.size else None
+
+    def lines(self, start, count):
+        """Up to `count` decoded lines from line `start`, each cut at MAX_LINE bytes."""
+        pos = self.offset_of(start)
+        data, size = self.data, self.size
+        out = []
+        while pos is not None and pos < size and len(out) < count:
+            end = data.find(b"\n", pos, pos + MAX_LINE)
+            if end == -1:
+                text = data[pos:min(size, pos + MAX_LINE)]
+                end = data.find(b"\n", pos + MAX_LINE)
+                if end == -1:
+                    end = size
+            else:
+                text = data[pos:end]
+            out.append(text.decode("utf-8", errors="replace").rstrip("\r"))
+            pos = end + 1
+        return out
+
+    def line_of(self, offset):
+        """Line number containing byte `offset`."""
+        while self.scanned <= offset and self._extend():
+            pass
+        with self._lock:
+            k = bisect_right(self.checkpoints, offset) - 1
+            start = self.checkpoints[k]
+        return k * STRIDE + self.data[start:offset].count(b"\n")
+
+    def search(self, query, start=0, end=None, cancelled=None):
+        """Byte offset of the first match of `query` in [start, end), or None.
+
+        The query is literal and smart-case: case-insensitive (ASCII)
+        unless it has upper-case letters. The file is searched in
+        SEARCH_CHUNK windows so a long search can be cancelled between
+        them; case-insensitive windows are lower-cased copies, since `re`
+        with IGNORECASE is several times slower than find().
+        """
+        needle = query.encode("utf-8")
+        if not needle:
+            return None
+        fold = query == query.lower()
+        if fold:
+            needle = needle.lower()
+        limit = self.size if end is None else min(self.size, end + len(needle) - 1)
+        pos = start
+        while pos < limit:
+            if cancelled is not None and cancelled():
+                return None
+            if self.shrunk():
+                return None  # reading on could hit pages that are gone (SIGBUS)
+            # Overlap windows by the query's length so no match is split
+            stop = min(limit, pos + SEARCH_CHUNK + len(needle))
+            if fold:
+                found = self.data[pos:stop].lower().find(needle)
+                found = pos + found if found != -1 else -1
+            else:
+                found = self.data.find(needle, pos, stop)
+            if found != -1:
+                return found
+            pos += SEARCH_CHUNK
+        return None
@@ -1,42 +1,73 @@
 # gotermix54/core/monitor.py
-import psutil
 import time
 from rich.console import Console
 from rich.live import Live
 from rich.table import Table
 from rich.panel import Panel
-from rich.layout import Layout
+from .history import METRICS, MetricHistory, human_rate, sparkline
+from .proctable import ProcessTable, top_n
+from .sampler import Sampler
+from ..utils.keys import KeyReader
+from ..utils.render import Screen, bar
+
+SORT_KEYS = ("cpu_percent", "memory_percent", "pid", "name")
+
 
 class SystemMonitor:
-    def __init__(self):
+    def __init__(self, config=None, replay=None):
+        from ..config import get_config
         self.console = Console()
+        # A Replay plays a recording back through the same screens
+        self.replay = replay
+        if replay is not None:
+            self.sampler = replay
+        else:
+            self.sampler = Sampler()
+            self.processes = ProcessTable()
+            self.sampler.add_collector(self.processes.collect)
+        self.history = None
+        self.history_level = 0  # 0 = every sample; 1.. = downsampled levels
+        self.sort_key = "cpu_percent"
+        self.process_filter = ""
+        self.filter_input = None  # text being typed after '/', else None
+        self.screen = Screen(("header", 3), ("stats", 8), ("history", len(METRICS) + 5),
+                             ("processes", 10), ("footer", 3))
+        self.apply_config(config if config is not None else get_config())
+
+    def apply_config(self, config):
+        conf = config.get("monitor", {})
+        self.refresh_per_second = conf.get("refresh_per_second", 4)
+        if self.replay is None:
+            self.sampler.interval = conf.get("sample_interval", 1.0)
+        window = conf.get("history_window", 3600)
+        levels = tuple(tuple(level) for level in conf.get("history_levels", ((60, 1440),)))
+        if self.history is None or (self.history.window, self.history.levels) != (window, levels):
+            history = MetricHistory(window, levels)
+            if self.history is not None:
+                self.sampler.listeners.remove(self.history.record)
+            self.sampler.subscribe(history.record)
+            self.history = history
 
     def get_stats(self):
-        cpu = psutil.cpu_percent(interval=0.1)
-        mem = psutil.virtual_memory()
-        disk = psutil.disk_usage('/')
-        return {
-            "cpu": cpu,
-            "memory_percent": mem.percent,
-            "memory_used": mem.used / 1024**3,
-            "memory_total": mem.total / 1024**3,
-            "disk_percent": disk.percent,
-            "disk_used": disk.used / 1024**3,
-            "disk_total": disk.total / 1024**3,
-            "processes": len(psutil.pids())
-        }
+        """Latest sampler snapshot; never blocks on collection."""
+        return self.sampler.snapshot()
 
     def render(self, stats):
-        layout = Layout()
-        layout.split_column(
-            Layout(self.render_header(), size=3),
-            Layout(self.render_stats_table(stats), size=8),
-            Layout(self.render_process_list(), size=10),
-            Layout(self.render_footer(), size=3)
-        )
-        return layout
+        # Each region is rebuilt only when what it shows has changed
+        seq = stats["seq"]
+        screen = self.screen
+        screen.update("header", seq if self.replay is not None else None, self.render_header)
+        screen.update("stats", seq, lambda: self.render_stats_table(stats))
+        screen.update("history", (seq, self.history_level), self.render_history)
+        screen.update("processes", (seq, self.sort_key, self.process_filter),
+                      lambda: self.render_process_list(stats))
+        screen.update("footer", self.filter_input, self.render_footer)
+        return screen.layout
 
     def render_header(self):
+        if self.replay is not None:
+            stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.get_stats()["time"]))
+            return Panel(f"📼 Replay: {stamp}", style="bold magenta")
         return Panel("📊 Real-Time System Monitor", style="bold magenta")
 
     def render_stats_table(self, stats):
@@ -45,34 +76,60 @@ class SystemMonitor:
         table.add_column("Usage", style="bold")
         table.add_column("Value")
 
-        table.add_row("CPU", f"{stats['cpu']}%", self.get_bar(stats['cpu']))
-        table.add_row("Memory", f"{stats['memory_percent']}%", self.get_bar(stats['memory_percent']))
-        table.add_row("Disk", f"{stats['disk_percent']}%", self.get_bar(stats['disk_percent']))
+        table.add_row("CPU", f"{stats['cpu']:.1f}%", self.get_bar(stats['cpu']))
+        table.add_row("Memory", f"{stats['memory_percent']:.1f}%", self.get_bar(stats['memory_percent']))
+        table.add_row("Disk", f"{stats['disk_percent']:.1f}%", self.get_bar(stats['disk_percent']))
         table.add_row("Processes", str(stats['processes']), "")
 
         return table
 
+    def render_history(self, width=40):
+        level = min(self.history_level, len(self.history.levels))
+        period = self.replay.period if self.replay is not None else self.sampler.interval
+        if level:
+            step = self.history.levels[level - 1][0] * period
+            title = f"History (1 point = {step:g}s)"
+        else:
+            title = f"History (last {width * period:g}s)"
+        table = Table(title=title, show_header=True, header_style="bold green")
+        table.add_column("Metric", style="dim")
+        table.add_column("Trend")
+        for column in ("Now", "Min", "Max", "P95"):
+            table.add_column(column, justify="right")
+
+        for name, (label, unit) in METRICS.items():
+            series = self.history.series.get(name)
+            values = series.values(level=level) if series else ()
+            if not len(values):
+                continue
+            if unit == "%":
+                trend = sparkline(values, width, 0, 100)
+                fmt = lambda v: f"{v:.1f}%"
+            else:
+                trend = sparkline(values, width)
+                fmt = human_rate
+            lo, hi, p95 = series.stats(level=level)
+            table.add_row(label, trend, fmt(values[-1]), fmt(lo), fmt(hi), fmt(p95))
+            if name == "cpu":
+                # One glyph per core, current value; full per-core series are kept too
+                cores = [self.history.series[f"cpu{i}"].raw.values(1)[-1]
+                         for i in range(len(self.history.series)) if f"cpu{i}" in self.history.series]
+                if len(cores) > 1:
+                    table.add_row("  per core", sparkline(cores, len(cores), 0, 100), "",
+                                  f"{min(cores):.1f}%", f"{max(cores):.1f}%", "")
+        return table
+
     def get_bar(self, percent):
-        from rich.progress import Progress, BarColumn
-        from io import StringIO
-        from rich.console import Console
-        console = Console(file=StringIO(), force_terminal=True)
-        with console.capture() as capture:
-            console.print(f"[{'█' * int(percent/5)}{'░' * (20 - int(percent/5))}]")
-        return capture.get()
-
-    def render_process_list(self):
-        procs = []
-        for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_percent']):
-            try:
-                pinfo = proc.info
-                if pinfo['cpu_percent'] > 0.1 or (pinfo['memory_percent'] or 0) > 1.0:
-                    procs.append(pinfo)
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                pass
-        procs = sorted(procs, key=lambda x: x.get('cpu_percent', 0), reverse=True)[:5]
-
-        table = Table(title="Top Processes", show_header=True, header_style="bold yellow")
+        return bar(percent)
+
+    def render_process_list(self, stats):
+        procs = top_n(stats.get("process_rows", ()), 5, key=self.sort_key,
+                      reverse=self.sort_key not in ("pid", "name"), where=self.process_filter or None)
+
+        title = f"Top Processes by {self.sort_key.split('_')[0]}"
+        if self.process_filter:
+            title += f" matching '{self.process_filter}'"
+        table = Table(title=title, show_header=True, header_style="bold yellow")
         table.add_column("PID", style="dim")
         table.add_column("Name")
         table.add_column("CPU%", justify="right")
@@ -80,34 +137,65 @@ class SystemMonitor:
 
         for p in procs:
             table.add_row(
-                str(p['pid']),
-                p['name'][:20],
-                f"{p.get('cpu_percent', 0):.1f}%",
-                f"{p.get('memory_percent', 0):.1f}%"
+                str(p.pid),
+                p.name[:20],
+                f"{p.cpu_percent:.1f}%",
+                f"{p.memory_percent:.1f}%"
             )
 
         return Panel(table, border_style="yellow")
 
     def render_footer(self):
-        return Panel("q: Quit | r: Refresh", style="dim")
+        if self.filter_input is not None:
+            return Panel(f"Filter: {self.filter_input}▏  (Enter: apply • Esc: clear)", style="bold")
+        return Panel("q: Quit | r: Refresh | s: Sort | /: Filter | h: History zoom", style="dim")
+
+    def handle_key(self, key):
+        """Apply one key press; returns False when the user asked to leave."""
+        if self.filter_input is not None:
+            if key == "enter":
+                self.process_filter, self.filter_input = self.filter_input, None
+            elif key == "esc":
+                self.process_filter, self.filter_input = "", None
+            elif key == "backspace":
+                self.filter_input = self.filter_input[:-1]
+            elif len(key) == 1 and key.isprintable():
+                self.filter_input += key
+            return True
+        if key in ('q', 'esc', 'ctrl-c'):
+            return False
+        if key == 's':
+            self.sort_key = SORT_KEYS[(SORT_KEYS.index(self.sort_key) + 1) % len(SORT_KEYS)]
+        elif key == '/':
+            self.filter_input = ""
+        elif key == 'h':
+            self.history_level = (self.history_level + 1) % (len(self.history.levels) + 1)
+        elif key == 'r':
+            self.screen.invalidate()
+        return True
 
     def display_live(self):
-        with Live(self.render(self.get_stats()), refresh_per_second=1, console=Console()) as live:
-            while True:
-                key = self.get_key()
-                if key == 'q':
-                    break
-                live.update(self.render(self.get_stats()))
-
-    def get_key(self):
-        import sys, tty, termios
-        fd = sys.stdin.fileno()
-        old_settings = termios.tcgetattr(fd)
+        from ..config import config_service
+        unsubscribe = config_service.subscribe(self.apply_config)
+        try:
+            self._display_live()
+        finally:
+            unsubscribe()
+
+    def _display_live(self):
+        self.sampler.start()
         try:
-            tty.setraw(sys.stdin.fileno())
-            ch = sys.stdin.read(1)
-            if ch == 'q':
-                return 'q'
+            self.screen.invalidate()
+            with KeyReader() as keys, \
+                    Live(self.render(self.get_stats()), auto_refresh=False, console=Console()) as live:
+                while True:
+                    # Draw at our own pace, and only when there's something new
+                    key = keys.read(1 / self.refresh_per_second)
+                    if key is not None and not self.handle_key(key):
+                        break
+                    self.screen.fit(live.console.size)
+                    layout = self.render(self.get_stats())
+                    if self.screen.take_dirty():
+                        live.update(layout, refresh=True)
         finally:
-            termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
-        return None
+            self.sampler.stop()
@@ -0,0 +1,164 @@
+# gotermix54/core/proctable.py
+import heapq
+import os
+import time
+from collections import namedtuple
+import psutil
+
+ProcRow = namedtuple("ProcRow", ["pid", "name", "username", "status", "cpu_percent",
+                                 "memory_percent", "rss", "cpu_time", "create_time"])
+COLUMNS = ProcRow._fields
+
+# Linux fast path: one read of /proc/<pid>/stat per process per sample
+# instead of several psutil calls
+PROC_STAT = os.path.exists("/proc/self/stat")
+CLK_TCK = os.sysconf("SC_CLK_TCK") if PROC_STAT else 100
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if PROC_STAT else 4096
+STATES = {
+    "R": psutil.STATUS_RUNNING, "S": psutil.STATUS_SLEEPING, "D": psutil.STATUS_DISK_SLEEP,
+    "Z": psutil.STATUS_ZOMBIE, "T": psutil.STATUS_STOPPED, "t": psutil.STATUS_TRACING_STOP,
+    "X": psutil.STATUS_DEAD, "I": getattr(psutil, "STATUS_IDLE", "idle"),
+}
+
+
+def read_stat(pid):
+    """(status, cpu_seconds, rss_bytes, start_ticks) from /proc/<pid>/stat."""
+    with open(f"/proc/{pid}/stat", "rb") as f:
+        data = f.read()
+    # The command name may contain spaces and parentheses; fields follow the last ')'
+    fields = data[data.rindex(b")") + 2:].split()
+    state = fields[0].decode()
+    cpu = (int(fields[11]) + int(fields[12])) / CLK_TCK
+    return STATES.get(state, state), cpu, int(fields[21]) * PAGE_SIZE, int(fields[19])
+
+
+def top_n(rows, n=5, key="cpu_percent", reverse=True, where=None):
+    """Best n rows by `key` without sorting everything (heap selection).
+
+    `where` is a predicate on rows, or a string matched against the name
+    (case-insensitive); None keeps every row.
+    """
+    if isinstance(where, str):
+        needle = where.lower()
+        where = lambda row: needle in row.name.lower()
+    if where is not None:
+        rows = filter(where, rows)
+    if key == "name":
+        getter = lambda row: row.name.lower()
+    else:
+        index = COLUMNS.index(key)
+        getter = lambda row: row[index] or 0
+    pick = heapq.nlargest if reverse else heapq.nsmallest
+    return pick(n, rows, key=getter)
+
+
+class ProcessTable:
+    """Process list maintained incrementally across samples.
+
+    psutil.Process handles are kept between samples, keyed by
+    (pid, create_time), and cpu_percent is the CPU time used since the
+    previous sample over the wall time elapsed (so it is never the 0.0 a
+    fresh handle reports). Each sample only creates handles for new pids
+    and drops vanished ones; static fields (name, user, start time) are
+    read once, at birth.
+    """
+
+    def __init__(self):
+        self.handles = {}  # pid -> (key, Process)
+        self.rows = {}     # key -> ProcRow
+        self.denied = set()  # pids we may not inspect; not retried while they live
+        self.starts = {}     # pid -> start time in clock ticks (fast path only)
+        self.births = ()
+        self.deaths = ()
+        self.total_memory = psutil.virtual_memory().total
+        self.last_sample = None
+
+    def sample(self):
+        """Refresh the table; returns the rows. births/deaths hold the keys that changed."""
+        now = time.monotonic()
+        elapsed = now - self.last_sample if self.last_sample else None
+        self.last_sample = now
+        pids = set(psutil.pids())
+        births, deaths = [], []
+        self.denied &= pids
+
+        for pid in list(self.handles):
+            if pid not in pids:
+                deaths.append(self._drop(pid))
+
+        for pid, (key, proc) in list(self.handles.items()):
+            row = self.rows[key]
+            try:
+                status, cpu_time, rss, start = self._counters(proc)
+                if start != self.starts.get(pid, start) or cpu_time < row.cpu_time:
+                    # Same pid, different process
+                    raise psutil.NoSuchProcess(pid)
+            except (psutil.NoSuchProcess, FileNotFoundError, ProcessLookupError):
+                # Dropped here; re-adopted below if the pid now belongs to
+                # a new process
+                deaths.append(self._drop(pid))
+                continue
+            except (psutil.AccessDenied, PermissionError):
+                continue
+            self.rows[key] = row._replace(
+                status=status,
+                cpu_percent=100.0 * (cpu_time - row.cpu_time) / elapsed if elapsed else 0.0,
+                memory_percent=100.0 * rss / self.total_memory,
+                rss=rss,
+                cpu_time=cpu_time
+            )
+
+        for pid in pids - self.handles.keys() - self.denied:
+            key = self._adopt(pid)
+            if key is not None:
+                births.append(key)
+
+        self.births = tuple(births)
+        self.deaths = tuple(deaths)
+        return self.rows.values()
+
+    def _counters(self, proc):
+        if PROC_STAT:
+            return read_stat(proc.pid)
+        with proc.oneshot():
+            cpu_times = proc.cpu_times()
+            return (proc.status(), cpu_times.user + cpu_times.system,
+                    proc.memory_info().rss, None)
+
+    def _adopt(self, pid):
+        try:
+            proc = psutil.Process(pid)
+            with proc.oneshot():
+                key = (pid, proc.create_time())
+                name = proc.name()
+                try:
+                    username = proc.username()
+                except (psutil.AccessDenied, KeyError):
+                    username = ""
+            # Baseline for the next sample's cpu_percent
+            status, cpu_time, rss, start = self._counters(proc)
+        except (psutil.AccessDenied, PermissionError):
+            self.denied.add(pid)
+            return None
+        except (psutil.NoSuchProcess, FileNotFoundError, ProcessLookupError):
+            return None
+        self.handles[pid] = (key, proc)
+        if start is not None:
+            self.starts[pid] = start
+        self.rows[key] = ProcRow(pid, name, username, status, 0.0,
+                                 100.0 * rss / self.total_memory, rss, cpu_time, key[1])
+        return key
+
+    def _drop(self, pid):
+        key, _ = self.handles.pop(pid)
+        self.rows.pop(key, None)
+        self.starts.pop(pid, None)
+        return key
+
+    def top(self, n=5, key="cpu_percent", reverse=True, where=None):
+        return top_n(self.rows.values(), n, key, reverse, where)
+
+    def collect(self):
+        """Sampler collector: the table as an immutable tuple of rows."""
+        rows = tuple(self.sample())
+        return {"processes": len(rows), "process_rows": rows}
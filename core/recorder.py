@@ -0,0 +1,224 @@
+# gotermix54/core/recorder.py
+import json
+import os
+import struct
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import psutil
+from .sampler import Sampler
+
+MAGIC = b"GTXREC1\n"
+# Fixed columns of every record, after the timestamp; per-core CPU follows
+FIELDS = ("cpu", "memory_percent", "swap_percent", "disk_percent", "disk_read_rate",
+          "disk_write_rate", "net_sent_rate", "net_recv_rate", "processes")
+
+
+def count_processes():
+    """Cheap collector for headless runs (no per-process table)."""
+    return {"processes": len(psutil.pids())}
+
+
+def headless_sampler(interval=1.0):
+    sampler = Sampler(interval)
+    sampler.add_collector(count_processes)
+    return sampler
+
+
+class Recorder:
+    """Appends samples to a compact binary file, rotating by size.
+
+    The file starts with a magic line and a JSON header (fields, core
+    count, interval); each record is then a fixed-size little-endian
+    struct: a float64 timestamp and float32 values. Rotation works like
+    logging's RotatingFileHandler: path -> path.1 -> path.2 ...
+    """
+
+    def __init__(self, path, interval=1.0, max_bytes=16 * 1024 * 1024, backups=3, flush_every=10):
+        self.path = path
+        self.interval = interval
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.flush_every = flush_every
+        self.cores = psutil.cpu_count() or 1
+        self.record = struct.Struct(f"<d{len(FIELDS) + self.cores}f")
+        self.file = None
+        self.pending = 0
+        self.lock = threading.Lock()
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            # Someone else's file: refuse now rather than fail on every sample
+            read_header(path)
+
+    def _open(self):
+        fresh = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        if not fresh and read_header(self.path) != self._header():
+            # Different machine/interval: don't mix layouts in one file
+            self._rotate()
+            fresh = True
+        self.file = open(self.path, "ab")
+        if fresh:
+            self.file.write(MAGIC + json.dumps(self._header()).encode() + b"\n")
+
+    def _header(self):
+        return {"version": 1, "fields": list(FIELDS), "cores": self.cores, "interval": self.interval}
+
+    def _rotate(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        for i in range(self.backups - 1, 0, -1):
+            src = f"{self.path}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{i + 1}")
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+    def write(self, snapshot):
+        """Sampler listener: append one record."""
+        cores = tuple(snapshot.get("cpu_per_core", ()))[:self.cores]
+        cores += (0.0,) * (self.cores - len(cores))
+        values = [float(snapshot.get(name, 0.0)) for name in FIELDS]
+        data = self.record.pack(snapshot.get("time", time.time()), *values, *cores)
+        with self.lock:
+            if self.file is None:
+                self._open()
+            elif self.file.tell() + len(data) > self.max_bytes:
+                self._rotate()
+                self._open()
+            self.file.write(data)
+            self.pending += 1
+            if self.pending >= self.flush_every:
+                self.file.flush()
+                self.pending = 0
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+
+def read_header(path):
+    with open(path, "rb") as f:
+        if f.readline() != MAGIC:
+            raise ValueError(f"{path} is not a gotermix54 recording")
+        try:
+            return json.loads(f.readline())
+        except ValueError:
+            raise ValueError(f"{path} has a damaged recording header") from None
+
+
+def read_records(path):
+    """Yield snapshots (dicts) from a recording and its rotated parts, oldest first."""
+    parts = []
+    i = 1
+    while os.path.exists(f"{path}.{i}"):
+        parts.append(f"{path}.{i}")
+        i += 1
+    for part in parts[::-1] + [path]:
+        if not os.path.exists(part):
+            continue
+        with open(part, "rb") as f:
+            if f.readline() != MAGIC:
+                raise ValueError(f"{part} is not a gotermix54 recording")
+            header = json.loads(f.readline())
+            fields, cores = header["fields"], header["cores"]
+            record = struct.Struct(f"<d{len(fields) + cores}f")
+            while True:
+                data = f.read(record.size)
+                if len(data) < record.size:
+                    break  # end of file, or a record cut short by a crash
+                values = record.unpack(data)
+                snapshot = dict(zip(fields, values[1:1 + len(fields)]))
+                snapshot["time"] = values[0]
+                if "processes" in snapshot:
+                    snapshot["processes"] = int(snapshot["processes"])
+                snapshot["cpu_per_core"] = values[1 + len(fields):]
+                snapshot["interval"] = header["interval"]
+                yield snapshot
+
+
+class Replay(Sampler):
+    """A Sampler that plays back a recording instead of measuring.
+
+    Snapshots are published `speed` times faster than they were recorded;
+    at the end the last one stays current.
+    """
+
+    def __init__(self, path, speed=10.0):
+        self.records = read_records(path)
+        first = next(self.records, None)
+        if first is None:
+            raise ValueError(f"{path} has no samples")
+        self.period = first["interval"]
+        super().__init__(self.period / speed)
+        self.upcoming = first
+        self.collectors = [self._next]
+        self.finished = False
+
+    def _first_sample(self):
+        self.sample()
+
+    def _next(self):
+        current, self.upcoming = self.upcoming, next(self.records, None)
+        if self.upcoming is None and not self.finished:
+            self.finished = True
+            self._stop.set()
+        return current or {}
+
+    def sample(self):
+        if self.finished and self._snapshot is not None:
+            return self._snapshot
+        return super().sample()
+
+
+def prometheus_text(snapshot):
+    """Prometheus text exposition (0.0.4) of one snapshot."""
+    lines = []
+
+    def gauge(name, value, help_text, labels=""):
+        lines.append(f"# HELP gotermix_{name} {help_text}")
+        lines.append(f"# TYPE gotermix_{name} gauge")
+        lines.append(f"gotermix_{name}{labels} {value}")
+
+    gauge("cpu_percent", snapshot.get("cpu", 0.0), "System-wide CPU utilisation.")
+    lines.append("# HELP gotermix_cpu_core_percent Per-core CPU utilisation.")
+    lines.append("# TYPE gotermix_cpu_core_percent gauge")
+    for i, value in enumerate(snapshot.get("cpu_per_core", ())):
+        lines.append(f'gotermix_cpu_core_percent{{core="{i}"}} {value}')
+    gauge("memory_percent", snapshot.get("memory_percent", 0.0), "Memory in use.")
+    gauge("swap_percent", snapshot.get("swap_percent", 0.0), "Swap in use.")
+    gauge("disk_percent", snapshot.get("disk_percent", 0.0), "Root filesystem usage.")
+    gauge("disk_read_bytes_per_second", snapshot.get("disk_read_rate", 0.0), "Disk read rate.")
+    gauge("disk_write_bytes_per_second", snapshot.get("disk_write_rate", 0.0), "Disk write rate.")
+    gauge("network_receive_bytes_per_second", snapshot.get("net_recv_rate", 0.0), "Network receive rate.")
+    gauge("network_transmit_bytes_per_second", snapshot.get("net_sent_rate", 0.0), "Network transmit rate.")
+    gauge("processes", snapshot.get("processes", 0), "Number of processes.")
+    gauge("sample_timestamp_seconds", snapshot.get("time", 0.0), "When the sample was taken.")
+    return "\n".join(lines) + "\n"
+
+
+def serve_metrics(sampler, port, host="127.0.0.1"):
+    """Serve the sampler's latest snapshot at http://host:port/metrics; returns the server."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            body = prometheus_text(sampler.snapshot()).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass  # keep headless runs quiet
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="gotermix-metrics", daemon=True).start()
+    return server
@@ -0,0 +1,330 @@
+# gotermix54/core/resilience.py
+import random
+import threading
+import time
+from collections import deque, namedtuple
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+
+RETRYABLE_STATUS = {408, 409, 425, 429, 500, 502, 503, 504, 529}
+RETRYABLE_NAMES = {
+    "RateLimitError", "Timeout", "APITimeoutError", "APIConnectionError",
+    "ServiceUnavailableError", "InternalServerError", "TimeoutError", "ConnectionError",
+}
+
+# The request itself is wrong: no other provider or retry will do better
+REQUEST_ERROR_STATUS = {400, 413, 422}
+REQUEST_ERROR_NAMES = {
+    "BadRequestError", "ContextWindowExceededError", "ContentPolicyViolationError",
+    "UnprocessableEntityError",
+}
+
+Outcome = namedtuple("Outcome", ["value", "error", "model", "attempts"])
+
+
+class CircuitOpenError(Exception):
+    """Every candidate model's breaker is open."""
+
+
+def is_retryable(error):
+    status = getattr(error, "status_code", None)
+    if status in RETRYABLE_STATUS:
+        return True
+    return any(cls.__name__ in RETRYABLE_NAMES for cls in type(error).__mro__)
+
+
+def is_request_error(error):
+    status = getattr(error, "status_code", None)
+    if status in REQUEST_ERROR_STATUS:
+        return True
+    return any(cls.__name__ in REQUEST_ERROR_NAMES for cls in type(error).__mro__)
+
+
+class CircuitBreaker:
+    """Per-model breaker: opens after consecutive failures, probes after a cooldown.
+
+    Once the cooldown is over, `allow()` lets exactly one call through as a
+    probe; everyone else is refused until that probe records its outcome
+    (or `release()`s the slot without one).
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def available(self):
+        """Whether allow() would succeed now (doesn't claim the probe)."""
+        state = self.state
+        return state == "closed" or (state == "half-open" and not self.probing)
+
+    def allow(self):
+        """Claim one call; the caller must then record its outcome or release()."""
+        with self.lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "open" or self.probing:
+                return False
+            self.probing = True
+            return True
+
+    def release(self):
+        """Give the probe slot back without judging the provider."""
+        with self.lock:
+            self.probing = False
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            self.probing = False
+            # A failed half-open probe re-opens for another full cooldown
+            if self.failures >= self.failure_threshold or self.opened_at is not None:
+                self.opened_at = time.monotonic()
+
+
+class LatencyTracker:
+    def __init__(self, window=200, min_samples=20):
+        self.samples = deque(maxlen=window)
+        self.min_samples = min_samples
+        self.lock = threading.Lock()
+
+    def record(self, seconds):
+        with self.lock:
+            self.samples.append(seconds)
+
+    def percentile(self, pct):
+        with self.lock:
+            if len(self.samples) < self.min_samples:
+                return None
+            ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class ResilientCaller:
+    """Retries, hedging and circuit breaking around a provider call.
+
+    `call(models, fn)` tries `fn(model)` on the first model whose breaker is
+    closed, retrying retryable errors with full-jitter exponential backoff.
+    While a request runs longer than that model's p95 latency, a duplicate is
+    fired and the first success wins. When the primary stays unhealthy, or
+    rejects us outright (auth, unknown model), the next model in `models`
+    takes over. Errors in the request itself (400, context too long) are
+    returned at once and don't count against the provider.
+
+    Every attempt pays for itself: `acquire(model, tokens)` blocks for the
+    model's rate budget before retries and failovers, and hedges only fire
+    if `admit(model, tokens)` can spend it without waiting. Budget paid up
+    front for a model that is then skipped goes back through `refund`.
+    """
+
+    def __init__(self, retries=3, backoff_base=0.5, backoff_max=8.0, hedge=True,
+                 hedge_min_samples=20, breaker_failures=5, breaker_reset=30.0, admit=None,
+                 acquire=None, max_hedges=4, refund=None):
+        # admit(model, tokens) -> bool lets the scheduler veto hedges that
+        # would blow the provider's rate budget; acquire(model, tokens)
+        # waits for that budget
+        self.admit = admit or (lambda model, tokens: True)
+        self.acquire = acquire or (lambda model, tokens: None)
+        self.refund = refund or (lambda model, tokens: None)
+        self.hedges_running = 0
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge = hedge
+        self.hedge_min_samples = hedge_min_samples
+        self.breaker_failures = breaker_failures
+        self.breaker_reset = breaker_reset
+        # Losing hedges can't be interrupted mid-request; this caps how many
+        # can be outstanding at once
+        self.max_hedges = max_hedges
+        self.breakers = {}
+        self.latencies = {}
+        self.lock = threading.Lock()
+
+    def apply_config(self, retries=3, backoff_base=0.5, backoff_max=8.0, hedge=True,
+                     hedge_min_samples=20, breaker_failures=5, breaker_reset=30.0, max_hedges=4):
+        """New settings (hot reload); breaker state and latency history are kept."""
+        with self.lock:
+            self.retries = retries
+            self.backoff_base = backoff_base
+            self.backoff_max = backoff_max
+            self.hedge = hedge
+            self.hedge_min_samples = hedge_min_samples
+            self.breaker_failures = breaker_failures
+            self.breaker_reset = breaker_reset
+            self.max_hedges = max_hedges
+            for breaker in self.breakers.values():
+                breaker.failure_threshold = breaker_failures
+                breaker.reset_timeout = breaker_reset
+            for tracker in self.latencies.values():
+                tracker.min_samples = hedge_min_samples
+
+    def breaker(self, model):
+        with self.lock:
+            if model not in self.breakers:
+                self.breakers[model] = CircuitBreaker(self.breaker_failures, self.breaker_reset)
+            return self.breakers[model]
+
+    def latency(self, model):
+        with self.lock:
+            if model not in self.latencies:
+                self.latencies[model] = LatencyTracker(min_samples=self.hedge_min_samples)
+            return self.latencies[model]
+
+    def choose(self, models):
+        """First model whose breaker lets a call through (claimed), else None."""
+        for model in models:
+            if self.breaker(model).allow():
+                return model
+        return None
+
+    def backoff(self, attempt):
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def call(self, models, fn, tokens=0, admitted=None):
+        """Outcome of `fn(model)` over `models`, best first.
+
+        `tokens` is what one attempt costs against the rate budget.
+        `admitted` is the model the caller already paid one attempt for
+        (the scheduler charges the primary at admission). That payment
+        covers the first request actually sent: if it goes to another model
+        (the admitted one's breaker is open), it's refunded and the other
+        model is charged instead. Every later attempt goes through `acquire`.
+        """
+        credit = admitted
+        attempts = 0
+        error = None
+        model = models[0]
+        for model in [m for m in models if self.breaker(m).available()]:
+            breaker = self.breaker(model)
+            for attempt in range(self.retries + 1):
+                if attempt:
+                    time.sleep(self.backoff(attempt - 1))
+                if not breaker.allow():
+                    break
+                if credit != model:
+                    if credit is not None:
+                        self.refund(credit, tokens)
+                    self.acquire(model, tokens)
+                credit = None
+                attempts += 1
+                try:
+                    value = self._hedged(model, fn, tokens)
+                except Exception as e:
+                    error = e
+                    if is_retryable(e):
+                        breaker.record_failure()
+                        continue
+                    breaker.release()
+                    if is_request_error(e):
+                        return Outcome(None, e, model, attempts)
+                    break  # the provider refuses us (auth, unknown model): fail over
+                breaker.record_success()
+                return Outcome(value, None, model, attempts)
+        if credit is not None:
+            self.refund(credit, tokens)  # nothing was sent
+        if error is None:
+            error = CircuitOpenError(f"all providers are failing ({', '.join(models)}); "
+                                     f"retrying after {self.breaker_reset:.0f}s")
+        return Outcome(None, error, model, attempts)
+
+    def _hedged(self, model, fn, tokens=0):
+        tracker = self.latency(model)
+        threshold = tracker.percentile(95) if self.hedge else None
+        primary = self._spawn(model, fn)
+        # Never hedge a half-open probe: it's meant to be a single request
+        if threshold is None or self.breaker(model).state != "closed":
+            return primary.result()
+
+        done, _ = wait([primary], timeout=threshold)
+        if done or not self._start_hedge(model, tokens):
+            return primary.result()
+
+        hedge = self._spawn(model, fn)
+        hedge.add_done_callback(self._end_hedge)
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def _start_hedge(self, model, tokens):
+        with self.lock:
+            if self.hedges_running >= self.max_hedges:
+                return False
+            self.hedges_running += 1
+        # Same price as the request it duplicates
+        if self.admit(model, tokens):
+            return True
+        self._end_hedge()
+        return False
+
+    def _end_hedge(self, future=None):
+        with self.lock:
+            self.hedges_running -= 1
+
+    def _spawn(self, model, fn):
+        future = Future()
+        tracker = self.latency(model)
+
+        def run():
+            start = time.monotonic()
+            try:
+                value = fn(model)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                tracker.record(time.monotonic() - start)
+                future.set_result(value)
+
+        threading.Thread(target=run, daemon=True).start()
+        return future
+
+
+_caller = None
+_caller_lock = threading.Lock()
+
+
+def get_resilience(config, admit=None, acquire=None, refund=None):
+    """Process-wide caller, so breaker state and latency history are shared."""
+    global _caller
+    with _caller_lock:
+        if _caller is None:
+            _caller = ResilientCaller(admit=admit, acquire=acquire, refund=refund, **resilience_settings(config))
+        return _caller
+
+
+def resilience_settings(config):
+    """ResilientCaller (and apply_config) keyword arguments from a config."""
+    conf = config.get("resilience", {})
+    return {
+        "retries": conf.get("retries", 3),
+        "backoff_base": conf.get("backoff_base", 0.5),
+        "backoff_max": conf.get("backoff_max", 8.0),
+        "hedge": conf.get("hedge", True),
+        "hedge_min_samples": conf.get("hedge_min_samples", 20),
+        "breaker_failures": conf.get("breaker_failures", 5),
+        "breaker_reset": conf.get("breaker_reset", 30.0),
+        "max_hedges": config.get("ai", {}).get("concurrency", 4),
+    }
@@ -0,0 +1,141 @@
+# gotermix54/core/sampler.py
+import logging
+import threading
+import time
+from types import MappingProxyType
+import psutil
+
+log = logging.getLogger(__name__)
+
+
+def collect_system():
+    """One non-blocking sample of the system-wide counters."""
+    mem = psutil.virtual_memory()
+    swap = psutil.swap_memory()
+    disk = psutil.disk_usage('/')
+    return {
+        # cpu_percent(None) compares against the previous call: no sleeping
+        "cpu": psutil.cpu_percent(None),
+        "cpu_per_core": tuple(psutil.cpu_percent(None, percpu=True)),
+        "memory_percent": mem.percent,
+        "memory_used": mem.used / 1024**3,
+        "memory_total": mem.total / 1024**3,
+        "swap_percent": swap.percent,
+        "disk_percent": disk.percent,
+        "disk_used": disk.used / 1024**3,
+        "disk_total": disk.total / 1024**3
+    }
+
+
+class IORates:
+    """Collector turning cumulative disk/network counters into bytes per second."""
+
+    def __init__(self):
+        self.last = None
+
+    def __call__(self):
+        now = time.monotonic()
+        disk = psutil.disk_io_counters()
+        net = psutil.net_io_counters()
+        counters = (
+            disk.read_bytes if disk else 0, disk.write_bytes if disk else 0,
+            net.bytes_sent if net else 0, net.bytes_recv if net else 0
+        )
+        previous, self.last = self.last, (now, counters)
+        if previous is None:
+            rates = (0.0, 0.0, 0.0, 0.0)
+        else:
+            elapsed = max(now - previous[0], 1e-6)
+            # Counters can wrap or reset (e.g. an interface going away)
+            rates = tuple(max(0, c - p) / elapsed for c, p in zip(counters, previous[1]))
+        return dict(zip(("disk_read_rate", "disk_write_rate", "net_sent_rate", "net_recv_rate"), rates))
+
+
+class Sampler:
+    """Collects stats on a background thread and publishes immutable snapshots.
+
+    Readers call `snapshot()` and never wait on I/O; each sample replaces the
+    previous snapshot wholesale, so a reader always sees one consistent
+    sample. Extra collectors (fn() -> dict) are merged into every sample and
+    listeners get each new snapshot from the sampler thread.
+    """
+
+    def __init__(self, interval=1.0):
+        self.interval = interval
+        self.collectors = [collect_system, IORates()]
+        self.listeners = []
+        self.seq = 0
+        self._snapshot = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def add_collector(self, collector):
+        self.collectors.append(collector)
+
+    def subscribe(self, callback):
+        self.listeners.append(callback)
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        with self._lock:
+            if self.running:
+                return
+            if self._snapshot is None:
+                self._first_sample()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="gotermix-sampler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=2)
+        self._thread = None
+
+    def snapshot(self):
+        """Latest sample as a read-only mapping (sampling once if never started)."""
+        if self._snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._first_sample()
+        return self._snapshot
+
+    def _first_sample(self):
+        # Prime the cpu_percent baselines so the first sample is real; this
+        # is the only time the sampler ever waits
+        psutil.cpu_percent(None)
+        psutil.cpu_percent(None, percpu=True)
+        time.sleep(0.1)
+        self.sample()
+
+    def sample(self):
+        data = {"time": time.time()}
+        for collector in self.collectors:
+            try:
+                data.update(collector())
+            except (psutil.Error, OSError):
+                # A vanished disk or process must not stop the sampler
+                continue
+        self.seq += 1
+        data["seq"] = self.seq
+        self._snapshot = MappingProxyType(data)
+        # A copy: listeners may unsubscribe while we're calling them
+        for callback in list(self.listeners):
+            try:
+                callback(self._snapshot)
+            except Exception:
+                # One broken listener must not kill the sampler thread
+                log.exception("sampler listener %r failed", callback)
+        return self._snapshot
+
+    def _run(self):
+        next_at = time.monotonic() + self.interval
+        while not self._stop.wait(max(0.0, next_at - time.monotonic())):
+            self.sample()
+            # Fixed cadence: collection time doesn't stretch the interval
+            next_at = max(next_at + self.interval, time.monotonic())
@@ -0,0 +1,297 @@
+# gotermix54/core/scheduler.py
+import itertools
+import threading
+import time
+from concurrent.futures import Future
+
+# Lower runs first. Chat waits on the answer, batch jobs can wait their turn.
+PRIORITIES = {"interactive": 0, "normal": 5, "background": 10}
+
+
+class TokenBucket:
+    def __init__(self, per_minute):
+        self.rate = per_minute / 60.0
+        self.capacity = float(per_minute)
+        self.level = self.capacity
+        self.stamp = time.monotonic()
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.stamp) * self.rate)
+        self.stamp = now
+
+    def wait_time(self, amount, now):
+        self._refill(now)
+        # A single request bigger than the bucket would never fit; let it
+        # through once the bucket is full rather than deadlocking.
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def take(self, amount, now):
+        self._refill(now)
+        self.level -= min(amount, self.capacity)
+
+    def give(self, amount, now):
+        self._refill(now)
+        self.level = min(self.capacity, self.level + min(amount, self.capacity))
+
+
+class ProviderLimit:
+    """requests/min and tokens/min budgets for one provider."""
+
+    def __init__(self, requests_per_minute=None, tokens_per_minute=None):
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+
+    def wait_time(self, tokens, now):
+        wait = 0.0
+        if self.requests:
+            wait = max(wait, self.requests.wait_time(1, now))
+        if self.tokens:
+            wait = max(wait, self.tokens.wait_time(tokens, now))
+        return wait
+
+    def take(self, tokens, now):
+        if self.requests:
+            self.requests.take(1, now)
+        if self.tokens:
+            self.tokens.take(tokens, now)
+
+    def give(self, tokens, now):
+        if self.requests:
+            self.requests.give(1, now)
+        if self.tokens:
+            self.tokens.give(tokens, now)
+
+
+class Job:
+    __slots__ = ("key", "provider", "tokens", "priority", "seq", "fn", "future", "waiters")
+
+    def __init__(self, key, provider, tokens, priority, seq, fn):
+        self.key = key
+        self.provider = provider
+        self.tokens = tokens
+        self.priority = priority
+        self.seq = seq
+        self.fn = fn
+        self.future = Future()
+        self.waiters = 1
+
+
+class Scheduler:
+    """Admission control in front of the AI providers.
+
+    Identical in-flight requests share one Future (single-flight). Queued
+    jobs are started in priority order, at most `concurrency` at a time, and
+    only once the provider's token buckets allow it. A higher-priority
+    duplicate upgrades the queued job it joins. Work the caller runs itself
+    (a stream) takes a slot with hold() instead.
+    """
+
+    def __init__(self, limits=None, concurrency=4):
+        self.limits = {}
+        self.settings = {}  # provider -> (requests/min, tokens/min) behind self.limits
+        self.jobs = []
+        self.inflight = {}
+        self.running = 0
+        self.cond = threading.Condition()
+        self.seq = itertools.count()
+        self.dispatcher = None
+        self.apply_config(limits, concurrency)
+
+    def apply_config(self, limits=None, concurrency=4):
+        """Swap in new rate limits and concurrency (hot reload).
+
+        Providers whose limits didn't change keep their buckets, so a reload
+        doesn't hand out a fresh minute of budget.
+        """
+        settings = {
+            name: (conf.get("requests_per_minute"), conf.get("tokens_per_minute"))
+            for name, conf in (limits or {}).items()
+        }
+        with self.cond:
+            self.limits = {
+                name: self.limits[name] if self.settings.get(name) == pair else ProviderLimit(*pair)
+                for name, pair in settings.items()
+            }
+            self.settings = settings
+            self.concurrency = max(1, concurrency)
+            # Queued jobs may fit now
+            self.cond.notify_all()
+
+    def submit(self, fn, key=None, provider="default", tokens=0, priority="normal"):
+        level = PRIORITIES.get(priority, priority)
+        with self.cond:
+            job = self.inflight.get(key) if key is not None else None
+            if job is not None and not job.future.cancelled():
+                job.waiters += 1
+                job.priority = min(job.priority, level)
+                self.cond.notify()
+                return job.future
+            seq = next(self.seq)
+            job = Job(key if key is not None else ("anon", seq), provider, tokens, level, seq, fn)
+            self.inflight[job.key] = job
+            self.jobs.append(job)
+            if self.dispatcher is None:
+                self.dispatcher = threading.Thread(
+                    target=self._dispatch_loop, name="gotermix-scheduler", daemon=True
+                )
+                self.dispatcher.start()
+            self.cond.notify()
+        return job.future
+
+    def hold(self, provider="default", tokens=0, priority="normal"):
+        """Queue like submit(), for work the caller runs on its own thread (streams).
+
+        The future resolves to a function that gives the slot back; until
+        it's called the work counts against `concurrency`. While still
+        queued, release(future) withdraws it.
+        """
+        return self.submit(None, provider=provider, tokens=tokens, priority=priority)
+
+    def _slot_release(self):
+        released = []
+
+        def give_back():
+            with self.cond:
+                if released:
+                    return  # once only
+                released.append(True)
+                self.running -= 1
+                self.cond.notify()
+
+        return give_back
+
+    def release(self, future):
+        """Drop one waiter's interest; cancel the job once nobody waits on it."""
+        with self.cond:
+            for job in self.inflight.values():
+                if job.future is future:
+                    break
+            else:
+                return
+            job.waiters -= 1
+            if job.waiters <= 0 and future.cancel():
+                self.inflight.pop(job.key, None)
+                if job in self.jobs:
+                    self.jobs.remove(job)
+
+    def try_take(self, provider, tokens):
+        """Spend budget right now if it's available, without queueing."""
+        with self.cond:
+            limit = self.limits.get(provider)
+            if limit is None:
+                return True
+            now = time.monotonic()
+            if limit.wait_time(tokens, now) > 0:
+                return False
+            limit.take(tokens, now)
+            return True
+
+    def acquire(self, provider, tokens):
+        """Wait until the provider's budget allows `tokens` more, then spend it.
+
+        For extra attempts of a job that's already running (retries,
+        failover); they don't queue behind other jobs, but they pay like them.
+        """
+        with self.cond:
+            while True:
+                limit = self.limits.get(provider)
+                if limit is None:
+                    return
+                now = time.monotonic()
+                wait = limit.wait_time(tokens, now)
+                if wait <= 0:
+                    limit.take(tokens, now)
+                    return
+                self.cond.wait(wait)
+
+    def refund(self, provider, tokens):
+        """Give back budget spent on a request that was never sent."""
+        with self.cond:
+            limit = self.limits.get(provider)
+            if limit is not None:
+                limit.give(tokens, time.monotonic())
+                self.cond.notify_all()
+
+    def stats(self):
+        with self.cond:
+            return {"queued": len(self.jobs), "running": self.running}
+
+    def _next_job(self):
+        if self.running >= self.concurrency:
+            return None, None
+        now = time.monotonic()
+        blocked = set()
+        delay = None
+        for job in sorted(self.jobs, key=lambda j: (j.priority, j.seq)):
+            # Never let a lower-priority job take budget a waiting
+            # higher-priority job on the same provider is owed
+            if job.provider in blocked:
+                continue
+            limit = self.limits.get(job.provider)
+            wait = limit.wait_time(job.tokens, now) if limit else 0.0
+            if wait <= 0:
+                if limit:
+                    limit.take(job.tokens, now)
+                return job, None
+            blocked.add(job.provider)
+            delay = wait if delay is None else min(delay, wait)
+        return None, delay
+
+    def _dispatch_loop(self):
+        while True:
+            with self.cond:
+                job, delay = self._next_job()
+                if job is None:
+                    self.cond.wait(delay)
+                    continue
+                self.jobs.remove(job)
+                if not job.future.set_running_or_notify_cancel():
+                    self.inflight.pop(job.key, None)
+                    continue
+                self.running += 1
+                if job.fn is None:
+                    # A held slot: the caller runs the work and gives it back
+                    self.inflight.pop(job.key, None)
+            if job.fn is None:
+                job.future.set_result(self._slot_release())
+                continue
+            threading.Thread(target=self._run, args=(job,), daemon=True).start()
+
+    def _run(self, job):
+        result = error = None
+        try:
+            result = job.fn()
+        except BaseException as e:
+            error = e
+        with self.cond:
+            self.running -= 1
+            # Later duplicates go through the cache instead of this result
+            if self.inflight.get(job.key) is job:
+                del self.inflight[job.key]
+            self.cond.notify()
+        if error is not None:
+            job.future.set_exception(error)
+        else:
+            job.future.set_result(result)
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler(config):
+    """Process-wide scheduler, so every AIRouter shares the same budgets."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = Scheduler(**scheduler_settings(config))
+        return _scheduler
+
+
+def scheduler_settings(config):
+    """Scheduler (and apply_config) keyword arguments from a config."""
+    ai_conf = config.get("ai", {})
+    return {"limits": ai_conf.get("rate_limits", {}), "concurrency": ai_conf.get("concurrency", 4)}
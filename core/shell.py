@@ -0,0 +1,305 @@
+# gotermix54/core/shell.py
+import codecs
+import os
+import pty
+import re
+import select
+import shutil
+import signal
+import termios
+import threading
+import time
+import uuid
+from collections import namedtuple
+from .executor import TailBuffer
+
+ShellResult = namedtuple("ShellResult", ["returncode", "output", "cwd", "timed_out", "duration"])
+
+
+class ShellSession:
+    """A long-lived shell on a PTY that keeps cwd, env and aliases between commands.
+
+    Each command is followed by a sentinel line carrying a per-session random
+    token, the exit code and $PWD, so output boundaries and status are
+    recovered without starting a new shell. stdout and stderr arrive merged,
+    as they would in a terminal. Commands don't get interactive stdin.
+    """
+
+    def __init__(self, shell=None, cwd=None, env=None, tail_lines=200):
+        self.shell = shell or shutil.which("bash") or "/bin/sh"
+        self.start_cwd = cwd or os.getcwd()
+        self.env = env
+        self.tail_lines = tail_lines
+        self.token = uuid.uuid4().hex[:12]
+        self.marker = f"__GTX_{self.token}_"
+        self.pattern = re.compile(re.escape(self.marker) + r"(\d+)_(\d+)_(.*?)__\n")
+        self.seq = 0
+        self.pid = None
+        self.fd = None
+        self.cwd = self.start_cwd
+        self.lock = threading.Lock()
+        self._wake_r = self._wake_w = None
+
+    @property
+    def alive(self):
+        if self.pid is None:
+            return False
+        try:
+            pid, _ = os.waitpid(self.pid, os.WNOHANG)
+        except ChildProcessError:
+            return False
+        return pid == 0
+
+    def start(self):
+        env = dict(self.env if self.env is not None else os.environ)
+        env.update({"PS1": "", "PS2": "", "PS4": "", "TERM": "dumb", "HISTFILE": "/dev/null"})
+        env.pop("PROMPT_COMMAND", None)
+        if self._wake_r is None:
+            # cancel() from another thread wakes the select() in run()
+            self._wake_r, self._wake_w = os.pipe()
+            os.set_blocking(self._wake_r, False)
+            os.set_blocking(self._wake_w, False)
+        argv = [self.shell]
+        if os.path.basename(self.shell) == "bash":
+            # No rc files (fast, predictable) and no readline (it would echo input)
+            argv += ["--noprofile", "--norc", "--noediting"]
+
+        pid, fd = pty.fork()
+        if pid == 0:  # child
+            try:
+                try:
+                    # A restarted session picks up where the old one was
+                    os.chdir(self.cwd)
+                except OSError:
+                    os.chdir(self.start_cwd)
+                attrs = termios.tcgetattr(0)
+                attrs[1] &= ~termios.ONLCR  # oflag: keep \n as \n
+                attrs[3] &= ~termios.ECHO   # lflag: don't echo our input back
+                termios.tcsetattr(0, termios.TCSANOW, attrs)
+                os.execvpe(argv[0], argv + ["-i"], env)
+            finally:
+                os._exit(127)
+        self.pid, self.fd = pid, fd
+        self.decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self.buffer = ""
+        # Anything written before the child turned echo off comes back as
+        # input; wait for a first sentinel so it never leaks into output
+        result = self._run(":", timeout=10)
+        if result.returncode != 0:
+            self._stop()
+            raise OSError(f"could not start {self.shell}")
+
+    def close(self):
+        """Kill the shell and release its PTY and wake-up pipe."""
+        self._stop()
+        for fd in (self._wake_r, self._wake_w):
+            if fd is not None:
+                os.close(fd)
+        self._wake_r = self._wake_w = None
+
+    def _stop(self, grace=0.0):
+        """Reap the shell, killing it if it's still there after `grace` seconds.
+
+        Returns its exit status (negative for a signal, like subprocess), or
+        -1 when it had to be killed. Leftover background jobs are killed too.
+        """
+        returncode = -1
+        if self.pid is not None:
+            try:
+                pgid = os.getpgid(self.pid)
+            except OSError:
+                pgid = None
+            deadline = time.monotonic() + grace
+            while True:
+                try:
+                    pid, status = os.waitpid(self.pid, os.WNOHANG)
+                except ChildProcessError:
+                    pid = None
+                    break
+                if pid:
+                    returncode = (os.WEXITSTATUS(status) if os.WIFEXITED(status)
+                                  else -os.WTERMSIG(status))
+                    break
+                if time.monotonic() >= deadline:
+                    break
+                time.sleep(0.01)
+            if pgid is not None:
+                try:
+                    os.killpg(pgid, signal.SIGKILL)
+                except OSError:
+                    pass
+            if pid == 0:
+                try:
+                    os.waitpid(self.pid, 0)
+                except ChildProcessError:
+                    pass
+        if self.fd is not None:
+            os.close(self.fd)
+        self.pid = self.fd = None
+        return returncode
+
+    def cancel(self):
+        """Interrupt the running command from another thread (e.g. a UI key)."""
+        wake = self._wake_w
+        if wake is None:
+            return  # nothing is running
+        try:
+            os.write(wake, b"x")
+        except BlockingIOError:
+            pass  # a wake-up is already pending
+        except OSError:
+            pass  # closed meanwhile
+
+    def interrupt(self):
+        """Ctrl-C the foreground command, like pressing it in a terminal."""
+        if self.fd is not None:
+            os.write(self.fd, b"\x03")
+
+    def _send_sentinel(self):
+        os.write(self.fd, (
+            "__gtx_rc=$?; "
+            f"printf '{self.marker}{self.seq}_%s_%s__\\n' \"$__gtx_rc\" \"$PWD\"\n"
+        ).encode())
+
+    def run(self, cmd, on_line=None, timeout=None, idle_timeout=None, grace=2.0):
+        """Run `cmd` in the session; returns ShellResult (output is the merged tail).
+
+        On timeout or Ctrl-C the command gets SIGINT, as in a terminal; if the
+        shell doesn't come back within `grace` seconds it is killed and a
+        fresh one is started on the next call.
+        """
+        with self.lock:
+            if not self.alive:
+                self._stop()
+                self.start()
+            try:
+                return self._run(cmd, on_line, timeout, idle_timeout, grace)
+            except BaseException:
+                # Interrupted outside the wait (e.g. in on_line): the command's
+                # output can no longer be told apart, so drop the session
+                self._stop()
+                raise
+
+    def _run(self, cmd, on_line=None, timeout=None, idle_timeout=None, grace=2.0):
+        self._clear_wake()
+        self.seq += 1
+        start = time.monotonic()
+        tail = TailBuffer(self.tail_lines)
+        os.write(self.fd, (cmd.rstrip("\n") + "\n").encode())
+        self._send_sentinel()
+
+        timed_out = None
+        interrupted_at = resend_at = None
+        last_output = start
+        while True:
+            now = time.monotonic()
+            waits = [1.0]
+            if interrupted_at is not None:
+                waits += [interrupted_at + grace - now, resend_at - now]
+            else:
+                if timeout is not None:
+                    waits.append(start + timeout - now)
+                if idle_timeout is not None:
+                    waits.append(last_output + idle_timeout - now)
+            try:
+                ready, _, _ = select.select([self.fd, self._wake_r], [], [], max(0.0, min(waits)))
+                cancelled = self._wake_r in ready
+            except KeyboardInterrupt:
+                ready, cancelled = [], True
+            if cancelled:
+                # Stop the command, not the session
+                self._clear_wake()
+                ready = [fd for fd in ready if fd != self._wake_r]
+                timed_out = timed_out or "interrupted"
+                if interrupted_at is None:
+                    interrupted_at = resend_at = self._interrupt()
+                    continue
+
+            now = time.monotonic()
+            if not ready:
+                if interrupted_at is not None:
+                    if now - interrupted_at >= grace:
+                        # The shell itself is wedged; start fresh next time
+                        self._stop()
+                        return ShellResult(-1, tail.text(), self.cwd, timed_out, now - start)
+                    if now >= resend_at:
+                        # The command may have eaten our sentinel as stdin, or
+                        # the line discipline flushed it along with the ^C
+                        self._send_sentinel()
+                        resend_at = now + 0.5
+                    continue
+                if timeout is not None and now - start >= timeout:
+                    timed_out = "wall"
+                elif idle_timeout is not None and now - last_output >= idle_timeout:
+                    timed_out = "idle"
+                else:
+                    continue
+                interrupted_at = resend_at = self._interrupt()
+                continue
+
+            try:
+                data = os.read(self.fd, 65536)
+            except OSError:
+                data = b""
+            if not data:
+                # Shell exited (e.g. the command was `exit 3`): report its status
+                returncode = self._stop(grace)
+                if self.buffer:
+                    self._emit(self.buffer, tail, on_line)
+                    self.buffer = ""
+                return ShellResult(returncode, tail.text(), self.cwd, timed_out, now - start)
+            last_output = now
+            self.buffer += self.decoder.decode(data)
+
+            for match in self.pattern.finditer(self.buffer):
+                if int(match.group(1)) != self.seq:
+                    continue
+                output = self.pattern.sub("", self.buffer[:match.start()])
+                if output:
+                    for line in output.rstrip("\n").split("\n"):
+                        self._emit(line, tail, on_line)
+                self.buffer = ""
+                self.cwd = match.group(3)
+                if interrupted_at is not None:
+                    # Resent sentinels may still be on their way
+                    self._drain()
+                return ShellResult(int(match.group(2)), tail.text(), self.cwd,
+                                   timed_out, time.monotonic() - start)
+
+            # Emit complete lines; keep the partial one, which may be the
+            # start of the sentinel. Stale sentinels are dropped.
+            *lines, self.buffer = self.pattern.sub("", self.buffer).split("\n")
+            for line in lines:
+                self._emit(line, tail, on_line)
+
+    def _interrupt(self):
+        self.interrupt()
+        # Give the ^C a moment to be processed before resending the sentinel
+        return time.monotonic() + 0.1
+
+    def _clear_wake(self):
+        try:
+            while os.read(self._wake_r, 64):
+                pass
+        except BlockingIOError:
+            pass
+
+    def _drain(self, quiet=0.05):
+        while True:
+            ready, _, _ = select.select([self.fd], [], [], quiet)
+            if not ready:
+                return
+            try:
+                if not os.read(self.fd, 65536):
+                    return
+            except OSError:
+                return
+
+    def _emit(self, line, tail, on_line):
+        if self.marker in line:
+            # Our own sentinel command, read back by a stdin-consuming command
+            return
+        line = line.rstrip("\r")
+        tail.append(line)
+        if on_line is not None:
+            on_line(line)
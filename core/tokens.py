@@ -0,0 +1,6 @@
+# gotermix54/core/tokens.py
+
+def estimate_tokens(text):
+    # Rough 4-chars-per-token estimate; good enough for budgeting prompts
+    # and rate limits without shipping a tokenizer
+    return len(text) // 4 + 1
@@ -0,0 +1,399 @@
+# gotermix54/core/watcher.py
+import errno
+import hashlib
+import os
+import re
+import threading
+import time
+
+IGNORED_DIRS = {
+    ".git", ".hg", ".svn", ".gotermix54", "node_modules", "__pycache__",
+    ".venv", "venv", ".tox", ".nox", ".mypy_cache", ".pytest_cache", ".ruff_cache",
+    "dist", "build", ".next", "target",
+}
+MAX_HASH_BYTES = 4 * 1024 * 1024
+SUMMARY_BYTES = 64 * 1024
+
+SYMBOL = re.compile(
+    r"^(?:async\s+)?(?:def|class|function|export\s+(?:default\s+)?(?:function|class|const)|func|fn|pub\s+fn)\s+(\w+)",
+    re.MULTILINE
+)
+
+
+def is_project_root(root):
+    """Only trees with a .gotermix54 directory get watched (not $HOME or /)."""
+    return os.path.isdir(os.path.join(root, ".gotermix54"))
+
+
+def is_ignored(rel_path):
+    return any(part in IGNORED_DIRS for part in rel_path.split(os.sep))
+
+
+def summarize(data):
+    """Cheap one-line description: line count, first line and top-level symbols."""
+    if b"\0" in data[:1024]:
+        return "binary"
+    text = data[:SUMMARY_BYTES].decode("utf-8", errors="replace")
+    lines = data.count(b"\n") + (0 if data.endswith(b"\n") or not data else 1)
+    first = next((l.strip() for l in text.splitlines() if l.strip()), "")[:80]
+    symbols = SYMBOL.findall(text)[:8]
+    summary = f"{lines} lines"
+    if symbols:
+        summary += f"; defines {', '.join(symbols)}"
+    if first:
+        summary += f"; {first}"
+    return summary
+
+
+def scan_file(root, rel_path):
+    """(path, mtime_ns, size, hash, summary), or None if it's gone."""
+    full = os.path.join(root, rel_path)
+    try:
+        st = os.stat(full)
+        if not os.path.isfile(full):
+            return None
+        digest = None
+        head = b""
+        if st.st_size <= MAX_HASH_BYTES:
+            with open(full, "rb") as f:
+                data = f.read()
+            digest = hashlib.sha1(data).hexdigest()
+            head = data
+        else:
+            with open(full, "rb") as f:
+                head = f.read(SUMMARY_BYTES)
+    except OSError:
+        return None
+    return (rel_path, st.st_mtime_ns, st.st_size, digest, summarize(head))
+
+
+def walk_stats(root):
+    """Yield (rel_path, mtime_ns, size) for every non-ignored file under root.
+
+    Directories in IGNORED_DIRS or excluded by a .gitignore are skipped,
+    the same trees the watcher leaves unwatched.
+    """
+    from .file_index import IgnoreRules, ignored
+    stack = [("", [])]
+    while stack:
+        rel, chain = stack.pop()
+        current = os.path.join(root, rel) if rel else root
+        try:
+            with os.scandir(current) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        if any(entry.name == ".gitignore" for entry in entries):
+            rules = IgnoreRules.read(os.path.join(current, ".gitignore"))
+            if rules is not None:
+                chain = chain + [(rel, rules)]
+        prefix = rel + "/" if rel else ""
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    child = prefix + entry.name
+                    if entry.name not in IGNORED_DIRS and not ignored(chain, child, True):
+                        stack.append((child, chain))
+                elif entry.is_file(follow_symlinks=False):
+                    st = entry.stat(follow_symlinks=False)
+                    yield os.path.relpath(entry.path, root), st.st_mtime_ns, st.st_size
+            except OSError:
+                continue
+
+
+class ProjectWatcher:
+    """Keeps ContextManager's view of the project current from filesystem events.
+
+    Events are coalesced into a pending set and handled once the tree has
+    been quiet for `debounce` seconds. A burst larger than
+    `bulk_threshold` paths (git checkout, codegen) becomes one stat-only
+    rescan that rehashes only files whose mtime or size changed.
+
+    On Linux each directory gets its own inotify watch (see core.inotify),
+    and ignored trees (IGNORED_DIRS and anything .gitignore excludes) are
+    never watched, so `npm install` costs no watches and no events.
+    Elsewhere watchdog watches each top-level directory recursively,
+    skipping ignored ones, and the event handler drops the rest.
+    """
+
+    def __init__(self, context, debounce=0.5, bulk_threshold=200, max_files=20000):
+        self.context = context
+        self.max_files = max_files
+        self.root = str(context.root)
+        self.debounce = debounce
+        self.bulk_threshold = bulk_threshold
+        self.pending = set()
+        self.needs_rescan = False  # events were lost (queue overflow, directory moved away)
+        self.last_event = 0.0
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.stopped = threading.Event()
+        self.listeners = []
+        self.observer = None
+        self.inotify = None
+        self.chains = {}  # watched rel dir -> its .gitignore chain, for new subdirectories
+        # Files in the watched tree, checked against max_files by both the
+        # initial walk (watch_tree) and rescan()
+        self.file_count = 0
+        self.thread = None
+
+    def subscribe(self, callback):
+        """callback(changed_paths, removed_paths) after each applied batch."""
+        self.listeners.append(callback)
+
+    def start(self):
+        from .inotify import Inotify
+        try:
+            self.inotify = Inotify()
+        except OSError:
+            if not self._start_watchdog():
+                return False
+        else:
+            threading.Thread(target=self._read_events, name="gotermix-inotify", daemon=True).start()
+        self.thread = threading.Thread(target=self._run, name="gotermix-watcher", daemon=True)
+        self.thread.start()
+        return True
+
+    def _start_watchdog(self):
+        try:
+            from watchdog.observers import Observer
+            from watchdog.events import FileSystemEventHandler
+        except ImportError:
+            return False
+
+        watcher = self
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                if event.event_type == "opened" or event.event_type == "closed_no_write":
+                    return
+                for path in (event.src_path, getattr(event, "dest_path", None)):
+                    if path:
+                        watcher.notify(path)
+                # A new top-level directory needs a watch of its own
+                if event.is_directory and event.event_type in ("created", "moved"):
+                    path = getattr(event, "dest_path", None) or event.src_path
+                    if os.path.dirname(path) == watcher.root:
+                        watcher._schedule(path)
+
+        self.handler = Handler()
+        self.observer = Observer()
+        self.observer.daemon = True
+        # The root alone, then each top-level directory that isn't ignored:
+        # a recursive watch on the root would cover node_modules too
+        self.observer.schedule(self.handler, self.root, recursive=False)
+        try:
+            entries = list(os.scandir(self.root))
+        except OSError:
+            entries = []
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                self._schedule(entry.path)
+        self.observer.start()
+        return True
+
+    def _schedule(self, path):
+        from .file_index import IgnoreRules
+        name = os.path.basename(path)
+        rules = IgnoreRules.read(os.path.join(self.root, ".gitignore"))
+        if name in IGNORED_DIRS or (rules is not None and rules.match(name, True)):
+            return
+        try:
+            self.observer.schedule(self.handler, path, recursive=True)
+        except OSError:
+            pass
+
+    def _read_events(self):
+        from .inotify import IN_CREATE, IN_DELETE, IN_DELETE_SELF, IN_ISDIR, IN_MOVED_FROM, IN_MOVED_TO
+        self.watch_tree("", [])
+        while not self.stopped.is_set():
+            try:
+                events = self.inotify.read(timeout=1.0)
+            except OSError:
+                break
+            for path, mask in events:
+                if path is None:
+                    self.request_rescan()  # the kernel's queue overflowed
+                elif mask & IN_DELETE_SELF:
+                    self.chains.pop(os.path.relpath(path, self.root), None)
+                elif mask & IN_ISDIR:
+                    if mask & (IN_CREATE | IN_MOVED_TO):
+                        self.watch_new_dir(path)
+                    elif mask & (IN_DELETE | IN_MOVED_FROM):
+                        # Its files vanish without events of their own
+                        self.request_rescan()
+                else:
+                    self.notify(path)
+        self.inotify.close()
+
+    def watch_tree(self, rel, chain, announce=False):
+        """Watch `rel` and every directory below it that isn't ignored.
+
+        With announce=True (a directory that just appeared) the files found
+        are queued as changes too: they arrived without events.
+        """
+        from .file_index import IgnoreRules, ignored
+        stack = [(rel, chain)]
+        while stack:
+            rel, chain = stack.pop()
+            if self.file_count > self.max_files:
+                # Not a project tree (e.g. launched from $HOME)
+                self.stop()
+                return
+            full = os.path.join(self.root, rel) if rel else self.root
+            try:
+                # Watch before listing, so nothing created in between is missed
+                self.inotify.add(full)
+                with os.scandir(full) as it:
+                    entries = list(it)
+            except OSError as e:
+                if e.errno == errno.ENOSPC:
+                    return  # out of watches (fs.inotify.max_user_watches)
+                continue
+            if any(entry.name == ".gitignore" for entry in entries):
+                rules = IgnoreRules.read(os.path.join(full, ".gitignore"))
+                if rules is not None:
+                    chain = chain + [(rel, rules)]
+            self.chains[rel] = chain
+            prefix = rel + "/" if rel else ""
+            for entry in entries:
+                child = prefix + entry.name
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in IGNORED_DIRS and not ignored(chain, child, True):
+                            stack.append((child, chain))
+                    elif entry.is_file(follow_symlinks=False):
+                        self.file_count += 1
+                        if announce:
+                            self.notify(entry.path)
+                except OSError:
+                    continue
+
+    def watch_new_dir(self, path):
+        from .file_index import ignored
+        rel = os.path.relpath(path, self.root)
+        parent = os.path.dirname(rel)
+        chain = self.chains.get(parent)
+        if chain is None or rel in self.chains:
+            return  # inside an ignored tree, or already watched
+        if os.path.basename(rel) in IGNORED_DIRS or ignored(chain, rel, True):
+            return
+        self.watch_tree(rel, chain, announce=True)
+
+    def request_rescan(self):
+        with self.lock:
+            self.needs_rescan = True
+            self.last_event = time.monotonic()
+        self.wake.set()
+
+    def stop(self):
+        self.stopped.set()
+        self.wake.set()
+        if self.observer is not None:
+            self.observer.stop()
+
+    def notify(self, path):
+        rel = os.path.relpath(path, self.root)
+        if rel.startswith("..") or is_ignored(rel):
+            return
+        with self.lock:
+            self.pending.add(rel)
+            self.last_event = time.monotonic()
+        self.wake.set()
+
+    def _run(self):
+        # Catch up with whatever changed while nobody was watching
+        try:
+            self.rescan()
+        except Exception:
+            pass
+        while not self.stopped.is_set():
+            self.wake.wait()
+            self.wake.clear()
+            # Debounce: wait until the tree has been quiet for a while
+            while not self.stopped.is_set():
+                with self.lock:
+                    quiet_for = time.monotonic() - self.last_event
+                if quiet_for >= self.debounce:
+                    break
+                time.sleep(self.debounce - quiet_for)
+            with self.lock:
+                batch, self.pending = self.pending, set()
+                rescan, self.needs_rescan = self.needs_rescan, False
+            if not batch and not rescan:
+                continue
+            try:
+                if rescan or len(batch) > self.bulk_threshold:
+                    self.rescan()
+                else:
+                    self.apply(batch)
+            except Exception:
+                # A failed sync must not kill the watcher; the next event
+                # or rescan will catch up
+                pass
+
+    def apply(self, paths):
+        manifest = self.context.project_manifest()
+        records, removed = [], []
+        for rel in paths:
+            full = os.path.join(self.root, rel)
+            if os.path.isdir(full):
+                continue
+            try:
+                st = os.stat(full)
+            except OSError:
+                if rel in manifest:
+                    removed.append(rel)
+                continue
+            known = manifest.get(rel)
+            if known and known[0] == st.st_mtime_ns and known[1] == st.st_size:
+                continue
+            record = scan_file(self.root, rel)
+            if record is not None:
+                records.append(record)
+        self._commit(records, removed)
+
+    def rescan(self):
+        manifest = self.context.project_manifest()
+        seen = set()
+        changed = []
+        for rel, mtime_ns, size in walk_stats(self.root):
+            seen.add(rel)
+            if len(seen) > self.max_files:
+                # Not a project tree (e.g. launched from $HOME): stay idle
+                # rather than hashing the whole disk
+                self.stop()
+                return
+            known = manifest.get(rel)
+            if known and known[0] == mtime_ns and known[1] == size:
+                continue
+            changed.append(rel)
+        self.file_count = len(seen)  # the walk is exact; drop counts of deleted files
+        records = [r for r in (scan_file(self.root, rel) for rel in changed) if r is not None]
+        self._commit(records, [rel for rel in manifest if rel not in seen])
+
+    def _commit(self, records, removed):
+        if not records and not removed:
+            return
+        self.context.update_project_files(records, removed)
+        changed = [r[0] for r in records]
+        # Keep the relevance index in step for files the AI context tracks
+        for rel in changed + list(removed):
+            if self.context.has_file(rel):
+                self.context.index.update_file(rel)
+        for callback in self.listeners:
+            callback(changed, list(removed))
+
+
+def start_watcher(context, config):
+    """Start a ProjectWatcher for `context` if enabled and it's a project root; else None."""
+    conf = config.get("watcher", {})
+    if not conf.get("enabled", True) or not is_project_root(context.root):
+        return None
+    watcher = ProjectWatcher(
+        context,
+        debounce=conf.get("debounce", 0.5),
+        bulk_threshold=conf.get("bulk_threshold", 200),
+        max_files=conf.get("max_files", 20000)
+    )
+    return watcher if watcher.start() else None
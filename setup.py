@@ -27,7 +27,7 @@ setup(
     ],
     entry_points={
         "console_scripts": [
-            "gotermix54=gotermix54.cli:cli",
+            "gotermix54=gotermix54.cli:main",
         ],
     },
     python_requires=">=3.8",
@@ -0,0 +1,16 @@
+# gotermix54/tests/conftest.py
+import importlib.machinery
+import importlib.util
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# The checkout is the gotermix54 package itself (no src/ layout); make it
+# importable under that name when it isn't installed
+try:
+    import gotermix54  # noqa: F401
+except ImportError:
+    spec = importlib.machinery.ModuleSpec("gotermix54", None, is_package=True)
+    spec.submodule_search_locations = [str(ROOT)]
+    sys.modules["gotermix54"] = importlib.util.module_from_spec(spec)
@@ -0,0 +1,20 @@
+# gotermix54/tests/test_cli.py
+import importlib
+import click
+import pytest
+from click.testing import CliRunner
+from gotermix54 import cli as cli_module
+
+
+@pytest.mark.parametrize("name, target", sorted(cli_module.cli.lazy_commands.items()))
+def test_lazy_command_targets_exist(name, target):
+    module_name, attr = target.split(":")
+    module = importlib.import_module(module_name, "gotermix54")
+    assert isinstance(getattr(module, attr), click.Command)
+
+
+def test_help_lists_every_command():
+    result = CliRunner().invoke(cli_module.cli, ["--help"])
+    assert result.exit_code == 0, result.output
+    for name in cli_module.cli.lazy_commands:
+        assert name in result.output
@@ -0,0 +1,82 @@
+# gotermix54/tests/test_context.py
+import json
+import threading
+import pytest
+from gotermix54.context import MEMORY_KEEP, MEMORY_LIMIT, ContextManager
+
+
+def test_changes_persist_across_instances(tmp_path):
+    ctx = ContextManager(tmp_path)
+    ctx.add_file("b.py")
+    ctx.add_file("a.py")
+    ctx.add_file("b.py")  # already tracked
+    ctx.set_goal("ship it")
+    ctx.add_memory({"role": "user", "text": "hi"})
+    again = ContextManager(tmp_path)
+    assert again.context == {
+        "files": ["b.py", "a.py"],
+        "project_goal": "ship it",
+        "memory": [{"role": "user", "text": "hi"}],
+    }
+
+
+def test_reading_creates_nothing(tmp_path):
+    ctx = ContextManager(tmp_path)
+    assert ctx.context["files"] == []
+    assert not (tmp_path / ".gotermix54").exists()
+
+
+def test_failed_batch_rolls_back(tmp_path):
+    ctx = ContextManager(tmp_path)
+    ctx.add_file("kept.py")
+    with pytest.raises(RuntimeError):
+        with ctx.batch():
+            ctx.add_file("lost.py")
+            ctx.set_goal("lost goal")
+            raise RuntimeError("boom")
+    assert ctx.context["files"] == ["kept.py"]
+    assert not ctx.has_file("lost.py")
+    assert ContextManager(tmp_path).context["project_goal"] == ""
+
+
+def test_memory_is_trimmed(tmp_path):
+    ctx = ContextManager(tmp_path)
+    with ctx.batch():
+        for i in range(MEMORY_LIMIT + 1):
+            ctx.add_memory(i)
+    assert ctx.context["memory"] == list(range(MEMORY_LIMIT + 1 - MEMORY_KEEP, MEMORY_LIMIT + 1))
+    assert ContextManager(tmp_path).context["memory"] == ctx.context["memory"]
+
+
+def test_legacy_json_is_imported(tmp_path):
+    base = tmp_path / ".gotermix54"
+    base.mkdir()
+    (base / "context.json").write_text(json.dumps({
+        "files": ["x.py"], "project_goal": "old", "memory": ["m1", "m2"]
+    }))
+    ctx = ContextManager(tmp_path)
+    assert ctx.context == {"files": ["x.py"], "project_goal": "old", "memory": ["m1", "m2"]}
+
+
+def test_concurrent_writers_lose_nothing(tmp_path):
+    ctx = ContextManager(tmp_path)
+    ctx.set_goal("start")  # create the store up front
+
+    def writer(n):
+        for i in range(20):
+            ctx.add_file(f"w{n}/{i}.py")
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stored = ContextManager(tmp_path).context["files"]
+    assert sorted(stored) == sorted(f"w{n}/{i}.py" for n in range(8) for i in range(20))
+
+
+def test_two_instances_share_the_store(tmp_path):
+    first, second = ContextManager(tmp_path), ContextManager(tmp_path)
+    first.add_file("a.py")
+    second.add_file("b.py")
+    assert ContextManager(tmp_path).context["files"] == ["a.py", "b.py"]
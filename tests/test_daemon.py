@@ -0,0 +1,130 @@
+# gotermix54/tests/test_daemon.py
+import io
+import os
+import threading
+import time
+import pytest
+from gotermix54.config import DEFAULT_CONFIG
+from gotermix54.core import daemon as daemon_core
+from gotermix54.core.scheduler import Scheduler
+
+
+class FakeAI:
+    """Stands in for AIRouter: streams a canned answer, no provider calls."""
+
+    def __init__(self, delay=0.0):
+        self.config = DEFAULT_CONFIG
+        self.scheduler = Scheduler()
+        self.delay = delay
+        self.prompts = []
+
+    def apply_config(self, config):
+        self.config = config
+
+    def stream(self, prompt, mode="reasoning", **kwargs):
+        self.prompts.append((prompt, os.getcwd()))
+        for token in ("It ", "works"):
+            time.sleep(self.delay)
+            yield token
+
+
+@pytest.fixture
+def running(tmp_path):
+    path = tmp_path / "d.sock"
+    ai = FakeAI()
+    server = daemon_core.Daemon(path, ai=ai)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 5
+    while daemon_core.request({"cmd": "ping"}, path) is None:
+        assert time.monotonic() < deadline, "daemon didn't start"
+        time.sleep(0.01)
+    yield path, server, ai
+    daemon_core.request({"cmd": "shutdown"}, path)
+    thread.join(5)
+
+
+def run(argv, path):
+    out, err = io.StringIO(), io.StringIO()
+    code = daemon_core.forward(argv, out, err, path)
+    return code, out.getvalue(), err.getvalue()
+
+
+@pytest.mark.parametrize("argv, expected", [
+    (["explain", "dns"], True),
+    (["sys", "explain", "ls"], True),
+    (["cache", "stats"], True),
+    (["sys", "run", "ls"], False),
+    (["--no-cache", "explain", "dns"], False),
+    ([], False),
+])
+def test_is_forwardable(argv, expected):
+    assert daemon_core.is_forwardable(argv) is expected
+
+
+def test_no_daemon_means_run_in_process(tmp_path):
+    assert run(["explain", "dns"], tmp_path / "missing.sock")[0] is None
+    assert daemon_core.request({"cmd": "ping"}, tmp_path / "missing.sock") is None
+
+
+def test_forwarded_command_streams_output_and_exit_code(running, tmp_path):
+    path, server, ai = running
+    code, out, err = run(["explain", "dns"], path)
+    assert code == 0
+    assert out == "It works\n"
+    # The command ran in the client's directory; the daemon's is restored
+    assert ai.prompts[0][1] == os.getcwd()
+    assert server.status()["served"] == 1
+
+
+def test_commands_run_in_the_client_cwd(running, tmp_path, monkeypatch):
+    path, server, ai = running
+    project = tmp_path / "project"
+    project.mkdir()
+    before = os.getcwd()
+    monkeypatch.chdir(project)
+    assert run(["explain", "x"], path)[0] == 0
+    assert ai.prompts[-1][1] == str(project)
+    assert os.getcwd() == str(project)
+    assert str(project) in server.contexts
+    assert server.watchers.get(str(project)) is None  # no .gotermix54: not watched
+    monkeypatch.chdir(before)
+
+
+def test_usage_errors_come_back_as_exit_codes(running):
+    path, _, _ = running
+    code, out, err = run(["cache", "stats", "--bogus"], path)
+    assert code == 2
+    assert "--bogus" in err
+
+
+def test_non_forwardable_commands_are_not_sent(running):
+    path, server, _ = running
+    assert run(["sys", "run", "ls"], path)[0] is None
+    assert server.status()["served"] == 0
+
+
+def test_concurrent_clients_get_their_own_output(running):
+    path, server, ai = running
+    ai.delay = 0.02
+    results = [None] * 4
+
+    def client(i):
+        results[i] = run(["explain", str(i)], path)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    assert results == [(0, "It works\n", "")] * 4
+    assert server.status()["served"] == 4
+
+
+def test_protocol_mismatch_is_refused(running):
+    path, _, _ = running
+    sock = daemon_core.connect(path)
+    with sock:
+        daemon_core.send(sock, {"version": daemon_core.PROTOCOL + 1, "argv": ["explain"]})
+        reply = next(daemon_core.read_messages(sock))
+    assert reply["exit"] == 2
@@ -0,0 +1,91 @@
+# gotermix54/tests/test_executor.py
+import threading
+import time
+from gotermix54.core.executor import MAX_LINE_BYTES, StreamingCommand, TailBuffer
+
+
+def test_lines_stream_per_channel():
+    cmd = StreamingCommand("echo out1; echo err1 >&2; printf 'out2'; exit 3")
+    lines = list(cmd)
+    assert [line for channel, line in lines if channel == "stdout"] == ["out1", "out2"]
+    assert [line for channel, line in lines if channel == "stderr"] == ["err1"]
+    assert cmd.result.returncode == 3
+    assert cmd.result.stdout == "out1\nout2"
+    assert cmd.result.timed_out is None
+
+
+def test_wall_timeout_kills_the_process_group_and_keeps_the_partial_line():
+    start = time.monotonic()
+    cmd = StreamingCommand("printf 'partial'; sleep 30 & sleep 30", timeout=0.3)
+    lines = list(cmd)
+    assert time.monotonic() - start < 5
+    assert lines == [("stdout", "partial")]
+    assert cmd.result.timed_out == "wall"
+    assert cmd.result.stdout == "partial"
+    assert cmd.result.returncode != 0
+
+
+def test_idle_timeout_only_fires_on_silence():
+    cmd = StreamingCommand("for i in 1 2 3 4 5; do echo $i; sleep 0.1; done; sleep 30", idle_timeout=0.4)
+    lines = [line for _, line in cmd]
+    assert lines == ["1", "2", "3", "4", "5"]
+    assert cmd.result.timed_out == "idle"
+
+
+def test_tails_are_bounded():
+    cmd = StreamingCommand("seq 1 10000", tail_lines=5)
+    count = sum(1 for _ in cmd)
+    assert count == 10000
+    assert cmd.result.stdout.split("\n") == [str(i) for i in range(9996, 10001)]
+    assert cmd.tails["stdout"].dropped == 9995
+
+
+def test_newline_free_output_is_split():
+    size = MAX_LINE_BYTES * 2 + 10
+    cmd = StreamingCommand(f"head -c {size} /dev/zero | tr '\\0' x")
+    lengths = [len(line) for _, line in cmd]
+    assert sum(lengths) == size
+    assert max(lengths) <= MAX_LINE_BYTES
+
+
+def test_cancel_from_another_thread():
+    cmd = StreamingCommand("echo started; sleep 30")
+    seen = []
+
+    def consume():
+        for _, line in cmd:
+            seen.append(line)
+
+    thread = threading.Thread(target=consume)
+    thread.start()
+    deadline = time.monotonic() + 5
+    while not seen and time.monotonic() < deadline:
+        time.sleep(0.01)
+    cmd.cancel()
+    thread.join(5)
+    assert not thread.is_alive()
+    assert seen == ["started"]
+
+
+def test_abandoned_iteration_kills_the_command():
+    cmd = StreamingCommand("echo first; sleep 30")
+    lines = iter(cmd)
+    assert next(lines) == ("stdout", "first")
+    lines.close()
+    assert cmd.proc.poll() is not None  # killed and reaped, not left sleeping
+    assert cmd.result is not None
+
+
+def test_missing_directory_is_reported():
+    cmd = StreamingCommand("true", cwd="/nonexistent/dir")
+    assert list(cmd) == []
+    assert cmd.result.returncode == -1
+    assert cmd.result.stderr
+
+
+def test_tail_buffer_byte_limit():
+    tail = TailBuffer(max_lines=100, max_bytes=10)
+    for line in ("aaaa", "bbbb", "cccc"):
+        tail.append(line)
+    assert tail.text() == "bbbb\ncccc"
+    assert tail.dropped == 1
@@ -0,0 +1,138 @@
+# gotermix54/tests/test_file_index.py
+import os
+import re
+import pytest
+from gotermix54.core.file_index import FileIndex, IgnoreRules, ignored, translate_glob
+
+
+def rules(*lines):
+    return IgnoreRules(list(lines))
+
+
+@pytest.mark.parametrize("pattern, path, expected", [
+    ("*.log", "debug.log", True),
+    ("*.log", "logs/debug.log", False),  # translate_glob alone doesn't anchor
+    ("a?c", "abc", True),
+    ("a?c", "a/c", False),
+    ("[!a]x", "bx", True),
+    ("[!a]x", "ax", False),
+    ("**/foo", "foo", True),
+    ("**/foo", "a/b/foo", True),
+    ("a/**/b", "a/b", True),
+    ("a/**/b", "a/x/y/b", True),
+    ("a/**", "a/x/y", True),
+    ("\\*", "*", True),
+    ("\\*", "x", False),
+])
+def test_translate_glob(pattern, path, expected):
+    assert bool(re.fullmatch(translate_glob(pattern), path)) is expected
+
+
+def test_pattern_without_slash_matches_at_any_depth():
+    r = rules("*.log")
+    assert r.match("debug.log", False)
+    assert r.match("a/b/debug.log", False)
+    assert r.match("debug.txt", False) is None
+
+
+def test_slash_anchors_to_the_gitignore_directory():
+    r = rules("/build", "docs/out")
+    assert r.match("build", True)
+    assert r.match("src/build", True) is None
+    assert r.match("docs/out", True)
+    assert r.match("x/docs/out", True) is None
+
+
+def test_dir_only_rules_skip_files():
+    r = rules("out/")
+    assert r.match("out", True)
+    assert r.match("a/out", True)
+    assert r.match("out", False) is None
+
+
+def test_negation_reincludes_and_last_match_wins():
+    r = rules("*.log", "!keep.log")
+    assert r.match("debug.log", False) is True
+    assert r.match("keep.log", False) is False
+    r = rules("!keep.log", "*.log")
+    assert r.match("keep.log", False) is True
+
+
+def test_comments_blanks_and_escapes():
+    r = rules("# comment", "", "\\#literal", "\\!bang")
+    assert r.match("#literal", False)
+    assert r.match("!bang", False)
+    assert r.match("comment", False) is None
+
+
+def test_chain_applies_rules_relative_to_their_directory():
+    chain = [("", rules("*.tmp")), ("sub", rules("/local", "!keep.tmp"))]
+    assert ignored(chain, "a.tmp", False)
+    assert ignored(chain, "sub/local", True)
+    assert not ignored(chain, "local", True)
+    assert not ignored(chain, "sub/keep.tmp", False)
+    assert ignored(chain, "keep.tmp", False)
+
+
+def make_tree(root, files):
+    for rel, text in files.items():
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+
+
+def test_index_honours_gitignore_and_ignored_dirs(tmp_path):
+    make_tree(tmp_path, {
+        ".gitignore": "*.log\nbuild/\n!keep.log\n",
+        "src/app.py": "",
+        "src/.gitignore": "/gen\n",
+        "src/gen/out.py": "",
+        "gen/kept.py": "",
+        "debug.log": "",
+        "keep.log": "",
+        "build/x.py": "",
+        "node_modules/pkg/index.js": "",
+    })
+    paths = set(FileIndex(tmp_path).refresh().paths)
+    assert paths == {".gitignore", "src/.gitignore", "src/app.py", "gen/kept.py", "keep.log"}
+
+
+def test_refresh_notices_an_edited_gitignore(tmp_path):
+    make_tree(tmp_path, {".gitignore": "*.log\n", "a.py": "", "debug.log": ""})
+    index = FileIndex(tmp_path).refresh()
+    rules = index.rules[""][1]
+    assert "a.py" in index.refresh().paths
+    assert index.rules[""][1] is rules  # unchanged file: not parsed again
+    # Rewriting a file in place leaves its directory's mtime alone
+    stat = os.stat(tmp_path)
+    (tmp_path / ".gitignore").write_text("*.log\n*.py\n")
+    os.utime(tmp_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert set(index.refresh().paths) == {".gitignore"}
+
+
+def test_search_ranking(tmp_path):
+    make_tree(tmp_path, {
+        "main.py": "",                   # name substring, short
+        "src/domain.py": "",             # name substring, longer
+        "main/readme.txt": "",           # path substring only
+        "m/a/i/n.txt": "",               # path subsequence only
+        "mxaxixn.py": "",                # name subsequence
+        "other.py": "",
+    })
+    index = FileIndex(tmp_path).refresh()
+    assert index.search("main") == ["main.py", "src/domain.py", "main/readme.txt", "mxaxixn.py", "m/a/i/n.txt"]
+    assert index.search("main", limit=2) == ["main.py", "src/domain.py"]
+
+
+def test_search_is_smart_case(tmp_path):
+    make_tree(tmp_path, {"README.md": "", "readme.txt": ""})
+    index = FileIndex(tmp_path).refresh()
+    assert set(index.search("readme")) == {"README.md", "readme.txt"}
+    assert index.search("README") == ["README.md"]
+    assert index.search("  ") == []
+
+
+def test_load_reuses_the_stored_index(tmp_path):
+    make_tree(tmp_path, {"a.py": "", "sub/b.py": ""})
+    FileIndex(tmp_path).refresh()
+    assert set(FileIndex(tmp_path).load().paths) == {"a.py", "sub/b.py"}
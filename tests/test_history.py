@@ -0,0 +1,28 @@
+# gotermix54/tests/test_history.py
+from gotermix54.core.history import Ring, Series, sparkline
+
+
+def test_ring_keeps_the_last_values_in_order():
+    ring = Ring(4)
+    assert list(ring.values()) == []
+    for value in range(1, 7):
+        ring.append(value)
+    assert len(ring) == 4
+    assert list(ring.values()) == [3, 4, 5, 6]
+    assert list(ring.values(2)) == [5, 6]
+    assert list(ring.values(10)) == [3, 4, 5, 6]
+
+
+def test_series_downsamples_mean_and_peak():
+    series = Series(window=10, levels=((3, 5),))
+    for value in (1, 2, 6, 3, 3, 3, 9):
+        series.append(value)
+    assert list(series.values(level=1)) == [3, 3]
+    assert list(series.values(level=1, peaks=True)) == [6, 3]
+    assert series.stats() == (1, 9, 9)
+
+
+def test_sparkline_scales_to_the_range():
+    assert sparkline([0, 50, 100], lo=0, hi=100) == "▁▅█"
+    assert sparkline([]) == ""
+    assert len(sparkline(range(100), width=10)) == 10
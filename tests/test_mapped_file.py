@@ -0,0 +1,97 @@
+# gotermix54/tests/test_mapped_file.py
+import os
+import pytest
+from gotermix54.core import mapped_file
+from gotermix54.core.mapped_file import MappedFile
+
+
+@pytest.fixture
+def small_steps(monkeypatch):
+    # Tiny strides and chunks, so a short file crosses many boundaries
+    monkeypatch.setattr(mapped_file, "STRIDE", 4)
+    monkeypatch.setattr(mapped_file, "CHUNK", 64)
+    monkeypatch.setattr(mapped_file, "SEARCH_CHUNK", 32)
+
+
+def write(tmp_path, data):
+    path = tmp_path / "text.txt"
+    path.write_bytes(data)
+    return path
+
+
+def sample_lines(count=500):
+    # Varying lengths, including empty lines and lines longer than a chunk
+    return [("x" * (i * 7 % 150)) + f"line {i}" if i % 13 else "" for i in range(count)]
+
+
+@pytest.mark.parametrize("trailing_newline", [True, False])
+def test_lines_and_offsets_across_chunks(tmp_path, small_steps, trailing_newline):
+    expected = sample_lines()
+    data = "\n".join(expected).encode() + (b"\n" if trailing_newline else b"")
+    text = MappedFile(write(tmp_path, data))
+    offsets = [0]
+    for line in expected[:-1]:
+        offsets.append(offsets[-1] + len(line) + 1)
+    for i in range(0, len(expected), 7):
+        assert text.offset_of(i) == offsets[i]
+        assert text.lines(i, 3) == expected[i:i + 3]
+        assert text.line_of(offsets[i]) == i
+        assert text.line_of(offsets[i] + len(expected[i])) == i
+    assert text.offset_of(len(expected)) is None
+    assert text.index_all()
+    assert text.line_count == len(expected)
+    text.close()
+
+
+def test_long_lines_are_cut(tmp_path, small_steps, monkeypatch):
+    monkeypatch.setattr(mapped_file, "MAX_LINE", 10)
+    text = MappedFile(write(tmp_path, b"a" * 100 + b"\nshort\n"))
+    assert text.lines(0, 5) == ["a" * 10, "short"]
+
+
+def test_empty_file(tmp_path):
+    text = MappedFile(write(tmp_path, b""))
+    assert text.index_all()
+    assert text.line_count == 0
+    assert text.lines(0, 10) == []
+    assert text.search("x") is None
+
+
+def test_search_across_windows(tmp_path, small_steps):
+    data = b"".join(b"%05d filler filler\n" % i for i in range(200)) + b"NeedLe here\n"
+    text = MappedFile(write(tmp_path, data))
+    found = text.search("needle")
+    assert found == data.index(b"NeedLe")
+    assert text.line_of(found) == 200
+    assert text.search("NEEDLE") is None  # upper case: case-sensitive
+    assert text.search("needle", 0, found) is None
+    assert text.search("needle", found + 1) is None
+    # Wherever the windows start, a match straddling their edge is found
+    target = data.index(b"00017 filler")
+    for start in range(target + 1):
+        assert text.search("00017 filler", start) == target
+
+
+def test_search_can_be_cancelled(tmp_path, small_steps):
+    text = MappedFile(write(tmp_path, b"a" * 1000 + b"b"))
+    assert text.search("b", cancelled=lambda: True) is None
+    assert text.search("b") == 1000
+
+
+def test_non_regular_files_are_refused(tmp_path):
+    fifo = tmp_path / "fifo"
+    os.mkfifo(fifo)
+    with pytest.raises(OSError):
+        MappedFile(fifo)
+    with pytest.raises(OSError):
+        MappedFile(tmp_path)
+
+
+def test_shrunk_file_stops_indexing(tmp_path, small_steps):
+    path = write(tmp_path, b"line\n" * 1000)
+    text = MappedFile(path)
+    assert text.offset_of(3) == 15
+    os.truncate(path, 10)
+    assert text.shrunk()
+    assert not text.index_all()
+    assert text.search("zzz") is None
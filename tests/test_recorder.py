@@ -0,0 +1,67 @@
+# gotermix54/tests/test_recorder.py
+import pytest
+from gotermix54.core.recorder import FIELDS, Recorder, read_header, read_records
+
+
+def snapshot(i, cores):
+    data = {name: float(i + n) for n, name in enumerate(FIELDS)}
+    data["processes"] = 100 + i
+    data["time"] = 1000.0 + i
+    data["cpu_per_core"] = [float(i)] * cores
+    return data
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "metrics.rec")
+    recorder = Recorder(path, interval=2.0, flush_every=1)
+    written = [snapshot(i, recorder.cores) for i in range(5)]
+    for data in written:
+        recorder.write(data)
+    recorder.close()
+    assert read_header(path)["interval"] == 2.0
+    records = list(read_records(path))
+    assert len(records) == 5
+    for data, record in zip(written, records):
+        assert record["time"] == data["time"]
+        assert record["processes"] == data["processes"]
+        assert record["interval"] == 2.0
+        for name in FIELDS:
+            assert record[name] == pytest.approx(data[name])
+        assert list(record["cpu_per_core"]) == pytest.approx(data["cpu_per_core"])
+
+
+def test_rotation_keeps_order_across_parts(tmp_path):
+    path = str(tmp_path / "metrics.rec")
+    recorder = Recorder(path, max_bytes=400, backups=10, flush_every=1)
+    for i in range(40):
+        recorder.write(snapshot(i, recorder.cores))
+    recorder.close()
+    assert (tmp_path / "metrics.rec.1").exists()
+    times = [record["time"] for record in read_records(path)]
+    assert times == [1000.0 + i for i in range(40)]
+
+
+def test_truncated_record_is_skipped(tmp_path):
+    path = str(tmp_path / "metrics.rec")
+    recorder = Recorder(path, flush_every=1)
+    for i in range(3):
+        recorder.write(snapshot(i, recorder.cores))
+    recorder.close()
+    with open(path, "ab") as f:
+        f.write(b"\x00" * 5)  # a record cut short by a crash
+    assert len(list(read_records(path))) == 3
+
+
+def test_not_a_recording(tmp_path):
+    path = tmp_path / "other.rec"
+    path.write_bytes(b"hello\n")
+    with pytest.raises(ValueError):
+        list(read_records(str(path)))
+
+
+def test_recorder_refuses_a_file_that_is_not_a_recording(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_bytes(b"keep me\n")
+    with pytest.raises(ValueError, match="not a gotermix54 recording"):
+        Recorder(str(path))
+    assert path.read_bytes() == b"keep me\n"
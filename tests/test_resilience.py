@@ -0,0 +1,187 @@
+# gotermix54/tests/test_resilience.py
+import threading
+import time
+import pytest
+from gotermix54.core import resilience
+from gotermix54.core.resilience import CircuitBreaker, CircuitOpenError, ResilientCaller
+
+
+class ProviderError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class Ledger:
+    """Fake scheduler budget: records what each model was charged."""
+
+    def __init__(self):
+        self.events = []
+
+    def acquire(self, model, tokens):
+        self.events.append(("acquire", model, tokens))
+
+    def refund(self, model, tokens):
+        self.events.append(("refund", model, tokens))
+
+    def admit(self, model, tokens):
+        self.events.append(("admit", model, tokens))
+        return True
+
+
+def caller(ledger=None, **kwargs):
+    ledger = ledger or Ledger()
+    options = {"retries": 2, "backoff_base": 0.001, "backoff_max": 0.001, "hedge": False,
+               "breaker_failures": 3, "breaker_reset": 0.2}
+    options.update(kwargs)
+    return ResilientCaller(admit=ledger.admit, acquire=ledger.acquire, refund=ledger.refund, **options)
+
+
+def flaky(failures, status=503):
+    """fn(model) failing `failures[model]` times before answering."""
+    calls = []
+
+    def fn(model):
+        calls.append(model)
+        if failures.get(model, 0) > 0:
+            failures[model] -= 1
+            raise ProviderError(status)
+        return f"answer from {model}"
+
+    return fn, calls
+
+
+def test_retryable_errors_are_retried_and_each_retry_is_charged():
+    ledger = Ledger()
+    fn, calls = flaky({"a": 2})
+    outcome = caller(ledger).call(["a"], fn, tokens=10, admitted="a")
+    assert outcome.value == "answer from a"
+    assert outcome.attempts == 3
+    # The admitted first attempt was paid for by the scheduler already
+    assert ledger.events == [("acquire", "a", 10), ("acquire", "a", 10)]
+
+
+def test_breaker_opens_then_fails_over():
+    fn, calls = flaky({"a": 10})
+    outcome = caller(retries=5).call(["a", "b"], fn)
+    assert outcome.value == "answer from b"
+    assert calls == ["a", "a", "a", "b"]  # three failures open a's breaker
+
+
+def test_request_errors_return_at_once_without_tripping_the_breaker():
+    c = caller()
+    fn, calls = flaky({"a": 1}, status=400)
+    outcome = c.call(["a", "b"], fn)
+    assert isinstance(outcome.error, ProviderError)
+    assert calls == ["a"]
+    assert c.breaker("a").failures == 0
+    assert c.breaker("a").state == "closed"
+
+
+def test_provider_errors_fail_over_without_retrying():
+    c = caller()
+    fn, calls = flaky({"a": 1}, status=401)
+    outcome = c.call(["a", "b"], fn)
+    assert outcome.value == "answer from b"
+    assert calls == ["a", "b"]
+    assert c.breaker("a").failures == 0
+
+
+def test_admitted_charge_moves_to_the_fallback():
+    ledger = Ledger()
+    c = caller(ledger)
+    for _ in range(3):
+        c.breaker("a").record_failure()
+    fn, calls = flaky({})
+    outcome = c.call(["a", "b"], fn, tokens=7, admitted="a")
+    assert outcome.value == "answer from b"
+    assert ledger.events == [("refund", "a", 7), ("acquire", "b", 7)]
+
+
+def test_nothing_sent_refunds_the_admission():
+    ledger = Ledger()
+    c = caller(ledger)
+    for model in ("a", "b"):
+        for _ in range(3):
+            c.breaker(model).record_failure()
+    outcome = c.call(["a", "b"], flaky({})[0], tokens=5, admitted="a")
+    assert isinstance(outcome.error, CircuitOpenError)
+    assert outcome.attempts == 0
+    assert ledger.events == [("refund", "a", 5)]
+
+
+def test_half_open_breaker_lets_one_probe_through():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+    time.sleep(0.06)
+    assert breaker.available()
+    assert breaker.allow()
+    assert not breaker.available()
+    assert not breaker.allow()  # a second caller waits for the probe
+    breaker.record_failure()
+    assert breaker.state == "open"  # a failed probe re-opens
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow() and breaker.allow()
+
+
+def test_slow_request_is_hedged_and_charged():
+    ledger = Ledger()
+    c = caller(ledger, hedge=True, hedge_min_samples=1)
+    c.latency("a").record(0.01)  # p95 = 10ms
+    answered = threading.Event()
+
+    def fn(model):
+        if not answered.is_set():
+            answered.set()
+            time.sleep(0.5)  # the primary stalls
+            return "slow"
+        return "fast"
+
+    outcome = c.call(["a"], fn, tokens=3, admitted="a")
+    assert outcome.value == "fast"
+    assert ("admit", "a", 3) in ledger.events
+
+
+def test_hedges_are_bounded():
+    ledger = Ledger()
+    c = caller(ledger, hedge=True, hedge_min_samples=1, max_hedges=1)
+    c.latency("a").record(0.01)
+    c.hedges_running = 1  # the only hedge slot is taken
+    calls = []
+
+    def fn(model):
+        calls.append(model)
+        time.sleep(0.05)
+        return "primary"
+
+    assert c.call(["a"], fn).value == "primary"
+    assert calls == ["a"]
+    assert not any(event[0] == "admit" for event in ledger.events)
+
+
+def test_apply_config_keeps_breaker_state():
+    c = caller()
+    breaker = c.breaker("a")
+    breaker.record_failure()
+    c.apply_config(breaker_failures=9, breaker_reset=1.0, hedge_min_samples=2)
+    assert c.breaker("a") is breaker
+    assert breaker.failures == 1
+    assert breaker.failure_threshold == 9
+    assert breaker.reset_timeout == 1.0
+
+
+@pytest.mark.parametrize("error, retryable, request_error", [
+    (ProviderError(429), True, False),
+    (ProviderError(503), True, False),
+    (ProviderError(400), False, True),
+    (ProviderError(401), False, False),
+    (TimeoutError(), True, False),
+])
+def test_error_classification(error, retryable, request_error):
+    assert resilience.is_retryable(error) is retryable
+    assert resilience.is_request_error(error) is request_error
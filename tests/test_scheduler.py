@@ -0,0 +1,131 @@
+# gotermix54/tests/test_scheduler.py
+import threading
+import pytest
+from gotermix54.core.scheduler import ProviderLimit, Scheduler, TokenBucket
+
+TIMEOUT = 2
+
+
+def blocker():
+    """A job that runs until released, and an event set once it started."""
+    started, go = threading.Event(), threading.Event()
+
+    def fn():
+        started.set()
+        go.wait(TIMEOUT)
+        return "blocker"
+
+    return fn, started, go
+
+
+def test_token_bucket_refills_at_its_rate():
+    bucket = TokenBucket(60)  # one per second
+    assert bucket.wait_time(60, bucket.stamp) == 0
+    bucket.take(60, bucket.stamp)
+    assert bucket.wait_time(1, bucket.stamp) == pytest.approx(1.0)
+    assert bucket.wait_time(1, bucket.stamp + 0.5) == pytest.approx(0.5)
+    assert bucket.wait_time(1, bucket.stamp + 1.0) == 0
+
+
+def test_oversized_request_waits_for_a_full_bucket_only():
+    bucket = TokenBucket(10)
+    assert bucket.wait_time(1000, bucket.stamp) == 0
+    bucket.take(1000, bucket.stamp)
+    assert bucket.level == 0
+
+
+def test_identical_requests_share_one_call():
+    scheduler = Scheduler(concurrency=1)
+    fn, started, go = blocker()
+    scheduler.submit(fn)
+    assert started.wait(TIMEOUT)
+    calls = []
+
+    def work():
+        calls.append(1)
+        return "answer"
+
+    first = scheduler.submit(work, key="k")
+    second = scheduler.submit(work, key="k")
+    assert first is second
+    go.set()
+    assert first.result(TIMEOUT) == "answer"
+    assert calls == [1]
+
+
+def test_interactive_jumps_the_queue():
+    scheduler = Scheduler(concurrency=1)
+    fn, started, go = blocker()
+    scheduler.submit(fn)
+    assert started.wait(TIMEOUT)
+    order = []
+    background = scheduler.submit(lambda: order.append("background"), priority="background")
+    interactive = scheduler.submit(lambda: order.append("interactive"), priority="interactive")
+    go.set()
+    background.result(TIMEOUT)
+    interactive.result(TIMEOUT)
+    assert order == ["interactive", "background"]
+
+
+def test_duplicate_upgrades_priority_of_queued_job():
+    scheduler = Scheduler(concurrency=1)
+    fn, started, go = blocker()
+    scheduler.submit(fn)
+    assert started.wait(TIMEOUT)
+    order = []
+    scheduler.submit(lambda: order.append("normal"), priority="normal")
+    upgraded = scheduler.submit(lambda: order.append("shared"), key="k", priority="background")
+    scheduler.submit(lambda: order.append("shared"), key="k", priority="interactive")
+    go.set()
+    upgraded.result(TIMEOUT)
+    assert order[0] == "shared"
+
+
+def test_rate_limit_defers_jobs_and_try_take():
+    scheduler = Scheduler(limits={"p": {"requests_per_minute": 1}})
+    assert scheduler.submit(lambda: 1, provider="p").result(TIMEOUT) == 1
+    assert not scheduler.try_take("p", 0)
+    queued = scheduler.submit(lambda: 2, provider="p")
+    with pytest.raises(Exception):
+        queued.result(0.2)  # the next request is a minute away
+    assert scheduler.try_take("other", 0)  # unlimited providers pass
+
+
+def test_release_cancels_a_queued_job_nobody_waits_for():
+    scheduler = Scheduler(concurrency=1)
+    fn, started, go = blocker()
+    scheduler.submit(fn)
+    assert started.wait(TIMEOUT)
+    ran = []
+    future = scheduler.submit(lambda: ran.append(1), key="k")
+    joined = scheduler.submit(lambda: ran.append(1), key="k")
+    scheduler.release(future)
+    assert not future.cancelled()  # a second waiter still wants it
+    scheduler.release(joined)
+    assert future.cancelled()
+    go.set()
+    scheduler.submit(lambda: None).result(TIMEOUT)
+    assert ran == []
+
+
+def test_held_slot_counts_against_concurrency():
+    scheduler = Scheduler(concurrency=1)
+    give_back = scheduler.hold().result(TIMEOUT)
+    assert scheduler.stats()["running"] == 1
+    queued = scheduler.submit(lambda: "done")
+    with pytest.raises(Exception):
+        queued.result(0.2)
+    give_back()
+    give_back()  # idempotent
+    assert queued.result(TIMEOUT) == "done"
+    assert scheduler.stats() == {"queued": 0, "running": 0}
+
+
+def test_apply_config_keeps_unchanged_buckets():
+    scheduler = Scheduler(limits={"a": {"requests_per_minute": 5}, "b": {"tokens_per_minute": 100}})
+    a, b = scheduler.limits["a"], scheduler.limits["b"]
+    scheduler.apply_config({"a": {"requests_per_minute": 5}, "b": {"tokens_per_minute": 200}}, concurrency=7)
+    assert scheduler.limits["a"] is a
+    assert scheduler.limits["b"] is not b
+    assert isinstance(scheduler.limits["b"], ProviderLimit)
+    assert scheduler.concurrency == 7
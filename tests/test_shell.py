@@ -0,0 +1,37 @@
+# gotermix54/tests/test_shell.py
+import os
+import pytest
+from gotermix54.core.shell import ShellSession
+
+
+@pytest.fixture
+def session():
+    session = ShellSession()
+    yield session
+    session.close()
+
+
+def test_state_carries_over_between_commands(session, tmp_path):
+    assert session.run(f"cd {tmp_path}; export GTX_TEST=1").returncode == 0
+    result = session.run("echo $GTX_TEST; false")
+    assert result.output == "1"
+    assert result.returncode == 1
+    assert result.cwd == str(tmp_path)
+
+
+def test_exit_reports_the_shells_status_and_the_next_run_restarts(session):
+    result = session.run("echo bye; exit 3")
+    assert result.returncode == 3
+    assert result.output.startswith("bye")
+    assert session.pid is None
+    assert session.run("echo back").output == "back"
+
+
+def test_close_releases_the_wake_pipe(session):
+    session.run(":")
+    fds = (session._wake_r, session._wake_w)
+    session.close()
+    for fd in fds:
+        with pytest.raises(OSError):
+            os.fstat(fd)
+    session.cancel()  # no-op once closed
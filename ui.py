@@ -1,6 +1,7 @@
 # gotermix54/ui.py
-import os
-import sys
+import asyncio
+import threading
+from collections import deque
 from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
@@ -8,20 +9,21 @@ from rich.layout import Layout
 from rich.live import Live
 from rich.align import Align
 from rich.text import Text
-from prompt_toolkit import Application
-from prompt_toolkit.key_binding import KeyBindings
-from prompt_toolkit.layout.containers import HSplit, Window
-from prompt_toolkit.layout.controls import FormattedTextControl
-from prompt_toolkit.styles import Style
-from prompt_toolkit.filters import Condition
-from .commands.learn import start_interactive_tutor
 from .commands.dev import create_project_interactive
-from .ai import AIRouter
+from .ai import AIResult, AIRouter
+from .config import config_service
 from .context import ContextManager
+from .core.conversation import ChatStore, Conversation
+from .core.executor import StreamingCommand
 from .core.monitor import SystemMonitor
+from .core.watcher import start_watcher
+from .utils.keys import KeyReader
+from .utils.render import Screen
 
 console = Console()
 
+CHAT_SCROLLBACK = 200  # transcript entries kept on screen; the AI's memory is the Conversation
+
 class GoTermixUI:
     def __init__(self):
         self.ai = AIRouter()
@@ -29,7 +31,21 @@ class GoTermixUI:
         self.monitor = SystemMonitor()
         self.running = True
         self.mode = "menu"  # menu, chat, explore, monitor
-        self.chat_history = []
+        self.conversation = self.open_conversation(self.ai.config.get("chat", {}))
+        self.chat_history = self.restore_transcript()
+        self.last_failure = None
+        self.shell = None  # persistent ShellSession for `!cmd`, started on first use
+        self.menu_screen = Screen(("header", 3), ("menu", 10), ("footer", 3))
+        self.chat_screen = Screen(("header", 3), ("transcript", None), ("input", 3))
+        self.chat_lock = threading.Lock()  # chat_history is appended to from worker threads
+        self.chat_version = 0  # bumped on every transcript change
+        self.chat_input = ""
+        self.chat_task = None  # cancel callback of the request/command in flight
+        self.task_lock = threading.Lock()  # guards chat_task against the worker's reset
+        self.explorer = None
+        self.loop = None
+        self.wake = None
+        self.pending_action = None  # blocking flow to run outside the event loop
         self.selected_menu = 0
         self.menu_items = [
             "🚀 Create Project",
@@ -40,15 +56,44 @@ class GoTermixUI:
             "⚙️  Settings",
             "🚪 Exit"
         ]
+        # Pick up key/model edits to config.json without restarting the UI
+        self.unsubscribe_config = config_service.subscribe(self.on_config_change)
+        # Keep the AI's view of the project current in the background
+        # (project roots only: see start_watcher)
+        self.watcher = start_watcher(self.context, self.ai.config)
+
+    def on_config_change(self, config):
+        self.ai.apply_config(config)
+        self.monitor.apply_config(config)
+        conf = config.get("chat", {})
+        self.conversation.token_budget = conf.get("token_budget", 3000)
+        self.conversation.summary_words = conf.get("summary_words", 250)
+
+    def open_conversation(self, conf):
+        store = session_id = None
+        if conf.get("persist", True):
+            store = ChatStore(self.context.root)
+            session_id = store.latest()
+        return Conversation(self.ai, store, session_id,
+                            token_budget=conf.get("token_budget", 3000),
+                            summary_words=conf.get("summary_words", 250))
+
+    def restore_transcript(self):
+        """Show a resumed session's turns the way they were first displayed."""
+        history = []
+        if self.conversation.summary:
+            history.append({"role": "note", "content": "… earlier messages are summarized (/new starts over)"})
+        for _, role, content, _ in self.conversation.turns[-CHAT_SCROLLBACK:]:
+            history.append({"role": role, "content": content})
+        return history
 
     def render_menu(self):
-        layout = Layout()
-        layout.split_column(
-            Layout(self.render_header(), size=3),
-            Layout(self.render_menu_panel(), size=10),
-            Layout(self.render_footer(), size=3)
-        )
-        return layout
+        # Only the menu panel depends on state; header and footer are built once
+        screen = self.menu_screen
+        screen.update("header", None, self.render_header)
+        screen.update("menu", self.selected_menu, self.render_menu_panel)
+        screen.update("footer", self.chat_task is not None, self.render_footer)
+        return screen.layout
 
     def render_header(self):
         title = Text("GoTermix54", style="bold cyan")
@@ -75,117 +120,395 @@ class GoTermixUI:
             "↑↓: Navigate • Enter: Select • q: Quit • c: Quick Chat",
             "💡 Pro Tip: Type '!' then command to run shell (e.g !ls)"
         ]
-        return Panel("\n".join(tips), style="dim")
+        # A chat request left running in the background is flagged in the title
+        title = "⏳ Chat is working (c to watch)" if self.chat_task is not None else None
+        return Panel("\n".join(tips), title=title, style="dim")
 
     def render_chat(self):
-        messages = []
-        for msg in self.chat_history[-10:]:
-            if msg['role'] == 'user':
-                messages.append(f"[bold green]You:[/bold green] {msg['content']}")
-            else:
-                messages.append(f"[bold blue]AI:[/bold blue] {msg['content']}")
-        
-        chat_content = "\n".join(messages) if messages else "[dim]No messages yet. Ask anything![/dim]"
-        input_area = "\n" + ("_" * 50) + "\n[bold yellow]Type your question (ESC to exit chat):[/bold yellow]"
-
-        layout = Layout()
-        layout.split_column(
-            Layout(self.render_header(), size=3),
-            Layout(Panel(chat_content, title="💬 AI Chat", border_style="green"), ratio=4),
-            Layout(Panel(input_area, border_style="yellow"), size=3)
-        )
-        return layout
+        screen = self.chat_screen
+        screen.update("header", None, self.render_header)
+        screen.update("transcript", (self.chat_version, console.size.height), self.render_transcript)
+        screen.update("input", (self.chat_input, self.chat_task is not None), self.render_chat_input)
+        return screen.layout
+
+    def render_transcript(self):
+        styles = {"user": ("You: ", "bold green"), "assistant": ("AI: ", "bold blue"),
+                  "shell": ("", "dim"), "note": ("", "yellow")}
+        with self.chat_lock:
+            messages = [(msg["role"], msg["content"]) for msg in self.chat_history[-50:]]
+        if not messages:
+            return Panel("[dim]No messages yet. Ask anything![/dim]", title="💬 AI Chat", border_style="green")
+        # Only the tail that fits is built; the panel keeps the newest lines
+        height = max(1, console.size.height - 8)
+        lines = []
+        for role, content in messages:
+            label, style = styles.get(role, ("", ""))
+            for i, line in enumerate(content.split("\n")):
+                lines.append(Text.assemble((label if i == 0 else "", style), line))
+        return Panel(Text("\n").join(lines[-height:]), title="💬 AI Chat", border_style="green")
+
+    def render_chat_input(self):
+        title = "⏳ Working… (Ctrl-C: cancel)" if self.chat_task is not None else None
+        return Panel(Text(f"> {self.chat_input}▏"), title=title, title_align="left",
+                     subtitle="Enter: send • !cmd: shell • /new: new chat • Esc: menu", border_style="yellow")
+
+    def current_screen(self):
+        if self.mode == "chat":
+            return self.chat_screen
+        if self.mode == "monitor":
+            return self.monitor.screen
+        if self.mode == "explore":
+            return self.explorer.screen
+        return self.menu_screen
+
+    def render(self):
+        if self.mode == "chat":
+            return self.render_chat()
+        if self.mode == "monitor":
+            return self.monitor.render(self.monitor.get_stats())
+        if self.mode == "explore":
+            return self.explorer.render()
+        return self.render_menu()
+
+    def set_mode(self, mode):
+        if self.mode == "monitor":
+            self.monitor.sampler.stop()
+        if mode == "monitor":
+            self.monitor.sampler.start()
+        self.mode = mode
+        self.current_screen().invalidate()
+
+    def frame_interval(self):
+        if self.mode == "monitor":
+            return 1 / self.monitor.refresh_per_second
+        return 0.5  # everything else redraws on wake-ups; this tick catches resizes
+
+    def notify(self):
+        """Ask the event loop to redraw; safe to call from any thread."""
+        loop, wake = self.loop, self.wake
+        if loop is None:
+            return
+        try:
+            loop.call_soon_threadsafe(wake.set)
+        except RuntimeError:
+            pass  # loop closed while a blocking flow runs; it redraws on re-entry
 
     def run(self):
         console.clear()
-        with Live(self.render_menu(), refresh_per_second=4, console=console) as live:
+        try:
             while self.running:
-                key = self.get_key()
-                if key == 'q':
-                    break
-                elif key == 'up':
-                    self.selected_menu = (self.selected_menu - 1) % len(self.menu_items)
-                elif key == 'down':
-                    self.selected_menu = (self.selected_menu + 1) % len(self.menu_items)
-                elif key == 'enter':
-                    self.handle_selection()
-                elif key == 'c':
-                    self.mode = "chat"
-                    self.run_chat_mode(live)
-                    self.mode = "menu"
-                live.update(self.render_menu())
-
-    def run_chat_mode(self, live):
-        console.show_cursor(True)
-        while True:
-            console.print("\n[bold yellow]You:[/bold yellow] ", end="")
-            user_input = input()
-            if user_input.lower() in ['exit', 'quit', 'back', '']:
-                break
-            if user_input.startswith('!'):
-                # Run shell command
-                cmd = user_input[1:].strip()
-                console.print(f"[dim]→ Running: {cmd}[/dim]")
-                from .core.executor import run_shell_command
-                out, err, code = run_shell_command(cmd, capture_output=True)
-                if code == 0:
-                    console.print(f"[green]{out}[/green]")
-                else:
-                    console.print(f"[red]{err}[/red]")
-                continue
-
-            self.chat_history.append({"role": "user", "content": user_input})
-            with console.status("[bold blue]AI is thinking...", spinner="dots"):
-                response = self.ai.route(user_input, mode="reasoning")
-            self.chat_history.append({"role": "assistant", "content": response})
-            console.print(f"[bold blue]AI:[/bold blue] {response}")
-        console.show_cursor(False)
+                action = asyncio.run(self.run_async())
+                if action is not None:
+                    # Prompts and editors need the terminal to themselves, so they
+                    # run between loop runs; background work carries on meanwhile
+                    action()
+                    self.current_screen().invalidate()
+        finally:
+            if self.chat_task is not None:
+                self.chat_task()
+            if self.mode == "monitor":
+                self.monitor.sampler.stop()
+            if self.shell:
+                self.shell.close()
+
+    async def run_async(self):
+        """One stretch of the event loop; returns a blocking action to run, if any."""
+        self.loop = asyncio.get_running_loop()
+        self.wake = asyncio.Event()
+        self.pending_action = None
+        # No auto-refresh: we redraw on key presses, worker updates and the
+        # monitor's timer, and only when a region actually changed
+        with KeyReader() as keys, \
+                Live(self.render(), auto_refresh=False, console=console) as live:
+            keys.attach(self.loop, self.on_key)
+            try:
+                while self.running and self.pending_action is None:
+                    try:
+                        await asyncio.wait_for(self.wake.wait(), self.frame_interval())
+                    except asyncio.TimeoutError:
+                        pass
+                    self.wake.clear()
+                    self.current_screen().fit(console.size)
+                    layout = self.render()
+                    if self.current_screen().take_dirty():
+                        live.update(layout, refresh=True)
+            finally:
+                keys.detach(self.loop)
+                self.loop = None
+        return self.pending_action
+
+    def on_key(self, key):
+        handler = {"chat": self.on_chat_key, "monitor": self.on_monitor_key,
+                   "explore": self.on_explore_key}.get(self.mode, self.on_menu_key)
+        handler(key)
+        self.wake.set()
+
+    def on_menu_key(self, key):
+        if key in ('q', 'ctrl-c'):
+            self.running = False
+        elif key == 'up':
+            self.selected_menu = (self.selected_menu - 1) % len(self.menu_items)
+        elif key == 'down':
+            self.selected_menu = (self.selected_menu + 1) % len(self.menu_items)
+        elif key == 'enter':
+            self.handle_selection()
+        elif key == 'c':
+            self.set_mode("chat")
+
+    def on_monitor_key(self, key):
+        if not self.monitor.handle_key(key):
+            self.set_mode("menu")
+
+    def on_explore_key(self, key):
+        action = self.explorer.handle_key(key)
+        if action == "quit":
+            self.set_mode("menu")
+        elif action == "edit":
+            self.pending_action = self.explorer.edit_file
+
+    def on_chat_key(self, key):
+        if key == 'ctrl-c':
+            if self.chat_task is not None:
+                self.cancel_chat_task()
+            else:
+                self.set_mode("menu")
+        elif key == 'esc':
+            self.set_mode("menu")  # a request in flight keeps running
+        elif key == 'enter':
+            text, self.chat_input = self.chat_input.strip(), ""
+            self.submit_chat(text)
+        elif key == 'backspace':
+            self.chat_input = self.chat_input[:-1]
+        elif len(key) == 1 and key.isprintable():
+            self.chat_input += key
+
+    def add_message(self, role, content):
+        message = {"role": role, "content": content}
+        with self.chat_lock:
+            self.chat_history.append(message)
+            if len(self.chat_history) > CHAT_SCROLLBACK:
+                del self.chat_history[:len(self.chat_history) - CHAT_SCROLLBACK]
+            self.chat_version += 1
+        self.notify()
+        return message
+
+    def update_message(self, message, content):
+        with self.chat_lock:
+            message["content"] = content
+            self.chat_version += 1
+        self.notify()
+
+    def submit_chat(self, user_input):
+        if user_input.lower() in ['exit', 'quit', 'back']:
+            self.set_mode("menu")
+            return
+        if not user_input:
+            return
+        if self.chat_task is not None:
+            self.add_message("note", "⏳ Still working on the last request (Ctrl-C cancels it)")
+            return
+        if user_input.startswith('!'):
+            # Run shell command
+            self.start_chat_command(user_input[1:].strip())
+            return
+        if user_input == '/new':
+            self.conversation.clear()
+            with self.chat_lock:
+                self.chat_history.clear()
+            self.add_message("note", "New conversation")
+            return
+
+        prompt = user_input
+        if user_input == '?' and self.last_failure:
+            cmd, returncode, output = self.last_failure
+            prompt = (
+                f"This shell command failed:\n$ {cmd}\nExit code: {returncode}\n"
+                f"{output}\n"
+                "Explain why it failed and suggest a fix."
+            )
+            self.last_failure = None
+        self.start_chat_request(user_input, prompt)
+
+    def start_task(self, work, cancel):
+        """Run `work` on a worker thread; `cancel` is what Ctrl-C calls."""
+        def task():
+            try:
+                work()
+            finally:
+                with self.task_lock:
+                    # Only clear our own task, not one started since
+                    if self.chat_task is cancel:
+                        self.chat_task = None
+                self.notify()
+
+        with self.task_lock:
+            self.chat_task = cancel
+        threading.Thread(target=task, name="gotermix-chat", daemon=True).start()
+
+    def cancel_chat_task(self):
+        with self.task_lock:
+            cancel, self.chat_task = self.chat_task, None
+        if cancel is not None:
+            cancel()
+            self.add_message("note", "⏹  Cancelled")
+
+    def start_chat_request(self, shown, prompt):
+        self.add_message("user", shown)
+        reply = self.add_message("assistant", "…")
+        cancelled = threading.Event()
+        handle = {}
+
+        def cancel():
+            cancelled.set()
+            if "cancel" in handle:
+                handle["cancel"]()
+
+        def work():
+            parts = []
+            failed = False
+            # Earlier turns (or their summary) go along, within the token budget
+            stream = self.ai.stream(prompt, mode="reasoning", history=self.conversation.window(prompt),
+                                    handle=handle)
+            try:
+                for token in stream:
+                    if cancelled.is_set():
+                        break
+                    failed = failed or AIResult.is_failure(token)
+                    parts.append(token)
+                    self.update_message(reply, "".join(parts))
+            except Exception as e:
+                failed = True
+                self.add_message("note", f"❌ {e}")
+            finally:
+                stream.close()
+            if parts and not failed and not cancelled.is_set():
+                self.conversation.add_exchange(prompt, "".join(parts))
+
+        # Cancelling drops the admission wait or the HTTP stream; the UI
+        # doesn't wait for the worker to notice
+        self.start_task(work, cancel)
+
+    def start_chat_command(self, cmd):
+        self.add_message("user", f"!{cmd}")
+        conf = self.ai.config.get("executor", {})
+        output = self.add_message("shell", "")
+        lines = deque(maxlen=conf.get("tail_lines", 200))
+        cancelled = threading.Event()
+        handle = {}
+
+        def on_line(line):
+            lines.append(line)
+            self.update_message(output, "\n".join(lines))
+
+        def cancel():
+            cancelled.set()
+            if "cancel" in handle:
+                handle["cancel"]()
+
+        def work():
+            returncode, tail, timed_out = self.run_chat_command(cmd, on_line, handle)
+            if cancelled.is_set():
+                return
+            if timed_out == "interrupted":
+                self.add_message("note", "⏹  Interrupted")
+            elif timed_out:
+                self.add_message("note", f"⏱  Stopped after {timed_out} timeout")
+            self.report_exit(cmd, returncode, tail)
+
+        self.start_task(work, cancel)
+
+    def get_shell(self, conf):
+        if self.shell is None:
+            self.shell = False
+            if conf.get("persistent_shell", True):
+                try:
+                    from .core.shell import ShellSession
+                    self.shell = ShellSession(tail_lines=conf.get("tail_lines", 200))
+                except ImportError:
+                    pass  # no pty on this platform
+        return self.shell
+
+    def run_chat_command(self, cmd, on_line, handle):
+        """Run `cmd` for the chat on the calling thread.
+
+        Returns (returncode, output tail, timed_out); handle["cancel"] is set
+        to a callable that stops the command from another thread.
+        """
+        conf = self.ai.config.get("executor", {})
+        shell = self.get_shell(conf)
+        if shell:
+            # `!cd src`, exports and aliases stick between commands
+            handle["cancel"] = shell.cancel
+            try:
+                result = shell.run(
+                    cmd,
+                    on_line=on_line,
+                    timeout=conf.get("timeout"),
+                    idle_timeout=conf.get("idle_timeout")
+                )
+            except OSError as e:
+                on_line(f"Persistent shell unavailable ({e}); using one-shot commands")
+                self.shell = False
+            else:
+                return result.returncode, f"output (last lines):\n{result.output}", result.timed_out
+
+        command = StreamingCommand(
+            cmd,
+            timeout=conf.get("timeout"),
+            idle_timeout=conf.get("idle_timeout"),
+            tail_lines=conf.get("tail_lines", 200)
+        )
+        handle["cancel"] = command.cancel
+        # Lines are shown as they arrive; only a bounded tail is kept
+        for channel, line in command:
+            on_line(line)
+        result = command.result
+        timed_out = "interrupted" if command.cancelled else result.timed_out
+        return (result.returncode,
+                f"stdout (last lines):\n{result.stdout}\nstderr (last lines):\n{result.stderr}",
+                timed_out)
+
+    def report_exit(self, cmd, returncode, output):
+        if returncode != 0:
+            self.last_failure = (cmd, returncode, output)
+            self.add_message("note", f"Exited with code {returncode} (type ? to ask the AI why)")
 
     def handle_selection(self):
         selection = self.selected_menu
         if selection == 0:  # Create Project
-            create_project_interactive(self.context, self.ai)
+            self.pending_action = lambda: create_project_interactive(self.context, self.ai)
         elif selection == 1:  # AI Chat
-            self.mode = "chat"
-            with Live(self.render_chat(), refresh_per_second=1, console=console) as live:
-                self.run_chat_mode(live)
+            self.set_mode("chat")
         elif selection == 2:  # File Explorer
             self.launch_file_explorer()
         elif selection == 3:  # System Monitor
-            self.monitor.display_live()
+            self.set_mode("monitor")
         elif selection == 4:  # Tutor
-            start_interactive_tutor(self.ai)
+            self.start_tutor()
         elif selection == 5:  # Settings
-            self.show_settings()
+            self.pending_action = self.show_settings
         elif selection == 6:  # Exit
             self.running = False
 
+    def start_tutor(self):
+        try:
+            from .commands.learn import start_interactive_tutor
+        except ImportError:
+            # commands/learn.py isn't part of this tree
+            self.add_message("note", "📚 The interactive tutor isn't available in this build")
+            self.set_mode("chat")
+            return
+        self.pending_action = lambda: start_interactive_tutor(self.ai)
+
     def launch_file_explorer(self):
         from .utils.file_explorer import FileExplorer
-        fe = FileExplorer()
-        fe.run()
+        if self.explorer is None:
+            self.explorer = FileExplorer()
+            # Big directories finish loading in the background
+            self.explorer.on_change = self.notify
+        self.explorer.scan_directory()
+        self.set_mode("explore")
 
     def show_settings(self):
         console.print(Panel("⚙️  Settings Panel (Coming Soon)", border_style="yellow"))
         console.input("[dim]Press Enter to return...[/dim]")
-
-    def get_key(self):
-        # Simple key capture for Termux/Linux
-        import tty, termios, sys
-        fd = sys.stdin.fileno()
-        old_settings = termios.tcgetattr(fd)
-        try:
-            tty.setraw(sys.stdin.fileno())
-            ch = sys.stdin.read(1)
-            if ch == '\x1b':  # Arrow keys start with ESC
-                ch2 = sys.stdin.read(1)
-                if ch2 == '[':
-                    ch3 = sys.stdin.read(1)
-                    if ch3 == 'A': return 'up'
-                    elif ch3 == 'B': return 'down'
-            elif ch == '\r': return 'enter'
-            elif ch == 'q': return 'q'
-            elif ch == 'c': return 'c'
-        finally:
-            termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
-        return None
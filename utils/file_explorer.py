@@ -1,110 +1,490 @@
 # gotermix54/utils/file_explorer.py
+import heapq
 import os
+import threading
+from collections import OrderedDict, namedtuple
+from itertools import islice
 from pathlib import Path
 from rich.console import Console
 from rich.panel import Panel
-from rich.tree import Tree
+from rich.text import Text
 from rich.live import Live
-from rich.layout import Layout
+from ..core.disk_usage import DiskUsage, human_size
+from .keys import KeyReader
+from .pager import FileViewer
+from .render import Screen, bar
+
+Entry = namedtuple("Entry", ["name", "is_dir", "is_link"])
+PARENT = Entry("..", True, False)
+
+BATCH = 2000      # entries read (and shown) before the rest loads in the background
+CACHED_DIRS = 32  # listings kept, keyed on the directory's mtime
+FIND_LIMIT = 200  # fuzzy-find results listed
+
+
+def sort_key(entry):
+    # Directories first, then case-insensitive by name
+    return (not entry.is_dir, entry.name.lower(), entry.name)
+
+
+def read_entry(dirent):
+    # scandir already knows the type (d_type); only symlinks cost a stat
+    try:
+        is_dir = dirent.is_dir()
+    except OSError:
+        is_dir = False
+    return Entry(dirent.name, is_dir, dirent.is_symlink())
+
+
+def read_batch(it, size=BATCH):
+    return sorted(map(read_entry, islice(it, size)), key=sort_key)
+
+
+def entry_label(entry):
+    if entry is PARENT:
+        return ".. (Parent Directory)"
+    icon = "📁" if entry.is_dir else "📄"
+    return f"{icon} {entry.name}{' ↪' if entry.is_link else ''}"
+
 
 class FileExplorer:
-    def __init__(self):
+    """Directory browser that stays responsive on huge directories.
+
+    A directory is read in one os.scandir pass into Entry records: the
+    first BATCH entries synchronously, the rest on a background thread in
+    growing batches that are merged in as they arrive. Listings are cached
+    per directory and reused while its mtime is unchanged. Only the rows
+    that fit on screen are rendered.
+
+    '/' switches to fuzzy-find mode over the whole tree below the starting
+    directory (see core.file_index); Enter jumps to the chosen file. 'd'
+    shows disk usage below the current directory, biggest first, with
+    sizes that fill in while the scan runs (see core.disk_usage). Enter on
+    a file previews it in a pager that copes with files of any size (see
+    utils.pager).
+    """
+
+    def __init__(self, path=None):
         self.console = Console()
-        self.current_path = Path.cwd()
+        self.current_path = Path(path) if path else Path.cwd()
+        self.root = self.current_path
         self.selected_index = 0
-        self.items = []
+        self.top = 0  # first visible row
+        self.items = [PARENT]
+        self.loading = False
+        self.error = None
+        self.version = 0  # bumped on every listing change; part of the list's render key
+        self.screen = Screen(("header", 3), ("list", None), ("footer", 3))
+        self.cache = OrderedDict()  # path -> (mtime_ns, entries)
+        self.on_change = None  # called (from the loader thread too) when the listing grows
+        self.query = None  # fuzzy-find text; None while browsing
+        self.finder = None  # FileIndex, built the first time find mode is used
+        self.select_name = None  # entry to put the cursor on once it's listed
+        self.usage_mode = False
+        self.usage = None  # DiskUsage, kept between visits so rescans are incremental
+        self.viewer = None  # FileViewer of the file being previewed
+        self._generation = 0   # bumped per scan; stale loaders stop
+        self._lock = threading.Lock()
 
     def scan_directory(self):
-        self.items = []
-        # Add ".." for up
-        self.items.append(".. (Parent Directory)")
-        # Add dirs
-        for item in sorted(self.current_path.iterdir()):
-            if item.is_dir():
-                self.items.append(f"📁 {item.name}")
-        # Add files
-        for item in sorted(self.current_path.iterdir()):
-            if item.is_file():
-                self.items.append(f"📄 {item.name}")
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+        path = self.current_path
+        try:
+            mtime = path.stat().st_mtime_ns
+            cached = self.cache.get(path)
+            if cached is not None and cached[0] == mtime:
+                self.cache.move_to_end(path)
+                self._publish(generation, cached[1], loading=False)
+                return
+            it = os.scandir(path)
+        except OSError as e:
+            self._publish(generation, [], loading=False, error=str(e))
+            return
+        try:
+            batch = read_batch(it)
+        except OSError as e:
+            it.close()
+            self._publish(generation, [], loading=False, error=str(e))
+            return
+        if len(batch) < BATCH:
+            it.close()
+            self._publish(generation, batch, loading=False)
+            self._remember(path, mtime, batch)
+            return
+        # Show the first batch now; the rest streams in
+        self._publish(generation, batch, loading=True)
+        threading.Thread(target=self._load_rest, args=(generation, path, mtime, it, batch),
+                         name="gotermix-scandir", daemon=True).start()
+
+    def _load_rest(self, generation, path, mtime, it, entries):
+        try:
+            while generation == self._generation:
+                # Each step reads as much as is already loaded, so the
+                # merges add up to a few passes over the listing
+                size = len(entries)
+                batch = read_batch(it, size)
+                entries = list(heapq.merge(entries, batch, key=sort_key))
+                done = len(batch) < size
+                self._publish(generation, entries, loading=not done, added=batch)
+                if done:
+                    self._remember(path, mtime, entries)
+                    return
+        except OSError as e:
+            self._publish(generation, entries, loading=False, error=str(e))
+        finally:
+            it.close()
+
+    def _publish(self, generation, entries, loading, added=(), error=None):
+        with self._lock:
+            if generation != self._generation:
+                return
+            items = self.items
+            if added and 0 < self.selected_index < len(items):
+                # Keep the cursor on the same entry as new ones are merged in
+                key = sort_key(items[self.selected_index])
+                self.selected_index += sum(1 for entry in added if sort_key(entry) < key)
+            self.items = [PARENT] + entries
+            if self.select_name is not None:
+                for i, entry in enumerate(self.items):
+                    if entry.name == self.select_name:
+                        self.selected_index, self.select_name = i, None
+                        break
+                if not loading:
+                    self.select_name = None
+            self.selected_index = min(self.selected_index, len(self.items) - 1)
+            self.loading = loading
+            self.error = error
+            self.version += 1
+        if self.on_change is not None:
+            self.on_change()
+
+    def _remember(self, path, mtime, entries):
+        self.cache[path] = (mtime, entries)
+        self.cache.move_to_end(path)
+        while len(self.cache) > CACHED_DIRS:
+            self.cache.popitem(last=False)
+
+    def visible_rows(self):
+        # Header and footer take 3 lines each, the list panel's border 2
+        return max(1, self.console.size.height - 8)
+
+    def scroll(self, rows):
+        if self.selected_index < self.top:
+            self.top = self.selected_index
+        elif self.selected_index >= self.top + rows:
+            self.top = self.selected_index - rows + 1
+        self.top = max(0, min(self.top, len(self.items) - rows))
 
     def render(self):
-        layout = Layout()
-        layout.split_column(
-            Layout(self.render_header(), size=3),
-            Layout(self.render_file_list(), ratio=1),
-            Layout(self.render_footer(), size=3)
-        )
-        return layout
+        rows = self.visible_rows()
+        screen = self.screen
+        viewer = self.viewer
+        if viewer is not None:
+            screen.update("header", ("view", viewer.path), viewer.render_header)
+            screen.update("list", viewer.state(rows), lambda: viewer.render(rows))
+            screen.update("footer", ("view", viewer.prompt), viewer.render_footer)
+            return screen.layout
+        self.scroll(rows)
+        screen.update("header", (self.current_path, self.query, self.usage_mode), self.render_header)
+        screen.update("list", (self.version, self.selected_index, self.top, rows, self.indexing, self.scanning),
+                      lambda: self.render_file_list(rows))
+        screen.update("footer", (self.query is None, self.usage_mode), self.render_footer)
+        return screen.layout
+
+    @property
+    def indexing(self):
+        return self.finder is not None and self.finder.building
+
+    @property
+    def scanning(self):
+        return self.usage is not None and self.usage.scanning
+
+    @property
+    def busy(self):
+        """True while background work may still change the listing."""
+        viewing = self.viewer is not None and self.viewer.busy
+        return self.loading or self.indexing or self.scanning or viewing
 
     def render_header(self):
+        if self.query is not None:
+            return Panel(f"🔎 Find in {self.root}: {self.query}▏", style="bold blue")
+        if self.usage_mode:
+            return Panel(f"💾 Disk Usage — {self.current_path}", style="bold blue")
         return Panel(f"📂 File Explorer — {self.current_path}", style="bold blue")
 
-    def render_file_list(self):
-        tree = Tree("Contents")
-        for i, item in enumerate(self.items):
-            if i == self.selected_index:
-                tree.add(f"[bold yellow]> {item}[/bold yellow]")
+    def usage_label(self, row, total):
+        if row is PARENT:
+            return entry_label(row)
+        icon = "📁" if row.is_dir else "📄"
+        share = 100 * row.size / total if total else 0
+        return f"{human_size(row.size):>8} {bar(share)} {icon} {row.name}"
+
+    def render_file_list(self, rows):
+        items, selected = self.items, self.selected_index
+        label = entry_label
+        if self.usage_mode:
+            total = self.usage.total(self.current_path)
+            label = lambda row: self.usage_label(row, total)
+        lines = []
+        for i in range(self.top, min(len(items), self.top + rows)):
+            if i == selected:
+                lines.append(Text(f"> {label(items[i])}", style="bold yellow"))
             else:
-                tree.add(f"  {item}")
-        return Panel(tree, border_style="cyan")
+                lines.append(Text(f"  {label(items[i])}"))
+        if self.usage_mode:
+            title = f"{human_size(total)} in {len(items) - 1} entries"
+            if self.scanning:
+                title += f" • scanning… {self.usage.dirs_done} dirs"
+        elif self.query is not None:
+            title = f"{len(items)} matches in {len(self.finder.paths)} files"
+            if self.indexing:
+                title += " • indexing…"
+        else:
+            title = f"{len(items) - 1} entries"
+        if self.loading:
+            title += " • loading…"
+        if self.error:
+            title += f" • ⚠️ {self.error}"
+        return Panel(Text("\n").join(lines), title=title, title_align="left",
+                     subtitle=f"{selected + 1}/{len(items)}", border_style="cyan")
 
     def render_footer(self):
-        return Panel("↑↓: Navigate • Enter: Open/CD • q: Quit • e: Edit (if file)", style="dim")
+        if self.query is not None:
+            return Panel("Type to search • ↑↓: Navigate • Enter: Go to file • Esc: Back", style="dim")
+        if self.usage_mode:
+            return Panel("↑↓: Navigate • Enter: Open • r: Full rescan • d/Esc: Back • q: Quit", style="dim")
+        return Panel("↑↓/PgUp/PgDn: Navigate • Enter: Open/CD • /: Find • d: Disk usage • q: Quit • "
+                     "e: Edit (if file)", style="dim")
+
+    def move(self, key):
+        """Cursor movement; returns False for keys that don't move it."""
+        with self._lock:
+            last = len(self.items) - 1
+            if key == 'up':
+                self.selected_index = self.selected_index - 1 if self.selected_index > 0 else max(last, 0)
+            elif key == 'down':
+                self.selected_index = self.selected_index + 1 if self.selected_index < last else 0
+            elif key == 'pgup':
+                self.selected_index = max(0, self.selected_index - self.visible_rows())
+            elif key == 'pgdown':
+                self.selected_index = max(0, min(last, self.selected_index + self.visible_rows()))
+            elif key == 'home':
+                self.selected_index = 0
+            elif key == 'end':
+                self.selected_index = max(last, 0)
+            else:
+                return False
+        return True
+
+    def handle_key(self, key):
+        """Apply one key press: returns "quit", "edit" (caller runs edit_file) or None."""
+        if self.viewer is not None:
+            action = self.viewer.handle_key(key, self.visible_rows())
+            if action == "close":
+                self.close_viewer()
+            return "edit" if action == "edit" else None
+        if self.query is not None:
+            self.handle_find_key(key)
+            return None
+        if self.usage_mode and key in ('d', 'esc'):
+            self.stop_usage()
+            return None
+        if key in ('q', 'esc', 'ctrl-c'):
+            self.leave_usage()
+            return "quit"
+        if self.move(key):
+            return None
+        if key == 'enter':
+            if self.handle_selection():
+                self.refresh_listing()
+        elif key == '/':
+            self.start_find()
+        elif key == 'd':
+            self.start_usage()
+        elif key == 'r' and self.usage_mode:
+            self.scan_usage(full=True)
+        elif key == 'e' and self.selected_index > 0:
+            return "edit"
+        return None
+
+    def refresh_listing(self):
+        if not self.usage_mode:
+            self.scan_directory()
+        elif self.usage.covers(self.current_path):
+            self.update_usage_rows()
+        else:
+            # Went above the scanned tree; cached subtrees make this quick
+            self.scan_usage()
+
+    def start_usage(self):
+        with self._lock:
+            self._generation += 1  # a directory still loading stops publishing
+            self.usage_mode = True
+        if self.usage is None:
+            self.usage = DiskUsage()
+        self.scan_usage()
+
+    def scan_usage(self, full=False):
+        self.update_usage_rows()
+        self.usage.scan_async(self.current_path, on_progress=self._usage_progress, full=full)
+
+    def leave_usage(self):
+        if self.usage_mode:
+            self.usage.cancel()
+            self.usage_mode = False
+
+    def stop_usage(self):
+        self.leave_usage()
+        self.scan_directory()
+
+    def _usage_progress(self):
+        self.update_usage_rows()
+        if self.on_change is not None:
+            self.on_change()
+
+    def update_usage_rows(self):
+        rows = self.usage.children(self.current_path)
+        with self._lock:
+            if not self.usage_mode:
+                return
+            # Sizes reorder the rows as they grow; keep the cursor on its entry
+            current = self.selected_entry()
+            self.items = [PARENT] + rows
+            if current is not None and current is not PARENT:
+                for i, row in enumerate(self.items):
+                    if row.name == current.name:
+                        self.selected_index = i
+                        break
+            self.selected_index = min(self.selected_index, len(self.items) - 1)
+            self.version += 1
+
+    def start_find(self):
+        from ..core.file_index import FileIndex
+        with self._lock:
+            self._generation += 1  # a directory still loading stops publishing
+            self.query = ""
+            self.items = []
+            self.selected_index = 0
+            self.version += 1
+        if self.finder is None:
+            # Last session's index answers right away; the refresh catches up
+            self.finder = FileIndex(self.root).load()
+        if not self.finder.building:
+            self.finder.refresh_async(on_done=self._index_ready)
+
+    def _index_ready(self):
+        if self.query is not None:
+            self.update_results()
+        if self.on_change is not None:
+            self.on_change()
+
+    def update_results(self):
+        with self._lock:
+            query = self.query
+            if query is None:
+                return
+            results = self.finder.search(query, FIND_LIMIT) if query else []
+            self.items = [Entry(path, False, False) for path in results]
+            self.selected_index = 0
+            self.version += 1
+
+    def handle_find_key(self, key):
+        if key in ('esc', 'ctrl-c'):
+            self.query = None
+            self.scan_directory()
+        elif key == 'enter':
+            entry = self.selected_entry()
+            if entry is not None:
+                self.go_to(self.root / entry.name)
+        elif self.move(key):
+            pass
+        elif key == 'backspace':
+            self.query = self.query[:-1]
+            self.update_results()
+        elif len(key) == 1 and key.isprintable():
+            self.query += key
+            self.update_results()
+
+    def go_to(self, path):
+        """Browse `path`'s directory with the cursor on it."""
+        self.query = None
+        self.current_path = path.parent
+        self.selected_index = 0
+        self.top = 0
+        self.select_name = path.name
+        self.scan_directory()
 
     def run(self):
         self.scan_directory()
-        with Live(self.render(), refresh_per_second=4, console=self.console) as live:
+        with KeyReader() as keys, \
+                Live(self.render(), auto_refresh=False, console=self.console) as live:
             while True:
-                key = self.get_key()
-                if key == 'q':
+                # Keep redrawing while background work changes the listing
+                key = keys.read(0.1 if self.busy else None)
+                action = self.handle_key(key) if key is not None else None
+                if action == "quit":
                     break
-                elif key == 'up':
-                    self.selected_index = (self.selected_index - 1) % len(self.items)
-                elif key == 'down':
-                    self.selected_index = (self.selected_index + 1) % len(self.items)
-                elif key == 'enter':
-                    self.handle_selection()
-                    self.scan_directory()
-                elif key == 'e' and self.selected_index > 0:
-                    self.edit_file()
-                live.update(self.render())
+                if action == "edit":
+                    with keys.suspended():
+                        self.edit_file()
+                    self.screen.invalidate()
+                self.screen.fit(self.console.size)
+                layout = self.render()
+                if self.screen.take_dirty():
+                    live.update(layout, refresh=True)
+
+    def selected_entry(self):
+        items, index = self.items, self.selected_index
+        return items[index] if index < len(items) else None
 
     def handle_selection(self):
-        if self.selected_index == 0:
-            self.current_path = self.current_path.parent
+        """Open the selected entry; returns True when the directory changed."""
+        entry = self.selected_entry()
+        if entry is None:
+            return False
+        if entry is PARENT:
+            new_path = self.current_path.parent
+        elif entry.is_dir:
+            new_path = self.current_path / entry.name
         else:
-            item_name = self.items[self.selected_index].replace("📁 ", "").replace("📄 ", "")
-            new_path = self.current_path / item_name
-            if new_path.is_dir():
-                self.current_path = new_path
-            elif new_path.is_file():
-                self.console.print(f"[dim]📄 Selected: {new_path}[/dim]")
+            self.open_viewer(self.current_path / entry.name)
+            return False
+        if new_path == self.current_path:
+            return False
+        self.current_path = new_path
+        self.selected_index = 0
+        self.top = 0
+        return True
+
+    def open_viewer(self, path):
+        try:
+            viewer = FileViewer(path)
+        except OSError as e:
+            with self._lock:
+                self.error = str(e)
+                self.version += 1
+            return
+        viewer.on_change = self._viewer_changed
+        self.viewer = viewer
+
+    def _viewer_changed(self):
+        if self.on_change is not None:
+            self.on_change()
+
+    def close_viewer(self):
+        self.viewer.close()
+        self.viewer = None
 
     def edit_file(self):
-        if self.selected_index == 0:
+        if self.viewer is not None:
+            # The edit rewrites the file: don't keep it mapped meanwhile
+            self.close_viewer()
+        entry = self.selected_entry()
+        if entry is None or entry is PARENT or entry.is_dir:
             return
-        item_name = self.items[self.selected_index].replace("📁 ", "").replace("📄 ", "")
-        file_path = self.current_path / item_name
+        file_path = self.current_path / entry.name
         if file_path.is_file():
             from ..commands.dev import edit_file_interactive
             edit_file_interactive(file_path)
-
-    def get_key(self):
-        import sys, tty, termios
-        fd = sys.stdin.fileno()
-        old_settings = termios.tcgetattr(fd)
-        try:
-            tty.setraw(sys.stdin.fileno())
-            ch = sys.stdin.read(1)
-            if ch == '\x1b':
-                ch2 = sys.stdin.read(1)
-                if ch2 == '[':
-                    ch3 = sys.stdin.read(1)
-                    if ch3 == 'A': return 'up'
-                    elif ch3 == 'B': return 'down'
-            elif ch == '\r': return 'enter'
-            elif ch == 'q': return 'q'
-            elif ch == 'e': return 'e'
-        finally:
-            termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
-        return None
@@ -0,0 +1,194 @@
+# gotermix54/utils/keys.py
+import codecs
+import contextlib
+import os
+import select
+import sys
+import threading
+
+# Escape sequences from common terminals (xterm, Termux, VT100 application mode)
+SEQUENCES = {
+    "\x1b[A": "up", "\x1b[B": "down", "\x1b[C": "right", "\x1b[D": "left",
+    "\x1bOA": "up", "\x1bOB": "down", "\x1bOC": "right", "\x1bOD": "left",
+    "\x1b[H": "home", "\x1b[F": "end", "\x1bOH": "home", "\x1bOF": "end",
+    "\x1b[1~": "home", "\x1b[4~": "end", "\x1b[3~": "delete",
+    "\x1b[5~": "pgup", "\x1b[6~": "pgdown",
+}
+# How long an Esc at the end of a read waits for the rest of its sequence
+ESC_TIMEOUT = 0.05
+
+SINGLE = {
+    "\r": "enter", "\n": "enter", "\x7f": "backspace", "\x08": "backspace",
+    "\t": "tab", "\x03": "ctrl-c", "\x04": "ctrl-d", "\x1b": "esc",
+}
+
+
+def decode(text):
+    """Split raw terminal input into key names ('up', 'enter', 'a', ...)."""
+    keys = []
+    i = 0
+    while i < len(text):
+        if text[i] == "\x1b":
+            for seq, name in SEQUENCES.items():
+                if text.startswith(seq, i):
+                    keys.append(name)
+                    i += len(seq)
+                    break
+            else:
+                # Lone Esc, or a sequence we don't know: swallow the latter
+                j = i + 1
+                if j < len(text) and text[j] in "[O":
+                    j += 1
+                    while j < len(text) and not (text[j].isalpha() or text[j] == "~"):
+                        j += 1
+                    i = j + 1
+                    continue
+                keys.append("esc")
+                i += 1
+            continue
+        keys.append(SINGLE.get(text[i], text[i]))
+        i += 1
+    return keys
+
+
+def incomplete_tail(text):
+    """Index where an unfinished escape sequence ends `text`, else len(text).
+
+    A read can stop in the middle of a sequence ("\x1b[" now, "A" next
+    time); that tail has to wait for the next read instead of being
+    decoded as Esc plus junk.
+    """
+    i = text.rfind("\x1b")
+    if i == -1:
+        return len(text)
+    tail = text[i + 1:]
+    if not tail:
+        return i
+    if tail[0] in "[O" and not any(c.isalpha() or c == "~" for c in tail[1:]):
+        return i
+    return len(text)
+
+
+class KeyReader:
+    """Non-blocking keyboard input shared by the TUI screens.
+
+    As a context manager it switches stdin to cbreak mode with signals off
+    (Ctrl-C arrives as the 'ctrl-c' key) and restores it on exit. Keys can
+    be polled with `read(timeout)` or delivered to an asyncio loop with
+    `attach(loop, callback)`. When stdin isn't a terminal nothing is ever
+    read and `read` just waits out its timeout.
+
+    Input is decoded incrementally, so neither a UTF-8 character nor an
+    escape sequence split across two reads is mangled. An Esc left at
+    the end of a read is held for ESC_TIMEOUT; if nothing follows, it's
+    the Esc key.
+    """
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdin
+        self.fd = None
+        self.saved = None
+        self.pending = []
+        self.partial = ""  # unfinished escape sequence from the last read
+        self.decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+        self._flush_handle = None
+
+    def __enter__(self):
+        try:
+            import termios, tty
+            fd = self.stream.fileno()
+            self.saved = termios.tcgetattr(fd)
+        except (ImportError, OSError, ValueError):
+            return self
+        self.fd = fd
+        self._cbreak()
+        return self
+
+    def __exit__(self, *exc):
+        if self.fd is not None:
+            import termios
+            termios.tcsetattr(self.fd, termios.TCSADRAIN, self.saved)
+            self.fd = None
+
+    def _cbreak(self):
+        import termios, tty
+        tty.setcbreak(self.fd)
+        attrs = termios.tcgetattr(self.fd)
+        attrs[3] &= ~termios.ISIG
+        termios.tcsetattr(self.fd, termios.TCSADRAIN, attrs)
+
+    @contextlib.contextmanager
+    def suspended(self):
+        """Give the terminal back in its original mode, e.g. to run an editor."""
+        if self.fd is None:
+            yield
+            return
+        import termios
+        termios.tcsetattr(self.fd, termios.TCSADRAIN, self.saved)
+        try:
+            yield
+        finally:
+            # Whatever was half-read belonged to the other program
+            self.pending, self.partial = [], ""
+            self.decoder.reset()
+            self._cbreak()
+
+    def _read_available(self):
+        try:
+            data = os.read(self.fd, 1024)
+        except OSError:
+            return []
+        text = self.partial + self.decoder.decode(data)
+        cut = incomplete_tail(text)
+        self.partial = text[cut:]
+        return decode(text[:cut])
+
+    def _flush(self):
+        # Nothing more came: what's held is final (usually a lone Esc)
+        keys, self.partial = decode(self.partial), ""
+        return keys
+
+    def read(self, timeout=None):
+        """Next key, or None after `timeout` seconds (None = wait forever)."""
+        if self.pending:
+            return self.pending.pop(0)
+        if self.fd is None:
+            # No terminal: no keys will ever come, so just wait
+            threading.Event().wait(timeout)
+            return None
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return None
+        self.pending.extend(self._read_available())
+        while self.partial:
+            ready, _, _ = select.select([self.fd], [], [], ESC_TIMEOUT)
+            self.pending.extend(self._read_available() if ready else self._flush())
+        return self.pending.pop(0) if self.pending else None
+
+    def attach(self, loop, callback):
+        """Call callback(key) from `loop` for every key press."""
+        if self.fd is None:
+            return
+
+        def flush():
+            self._flush_handle = None
+            for key in self._flush():
+                callback(key)
+
+        def on_readable():
+            if self._flush_handle is not None:
+                self._flush_handle.cancel()
+                self._flush_handle = None
+            for key in self._read_available():
+                callback(key)
+            if self.partial:
+                self._flush_handle = loop.call_later(ESC_TIMEOUT, flush)
+
+        loop.add_reader(self.fd, on_readable)
+
+    def detach(self, loop):
+        if self.fd is not None:
+            loop.remove_reader(self.fd)
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
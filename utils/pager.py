@@ -0,0 +1,200 @@
+# gotermix54/utils/pager.py
+import threading
+from pathlib import Path
+from rich.panel import Panel
+from rich.syntax import Syntax
+from rich.text import Text
+from ..core.mapped_file import CHUNK, MappedFile
+
+
+class FileViewer:
+    """Read-only pager over a file of any size (see core.mapped_file).
+
+    Only the lines on screen are read and highlighted: Pygments never sees
+    more than one window of text, so a multi-GB log opens instantly.
+    Jumping far (':' line, End) and searching ('/', 'n') may have to scan
+    much of the file, so they run on a background thread and report
+    through on_change; the view stays usable meanwhile.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.text = MappedFile(self.path)
+        if self.text.size <= CHUNK:
+            self.text.index_all()  # one step: the line count is known right away
+        # From the file name only: guessing from content would read it
+        self.lexer = Syntax.guess_lexer(str(self.path))
+        self.top = 0
+        self.match_line = None  # line of the last search hit
+        self.query = ""  # last search
+        self.prompt = None  # (':' or '/', typed text) while reading input
+        self.status = ""
+        self.busy = None  # what the background thread is doing, if anything
+        self.version = 0  # bumped when background work moves the view
+        self.on_change = None
+        self.closed = False
+        self._running = 0  # worker threads still using the mapping
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def close(self):
+        with self._lock:
+            self._generation += 1
+            self.closed = True
+            idle = self._running == 0
+        # Unmapping under a running search would pull the pages from under
+        # it; the last worker closes the file instead
+        if idle:
+            self.text.close()
+
+    def reload(self):
+        # A worker still using the old mapping keeps it alive; it's unmapped
+        # once dropped
+        with self._lock:
+            self._generation += 1
+            self.busy = None
+        self.text = MappedFile(self.path)
+        self.match_line = None
+        self.top = 0
+        self.status = "File changed on disk; reloaded"
+
+    def state(self, rows):
+        """Everything the rendered panel depends on (a Screen key)."""
+        return self.top, rows, self.prompt, self.status, self.busy, self.match_line, self.version
+
+    def render(self, rows):
+        if self.text.shrunk():
+            self.reload()
+        lines = self.text.lines(self.top, rows)
+        marked = {self.match_line + 1} if self.match_line is not None else None
+        code = Syntax("\n".join(lines), self.lexer, theme="monokai", line_numbers=True,
+                      start_line=self.top + 1, highlight_lines=marked)
+        total = self.text.line_count
+        where = f"{self.top + 1}-{self.top + len(lines)} of {total if total is not None else '…'}"
+        title = self.busy or self.status
+        return Panel(code, title=title or None, title_align="left", subtitle=where, border_style="cyan")
+
+    def render_header(self):
+        return Panel(f"📄 {self.path}", style="bold blue")
+
+    def render_footer(self):
+        if self.prompt is not None:
+            kind, typed = self.prompt
+            label = "Go to line" if kind == ":" else "Search"
+            return Panel(Text(f"{label}: {typed}▏  (Enter: OK • Esc: Cancel)"), style="dim")
+        return Panel("↑↓/PgUp/PgDn/Home/End: Scroll • :: Go to line • /: Search • n: Next • "
+                     "e: Edit • q/Esc: Back", style="dim")
+
+    def handle_key(self, key, rows):
+        """Apply one key press: returns "close", "edit" or None."""
+        if self.prompt is not None:
+            self.handle_prompt_key(key)
+            return None
+        if key in ('q', 'esc', 'ctrl-c'):
+            return "close"
+        if key == 'e':
+            return "edit"
+        self.status = ""
+        if key == 'up':
+            self.top = max(0, self.top - 1)
+        elif key == 'down':
+            self.scroll_to(self.top + 1, rows)
+        elif key == 'pgup':
+            self.top = max(0, self.top - rows)
+        elif key == 'pgdown':
+            self.scroll_to(self.top + rows, rows)
+        elif key == 'home':
+            self.top = 0
+        elif key == 'end':
+            self.start("Indexing…", lambda cancelled: self._end(rows, cancelled))
+        elif key in (':', '/'):
+            self.prompt = (key, "")
+        elif key == 'n' and self.query:
+            self.search(rows)
+        return None
+
+    def handle_prompt_key(self, key):
+        kind, typed = self.prompt
+        if key in ('esc', 'ctrl-c'):
+            self.prompt = None
+        elif key == 'enter':
+            self.prompt = None
+            if kind == ":" and typed.isdigit():
+                line = max(0, int(typed) - 1)
+                self.start("Indexing…", lambda cancelled: self._go_to(line, cancelled))
+            elif kind == "/" and typed:
+                self.query = typed
+                self.match_line = None
+                self.search()
+        elif key == 'backspace':
+            self.prompt = (kind, typed[:-1])
+        elif len(key) == 1 and key.isprintable():
+            self.prompt = (kind, typed + key)
+
+    def scroll_to(self, line, rows):
+        # Past the end: show the last page instead
+        if self.text.offset_of(line) is not None:
+            self.top = line
+        else:
+            self.start("Indexing…", lambda cancelled: self._end(rows, cancelled))
+
+    def start(self, label, work):
+        """Run work(cancelled) on a thread; a newer start() cancels it."""
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+            self.busy = label
+            self._running += 1
+
+        def cancelled():
+            return generation != self._generation
+
+        def run():
+            try:
+                work(cancelled)
+            finally:
+                with self._lock:
+                    if generation == self._generation:
+                        self.busy = None
+                    self.version += 1
+                    self._running -= 1
+                    unmap = self.closed and self._running == 0
+                if unmap:
+                    self.text.close()
+                elif self.on_change is not None:
+                    self.on_change()
+
+        threading.Thread(target=run, name="gotermix-pager", daemon=True).start()
+
+    def _end(self, rows, cancelled):
+        if self.text.index_all(cancelled):
+            self.top = max(0, self.text.line_count - rows)
+
+    def _go_to(self, line, cancelled):
+        if self.text.offset_of(line) is not None:
+            self.top = line
+        elif not cancelled() and self.text.index_all(cancelled):
+            self.top = max(0, self.text.line_count - 1)
+            self.status = f"Only {self.text.line_count} lines"
+
+    def search(self, rows=None):
+        # From the line after the last hit, else from the top of the view
+        line = self.match_line + 1 if self.match_line is not None else self.top
+        self.start(f"Searching for {self.query!r}…", lambda cancelled: self._search(line, rows, cancelled))
+
+    def _search(self, line, rows, cancelled):
+        start = self.text.offset_of(line)
+        found = self.text.search(self.query, start, cancelled=cancelled) if start is not None else None
+        if found is None and not cancelled():
+            found = self.text.search(self.query, 0, start, cancelled)
+            if found is not None:
+                self.status = "Search wrapped to the top"
+        if cancelled():
+            return
+        if found is None:
+            self.status = f"Not found: {self.query}"
+            return
+        self.match_line = self.text.line_of(found)
+        if rows is None or not self.top <= self.match_line < self.top + rows:
+            # Show the hit with some context above it
+            self.top = max(0, self.match_line - 3)
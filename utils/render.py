@@ -0,0 +1,64 @@
+# gotermix54/utils/render.py
+from rich.layout import Layout
+
+BAR_WIDTH = 20
+# Every bar a percentage can map to, built once: get_bar is a lookup
+BARS = tuple(f"[{'█' * i}{'░' * (BAR_WIDTH - i)}]" for i in range(BAR_WIDTH + 1))
+
+_MISSING = object()
+
+
+def bar(percent):
+    """Precomputed 20-cell bar for 0..100%."""
+    return BARS[max(0, min(BAR_WIDTH, int(percent / (100 / BAR_WIDTH))))]
+
+
+class Screen:
+    """A Layout split into named regions that are rebuilt only when their state changes.
+
+        screen = Screen(("header", 3), ("body", None), ("footer", 3))
+        screen.fit(console.size)
+        screen.update("body", (version, selected), self.render_body)
+        if screen.take_dirty():
+            live.update(screen.layout, refresh=True)
+
+    A region's `key` is whatever its content depends on; `build` is only
+    called when the key differs from last time. `size=None` means the
+    region takes the remaining space. Keys don't include the terminal size:
+    call fit() once per frame so a resize rebuilds everything.
+    """
+
+    def __init__(self, *regions):
+        self.layout = Layout()
+        self.layout.split_column(*(
+            Layout(name=name, size=size) if size is not None else Layout(name=name, ratio=1)
+            for name, size in regions
+        ))
+        self.keys = {}
+        self.dirty = True
+        self.size = None  # terminal (width, height) the regions were built for
+
+    def fit(self, size):
+        """Rebuild everything if the terminal size changed since the last frame."""
+        size = tuple(size)
+        if size != self.size:
+            self.size = size
+            self.invalidate()
+        return self
+
+    def update(self, name, key, build):
+        if self.keys.get(name, _MISSING) != key:
+            self.layout[name].update(build())
+            self.keys[name] = key
+            self.dirty = True
+        return self
+
+    def invalidate(self):
+        """Rebuild everything next time (e.g. after another screen drew over us)."""
+        self.keys.clear()
+        self.dirty = True
+
+    def take_dirty(self):
+        """True if anything changed since the last call."""
+        dirty, self.dirty = self.dirty, False
+        return dirty